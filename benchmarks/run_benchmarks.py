@@ -0,0 +1,351 @@
+#!/usr/bin/env python
+"""
+Throughput Benchmarks
+
+Times the parser, every alignment engine, statistics, export and
+plotting on synthetic sequence pairs of several lengths and divergences,
+and writes the measurements as JSON so that releases can be compared.
+
+Reported per benchmark:
+  - wall_s:  best wall time over --repeat runs (seconds)
+  - cells:   DP cells the engine actually computed (matrix_cells is m x n)
+  - gcups:   alignment throughput in giga cell updates per second over
+             the computed cells
+  - effective_gcups: m x n / wall time, comparable across engines as
+             "how fast is the whole alignment"
+  - mb_per_s: input throughput for the parser
+  - peak_mb: peak traced Python/NumPy allocation, measured in a separate
+             run because tracing slows the code down
+
+Usage:
+    python benchmarks/run_benchmarks.py run -o bench.json
+    python benchmarks/run_benchmarks.py run --quick
+    python benchmarks/run_benchmarks.py run -l 1000 10000 -d 0.01 -e numpy wfa
+    python benchmarks/run_benchmarks.py compare baseline.json bench.json --threshold 10
+"""
+
+import sys
+import argparse
+import contextlib
+import io
+import json
+import platform
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import matplotlib
+matplotlib.use('Agg')
+import numpy as np
+
+import nw_alignment
+from nw_alignment import NWAligner
+from nw_alignment.parser import read_fasta, write_fasta
+from nw_alignment.profiling import Profiler
+from nw_alignment.utils import export_results
+from nw_alignment.visualization import plot_alignment_statistics
+
+
+DEFAULT_LENGTHS = (1000, 10000, 100000)
+DEFAULT_DIVERGENCES = (0.01, 0.10)
+
+# Largest full matrix (m * n) benchmarked for the O(m*n) engines
+DEFAULT_MAX_CELLS = 2 * 10 ** 8
+
+
+def make_pair(length: int, divergence: float, seed: int = 0):
+    """
+    Generate a random DNA sequence and a mutated copy.
+
+    Each position of the copy is mutated with probability divergence:
+    70% substitutions, 15% insertions and 15% deletions.
+
+    Args:
+        length (int): Length of the first sequence
+        divergence (float): Per-position mutation rate
+        seed (int): Random seed
+
+    Returns:
+        tuple: (seq1, seq2)
+    """
+    rng = np.random.default_rng(seed)
+    bases = np.frombuffer(b'ACGT', dtype=np.uint8)
+    seq1 = bases[rng.integers(0, 4, length)]
+
+    events = rng.random(length)
+    kinds = rng.random(length)
+    seq2 = []
+    for i, base in enumerate(seq1):
+        if events[i] >= divergence:
+            seq2.append(base)
+        elif kinds[i] < 0.70:
+            seq2.append(bases[(np.flatnonzero(bases == base)[0] + rng.integers(1, 4)) % 4])
+        elif kinds[i] < 0.85:
+            seq2.append(base)
+            seq2.append(bases[rng.integers(0, 4)])
+        # else: deletion
+
+    return seq1.tobytes().decode(), bytes(seq2).decode()
+
+
+def engine_feasible(engine: str, m: int, n: int, divergence: float,
+                    max_cells: int) -> bool:
+    """
+    Decide whether an engine finishes in reasonable time and memory.
+
+    Args:
+        engine (str): Engine name
+        m (int): Length of seq1
+        n (int): Length of seq2
+        divergence (float): Mutation rate used for the pair
+        max_cells (int): Matrix size limit for the O(m*n) engines
+
+    Returns:
+        bool: True if the benchmark should run
+    """
+    edits = divergence * max(m, n)
+    if engine in ('numpy', 'hirschberg'):
+        return m * n <= max_cells
+    if engine == 'pairwise2':
+        return m * n <= max_cells // 20
+    if engine == 'banded':
+        # The band widens with divergence; budget for a band of 2% of the length
+        return max(m, n) * (abs(m - n) + 128 + divergence * max(m, n) / 5) <= max_cells
+    # wfa: work grows with the square of the edit count
+    return edits ** 2 <= max_cells // 100
+
+
+def measure(func, repeat: int = 1, memory: bool = True) -> dict:
+    """
+    Time a callable and optionally record its peak traced memory.
+
+    Args:
+        func (callable): Code to measure
+        repeat (int): Timed runs; the best is reported
+        memory (bool): Do an extra traced run for peak memory
+
+    Returns:
+        dict: 'wall_s' and, with memory, 'peak_mb'
+    """
+    best = float('inf')
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+
+    measurement = {'wall_s': best}
+    if memory:
+        tracemalloc.start()
+        try:
+            func()
+            measurement['peak_mb'] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        finally:
+            tracemalloc.stop()
+    return measurement
+
+
+def run_benchmarks(lengths, divergences, engines, repeat=1, memory=True,
+                   max_cells=DEFAULT_MAX_CELLS, log=print):
+    """
+    Run every benchmark and collect the measurements.
+
+    Args:
+        lengths (list): Sequence lengths
+        divergences (list): Mutation rates
+        engines (list): Engine names to benchmark
+        repeat (int): Timed runs per benchmark
+        memory (bool): Measure peak memory
+        max_cells (int): Matrix size limit for the O(m*n) engines
+        log (callable): Progress printer
+
+    Returns:
+        list: One dict per benchmark
+    """
+    results = []
+
+    def record(entry, func):
+        entry.update(measure(func, repeat, memory))
+        results.append(entry)
+        log(f"  {entry['benchmark']:<10} {entry.get('engine', ''):<11} "
+            f"L={entry['length']:<7} d={entry['divergence']:<5} "
+            f"{entry['wall_s']:.4f}s"
+            + (f"  {entry['peak_mb']:.1f} MB" if 'peak_mb' in entry else ""))
+        return entry
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+
+        for length in lengths:
+            for divergence in divergences:
+                seq1, seq2 = make_pair(length, divergence, seed=length)
+                m, n = len(seq1), len(seq2)
+                base = {'length': length, 'divergence': divergence}
+
+                fasta_file = tmp / f"bench_{length}.fasta"
+                write_fasta(str(fasta_file), "bench", seq2)
+                entry = record({'benchmark': 'read_fasta', **base},
+                               lambda: read_fasta(str(fasta_file)))
+                entry['mb_per_s'] = fasta_file.stat().st_size / 2 ** 20 / entry['wall_s']
+
+                reference = None
+                for engine in engines:
+                    entry = {'benchmark': 'align', 'engine': engine, 'matrix_cells': m * n,
+                             **base}
+                    if not engine_feasible(engine, m, n, divergence, max_cells):
+                        entry['skipped'] = 'too large for this engine'
+                        results.append(entry)
+                        log(f"  align      {engine:<11} L={length:<7} d={divergence:<5} skipped")
+                        continue
+                    aligner = NWAligner(engine=engine)
+                    record(entry, lambda: aligner.align(seq1, seq2))
+                    # One more, untimed run reports the cells actually computed
+                    with Profiler() as profiler:
+                        aligned = aligner.align(seq1, seq2)
+                    entry['cells'] = profiler.records[-1]['cells']
+                    entry['gcups'] = entry['cells'] / entry['wall_s'] / 1e9
+                    entry['effective_gcups'] = m * n / entry['wall_s'] / 1e9
+                    if reference is None:
+                        reference = aligned
+
+                if reference is None:
+                    continue
+
+                aligned1 = reference['aligned_seq1']
+                aligned2 = reference['aligned_seq2']
+                stats_aligner = NWAligner()
+                record({'benchmark': 'statistics', **base},
+                       lambda: stats_aligner._calculate_statistics(aligned1, aligned2,
+                                                                   reference['score']))
+
+                def export():
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        export_results(reference, str(tmp / "export"), "bench")
+                record({'benchmark': 'export', **base}, export)
+
+        # Plots depend on the statistics only, not on the sequence length
+        if results:
+            result = NWAligner(engine='wfa').align(*make_pair(1000, 0.01))
+
+            def plot():
+                with contextlib.redirect_stdout(io.StringIO()):
+                    plot_alignment_statistics(result, str(tmp / "bench.png"))
+            record({'benchmark': 'plot', 'length': 1000, 'divergence': 0.01}, plot)
+
+    return results
+
+
+def environment() -> dict:
+    """Describe the machine and library versions for the report."""
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'nw_alignment': nw_alignment.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+    }
+
+
+def benchmark_key(entry: dict) -> tuple:
+    """Identify a benchmark across reports."""
+    return (entry['benchmark'], entry.get('engine', ''), entry['length'],
+            entry['divergence'])
+
+
+def compare_reports(baseline: dict, current: dict, threshold: float = 10.0) -> list:
+    """
+    Compare wall times of two reports.
+
+    Args:
+        baseline (dict): Earlier report
+        current (dict): New report
+        threshold (float): Slowdown (%) counted as a regression
+
+    Returns:
+        list: (key, baseline_s, current_s, change_percent, regressed) rows
+            for benchmarks present and not skipped in both reports
+    """
+    before = {benchmark_key(e): e for e in baseline['results'] if 'wall_s' in e}
+    rows = []
+    for entry in current['results']:
+        key = benchmark_key(entry)
+        if 'wall_s' not in entry or key not in before:
+            continue
+        old, new = before[key]['wall_s'], entry['wall_s']
+        change = (new / old - 1) * 100
+        rows.append((key, old, new, change, change > threshold))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Needleman-Wunsch throughput benchmarks')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help='Run the benchmarks')
+    run.add_argument('-o', '--output', default='benchmark_results.json',
+                     help='JSON report path (default: benchmark_results.json)')
+    run.add_argument('-l', '--lengths', type=int, nargs='+', default=list(DEFAULT_LENGTHS),
+                     help='Sequence lengths (default: 1000 10000 100000)')
+    run.add_argument('-d', '--divergences', type=float, nargs='+',
+                     default=list(DEFAULT_DIVERGENCES),
+                     help='Per-position mutation rates (default: 0.01 0.10)')
+    run.add_argument('-e', '--engines', nargs='+', default=list(NWAligner.ENGINES),
+                     choices=NWAligner.ENGINES, help='Engines to benchmark (default: all)')
+    run.add_argument('-r', '--repeat', type=int, default=1,
+                     help='Timed runs per benchmark, best is kept (default: 1)')
+    run.add_argument('--max-cells', type=float, default=DEFAULT_MAX_CELLS,
+                     help='Matrix size limit for O(m*n) engines (default: 2e8)')
+    run.add_argument('--no-memory', action='store_true',
+                     help='Skip the traced run that measures peak memory')
+    run.add_argument('--quick', action='store_true',
+                     help='Only 1 kb pairs at 1%% divergence')
+
+    compare = commands.add_parser('compare', help='Compare a report against a baseline')
+    compare.add_argument('baseline', help='Baseline JSON report')
+    compare.add_argument('current', help='New JSON report')
+    compare.add_argument('-t', '--threshold', type=float, default=10.0,
+                         help='Slowdown in %% that counts as a regression (default: 10)')
+
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        lengths = [1000] if args.quick else args.lengths
+        divergences = [0.01] if args.quick else args.divergences
+
+        print("\n" + "=" * 80)
+        print("NEEDLEMAN-WUNSCH BENCHMARKS")
+        print("=" * 80 + "\n")
+        results = run_benchmarks(lengths, divergences, args.engines, repeat=args.repeat,
+                                 memory=not args.no_memory, max_cells=int(args.max_cells))
+
+        report = {'environment': environment(), 'results': results}
+        output = Path(args.output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, indent=2))
+        print(f"\n[+] Report saved to: {output}")
+        return 0
+
+    baseline = json.loads(Path(args.baseline).read_text())
+    current = json.loads(Path(args.current).read_text())
+    rows = compare_reports(baseline, current, args.threshold)
+
+    print(f"\n{'benchmark':<12}{'engine':<12}{'length':>8}{'div':>6}"
+          f"{'baseline':>11}{'current':>11}{'change':>9}")
+    print("-" * 69)
+    for (name, engine, length, divergence), old, new, change, regressed in rows:
+        flag = "  <-- slower" if regressed else ""
+        print(f"{name:<12}{engine:<12}{length:>8}{divergence:>6}"
+              f"{old:>10.4f}s{new:>10.4f}s{change:>+8.1f}%{flag}")
+
+    regressions = sum(1 for row in rows if row[4])
+    print(f"\n{regressions} regression(s) above {args.threshold:.0f}% "
+          f"out of {len(rows)} benchmark(s)")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
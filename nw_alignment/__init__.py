@@ -2,10 +2,13 @@
 Needleman-Wunsch Algorithm Package
 
 A Python implementation of the Needleman-Wunsch algorithm for global 
-pairwise sequence alignment using BioPython.
+pairwise sequence alignment, with NumPy dynamic programming engines and
+BioPython's pairwise2 as an optional engine loaded on first use.
 
 Classes:
     - alignment.NWAligner: Main alignment class
+    - packed.PackedSequence: 2-bit packed nucleotide sequence
+    - result.AlignmentResult: CIGAR-encoded alignment result
     
 Functions:
     - parser.read_fasta: Parse FASTA files
@@ -24,12 +27,23 @@ __author__ = "Ramo2theSky"
 __license__ = "MIT"
 
 from .alignment import NWAligner
+from .packed import PackedSequence
+from .result import AlignmentResult
 from .parser import read_fasta, write_fasta
-from .visualization import plot_alignment_statistics
 
 __all__ = [
     "NWAligner",
+    "PackedSequence",
+    "AlignmentResult",
     "read_fasta",
     "write_fasta",
     "plot_alignment_statistics",
 ]
+
+
+def __getattr__(name):
+    # Plotting pulls in matplotlib; load it only when first asked for
+    if name == "plot_alignment_statistics":
+        from .visualization import plot_alignment_statistics
+        return plot_alignment_statistics
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -2,12 +2,25 @@
 Needleman-Wunsch Algorithm Implementation
 
 This module contains the core implementation of the Needleman-Wunsch 
-global pairwise sequence alignment algorithm using BioPython.
+global pairwise sequence alignment algorithm. Alignments are computed by
+the NumPy engines in nw_alignment.engines, or by BioPython's pairwise2.
 """
 
-import Bio.pairwise2 as pairwise2
-from typing import Dict, Tuple, List
+from typing import Callable, Dict, Tuple, List, Iterator, Optional, Iterable, TextIO
+from concurrent.futures import ProcessPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from collections import deque
+from itertools import islice
+import io
 import json
+import os
+import time
+
+from . import anchors, engines, profiling
+from .cache import AlignmentCache, cache_key
+from .packed import PackedSequence
+from .result import AlignmentResult, build_statistics
+from .utils import write_alignment_blocks
+from .prefilter import identity_bounds, BelowIdentityCutoff
 
 
 class NWAligner:
@@ -21,6 +34,18 @@ class NWAligner:
         match_score (int): Score for matching nucleotides (default: 2)
         mismatch_score (int): Penalty for mismatches (default: -1)
         gap_penalty (int): Penalty for gaps/indels (default: -2)
+        gap_open (int): Score of the first position of a gap (default: gap)
+        gap_extend (int): Score of each further gap position (default: gap)
+        engine (str): DP backend, one of ENGINES (default: 'numpy')
+    
+    Tie-breaking:
+        align() always returns exactly one optimal alignment. When several
+        alignments share the optimal score, the 'numpy' engine traces back
+        from the last cell preferring a diagonal step (match/mismatch),
+        then a gap in seq2, then a gap in seq1. 'hirschberg' splits each
+        sub-problem at the leftmost optimal crossing column, and
+        'pairwise2' follows BioPython's one_alignment_only traceback. Use
+        iter_optimal_alignments() to enumerate the co-optimal alternatives.
     
     Example:
         >>> aligner = NWAligner(match=2, mismatch=-1, gap=-2)
@@ -31,33 +56,99 @@ class NWAligner:
         Identity: 71.43%
     """
     
-    def __init__(self, match: int = 2, mismatch: int = -1, gap: int = -2):
+    # 'numpy' fills the matrix by anti-diagonals (nw_alignment.engines);
+    # 'hirschberg' finds the same optimum in linear memory;
+    # 'banded' only fills an adaptive diagonal band (similar sequences);
+    # 'wfa' grows wavefronts by penalty (near-identical sequences);
+    # 'pairwise2' delegates to Bio.pairwise2.align.globalms.
+    ENGINES = ('numpy', 'hirschberg', 'banded', 'wfa', 'pairwise2')
+    
+    # Engines that implement the linear-gap recurrence only
+    LINEAR_GAP_ENGINES = ('hirschberg', 'banded', 'wfa')
+    
+    def __init__(self, match: int = 2, mismatch: int = -1, gap: int = -2,
+                 engine: str = 'numpy', gap_open: Optional[int] = None,
+                 gap_extend: Optional[int] = None, band_tolerance: int = 64,
+                 cache: Optional[AlignmentCache] = None):
         """
         Initialize the NW Aligner with scoring parameters.
         
+        A gap of length L scores gap_open + (L - 1) * gap_extend. When the
+        two differ the 'numpy' engine switches to the affine-gap (Gotoh)
+        recurrence.
+        
         Args:
             match (int): Score for matching nucleotides. Default is 2.
             mismatch (int): Penalty for mismatches. Default is -1.
             gap (int): Penalty for gaps/indels. Default is -2.
+            engine (str): DP backend, one of ENGINES. Default is 'numpy'.
+                Use 'hirschberg' when the O(m*n) traceback matrix does not
+                fit in memory, 'banded' for closely related sequences and
+                'wfa' for near-identical ones (cost grows with divergence).
+            gap_open (int, optional): Penalty for opening a gap. Defaults to gap.
+            gap_extend (int, optional): Penalty for extending a gap. Defaults to gap.
+            band_tolerance (int): Initial band half-width beyond the length
+                difference for the 'banded' engine. The band widens
+                automatically when needed, so this only affects speed.
+                Default is 64.
+            cache (AlignmentCache, optional): Reuse results of earlier
+                align()/score() calls with the same sequences, engine and
+                scoring parameters. Default is None (no caching).
+            
+        Raises:
+            ValueError: If engine is not one of ENGINES, if gap_extend is
+                below gap_open (extending a gap costs more than opening
+                one), or if the engine does not support affine gap penalties
         """
+        if engine not in self.ENGINES:
+            raise ValueError(
+                f"Unknown engine '{engine}'. Choose from: {', '.join(self.ENGINES)}"
+            )
+        
         self.match_score = match
         self.mismatch_score = mismatch
         self.gap_penalty = gap
+        self.gap_open = gap if gap_open is None else gap_open
+        self.gap_extend = gap if gap_extend is None else gap_extend
+        self.engine = engine
+        self.band_tolerance = band_tolerance
+        self.cache = cache
+        
+        if self.gap_extend < self.gap_open:
+            # Two short gaps would then beat one long gap, which the Gotoh
+            # recurrence and the gap statistics assume; pairwise2 rejects it
+            raise ValueError(
+                f"gap_extend ({self.gap_extend}) must not be below "
+                f"gap_open ({self.gap_open})"
+            )
+        
+        if self.affine and engine in self.LINEAR_GAP_ENGINES:
+            raise ValueError(f"The '{engine}' engine supports linear gap penalties only")
+        
+        if engine == 'wfa':
+            # Raises ValueError if the scheme has no WFA penalty form
+            engines.wfa_penalties(match, mismatch, gap)
     
-    def align(self, seq1: str, seq2: str) -> Dict:
+    @property
+    def affine(self) -> bool:
+        """bool: True when gap opening and extension are scored differently."""
+        return self.gap_open != self.gap_extend
+    
+    def align(self, seq1: str, seq2: str, score_only: bool = False) -> Dict:
         """
         Perform Needleman-Wunsch alignment on two sequences.
         
         Args:
-            seq1 (str): First DNA/protein sequence
-            seq2 (str): Second DNA/protein sequence
+            seq1 (str or PackedSequence): First DNA/protein sequence
+            seq2 (str or PackedSequence): Second DNA/protein sequence
+            score_only (bool): Skip the traceback and return {'score': ...}
+                only, using O(min(m, n)) memory. Default is False.
             
         Returns:
-            dict: Dictionary containing alignment results with keys:
-                - 'seq1_id': First sequence identifier
-                - 'seq2_id': Second sequence identifier
+            AlignmentResult: Read-only mapping with keys:
                 - 'aligned_seq1': Aligned first sequence
                 - 'aligned_seq2': Aligned second sequence
+                - 'cigar': Alignment as an extended CIGAR string
                 - 'score': Alignment score
                 - 'matches': Number of matching positions
                 - 'mismatches': Number of mismatching positions
@@ -65,43 +156,380 @@ class NWAligner:
                 - 'identity': Identity percentage
                 - 'length': Alignment length
                 - 'alignment_stats': Detailed statistics dictionary
+            With score_only, a plain {'score': ...} dictionary.
+        """
+        if score_only:
+            return {'score': self.score(seq1, seq2)}
+        
+        start = time.perf_counter()
+        seq1, seq2 = self._prepare(seq1, seq2)
+        
+        if self.cache is not None:
+            key = self._cache_key('align', seq1, seq2)
+            record = self.cache.get(key)
+            if record is not None:
+                result = AlignmentResult.from_record(seq1, seq2, record)
+                result.elapsed = time.perf_counter() - start
+                return result
+        
+        with profiling.phase('dp') as record:
+            aligned_seq1, aligned_seq2, score, cells = self._align(seq1, seq2)
+            if record is not None:
+                record['cells'] = cells
+        
+        result = self._build_result(seq1, seq2, aligned_seq1, aligned_seq2, score)
+        if self.cache is not None:
+            self.cache.put(key, result.to_record())
+        result.elapsed = time.perf_counter() - start
+        return result
+    
+    def _align(self, seq1: str, seq2: str) -> Tuple[str, str, float, int]:
         """
-        # Convert to uppercase
-        seq1 = str(seq1).upper()
-        seq2 = str(seq2).upper()
+        Align two prepared sequences with the configured engine.
+        
+        Returns:
+            tuple: (aligned_seq1, aligned_seq2, score, cells) where cells
+                is the DP cells the engine actually computed (m * n for
+                the full-matrix engines, less for 'banded' and 'wfa',
+                more for 'hirschberg')
+        """
+        if self.engine == 'pairwise2':
+            return self._align_pairwise2(str(seq1), str(seq2))
+        elif self.affine:
+            return engines.gotoh_align(
+                seq1, seq2,
+                self.match_score,
+                self.mismatch_score,
+                self.gap_open,
+                self.gap_extend
+            )
+        elif self.engine == 'hirschberg':
+            return engines.hirschberg_align(
+                seq1, seq2,
+                self.match_score,
+                self.mismatch_score,
+                self.gap_penalty
+            )
+        elif self.engine == 'wfa':
+            return engines.wfa_align(
+                seq1, seq2,
+                self.match_score,
+                self.mismatch_score,
+                self.gap_penalty
+            )
+        elif self.engine == 'banded':
+            return engines.banded_align(
+                seq1, seq2,
+                self.match_score,
+                self.mismatch_score,
+                self.gap_penalty,
+                tolerance=self.band_tolerance
+            )
+        else:
+            return engines.nw_align(
+                seq1, seq2,
+                self.match_score,
+                self.mismatch_score,
+                self.gap_penalty
+            )
+    
+    def align_anchored(self, seq1: str, seq2: str, k: int = 21,
+                       workers: Optional[int] = 1, min_k: int = 11,
+                       max_cells: int = 1_000_000) -> Dict:
+        """
+        Globally align two long nucleotide sequences through exact anchors.
+        
+        k-mers occurring exactly once in each sequence seed exact-match
+        anchors; the heaviest collinear chain of anchors is kept and only
+        the stretches between consecutive anchors are aligned with the
+        configured engine, so the cost follows the divergent regions
+        rather than m*n. Stretches are independent and are aligned with
+        align_many(), optionally in parallel. Stretches still larger than
+        max_cells DP cells are re-anchored on their own with shorter
+        seeds (see anchors.anchor_chain()).
+        
+        The result is optimal given the anchors, which is the optimum for
+        closely related sequences but is not guaranteed in general: a
+        spurious anchor can force a slightly worse path. The cache is
+        used for the individual stretches only.
+        
+        Args:
+            seq1 (str or PackedSequence): First nucleotide sequence
+            seq2 (str or PackedSequence): Second nucleotide sequence
+            k (int): Anchor seed length, 1 to 31. Default is 21.
+            workers (int, optional): Processes aligning the stretches;
+                None or 0 uses every CPU. Default is 1.
+            min_k (int): Shortest seed used when re-anchoring. Default is 11.
+            max_cells (int): Re-anchor stretches with more DP cells than
+                this. Default is 1,000,000.
+        
+        Returns:
+            AlignmentResult: Result with the same keys as align()
+        
+        Example:
+            >>> result = aligner.align_anchored(genome1, genome2, workers=8)
+            >>> print(f"Identity: {result['identity']:.2f}%")
+        """
+        seq1, seq2 = self._prepare(seq1, seq2)
+        return anchors.anchored_align(self, seq1, seq2, k=k, min_k=min_k,
+                                      max_cells=max_cells, workers=workers)
+    
+    def align_many(self, pairs: Iterable, workers: Optional[int] = 1,
+                   reference: Optional[str] = None, ordered: bool = True,
+                   min_identity: Optional[float] = None
+                   ) -> Iterator[Tuple[int, Optional[Dict], Optional[Exception]]]:
+        """
+        Align many pairs, optionally across a pool of worker processes.
+        
+        Each worker receives the aligner and the reference sequence once,
+        when it starts; tasks then carry only their own sequences.
+        Failures are captured per item instead of aborting the batch.
+        pairs is consumed lazily: at most 4 tasks per worker are in flight,
+        so a generator input is read only as fast as it is aligned.
+        
+        Args:
+            pairs (iterable): (seq1, seq2) tuples, or single sequences to
+                align against reference when it is given
+            workers (int, optional): Number of processes. 1 aligns in the
+                current process; None or 0 uses every CPU. Default is 1.
+            reference (str, optional): Sequence aligned (as seq1) against
+                every item of pairs
+            ordered (bool): Yield in input order (True) or as soon as each
+                alignment finishes (False). Default is True.
+            min_identity (float, optional): Skip pairs whose identity upper
+                bound (see prefilter.identity_bounds) is below this
+                percentage; they are reported with a BelowIdentityCutoff
+                error.
+            
+        Yields:
+            tuple: (index, result, error) where index is the position in
+                pairs, result the align() result (None on failure) and
+                error the exception raised (None on success)
+            
+        Example:
+            >>> for i, result, error in aligner.align_many(seqs, workers=8,
+            ...                                            reference=ref_seq):
+            ...     print(i, error or result['identity'])
+        """
+        tasks = enumerate(pairs)
+        if not workers:
+            workers = os.cpu_count() or 1
+        if reference is not None:
+            # Uppercase once so every result references the same object
+            reference = _uppercase(reference)
+        
+        if workers == 1:
+            for index, item in tasks:
+                yield _align_item(self, reference, min_identity, index, item)
+            return
+        
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(self, reference, min_identity)) as executor:
+            outputs = _submit_window(executor, _align_task, tasks, workers * 4, ordered)
+            for index, result, error in outputs:
+                if result is not None and reference is not None:
+                    # Workers return results without the shared reference
+                    result._seq1 = reference
+                yield index, result, error
+    
+    def iter_optimal_alignments(self, seq1: str, seq2: str,
+                                max_alignments: int = 100) -> Iterator[Dict]:
+        """
+        Lazily yield co-optimal alignments, in tie-break order.
+        
+        The DP matrix is filled once with the 'numpy' engine (whatever
+        engine the aligner was created with); alignments are then traced
+        one at a time, so stopping early costs nothing. The first result
+        equals align() on the 'numpy' engine.
+        
+        Args:
+            seq1 (str): First DNA/protein sequence
+            seq2 (str): Second DNA/protein sequence
+            max_alignments (int): Stop after this many alignments.
+                None means no cap. Default is 100.
+            
+        Yields:
+            AlignmentResult: Alignment result, as from align()
+            
+        Raises:
+            ValueError: If the aligner uses affine gap penalties
+        """
+        if self.affine:
+            raise ValueError("iter_optimal_alignments() supports linear gap penalties only")
+        
+        seq1, seq2 = (str(seq) for seq in self._prepare(seq1, seq2))
+        
+        score, pointers = engines.nw_fill(
+            engines.encode_sequence(seq1),
+            engines.encode_sequence(seq2),
+            self.match_score,
+            self.mismatch_score,
+            self.gap_penalty
+        )
+        
+        tracebacks = engines.nw_iter_tracebacks(seq1, seq2, pointers)
+        for aligned_seq1, aligned_seq2 in islice(tracebacks, max_alignments):
+            yield self._build_result(seq1, seq2, aligned_seq1, aligned_seq2, score)
+    
+    def _build_result(self, seq1: str, seq2: str, aligned_seq1: str,
+                      aligned_seq2: str, score: float) -> AlignmentResult:
+        """
+        Assemble the result returned by align().
+        
+        Args:
+            seq1 (str): First prepared sequence
+            seq2 (str): Second prepared sequence
+            aligned_seq1 (str): First aligned sequence
+            aligned_seq2 (str): Second aligned sequence
+            score (float): Alignment score
+            
+        Returns:
+            AlignmentResult: CIGAR-encoded result with statistics
+        """
+        return AlignmentResult.from_aligned(seq1, seq2, aligned_seq1,
+                                            aligned_seq2, score)
+    
+    def score(self, seq1: str, seq2: str) -> float:
+        """
+        Compute the optimal alignment score without building the alignment.
+        
+        Only two DP rows are kept, so memory is O(min(m, n)). Use this to
+        rank or screen many candidate pairs.
+        
+        Args:
+            seq1 (str or PackedSequence): First DNA/protein sequence
+            seq2 (str or PackedSequence): Second DNA/protein sequence
+            
+        Returns:
+            float: Optimal global alignment score
+        """
+        seq1, seq2 = self._prepare(seq1, seq2)
+        
+        if self.cache is None:
+            with profiling.phase('dp', cells=len(seq1) * len(seq2)):
+                return self._score(seq1, seq2)
+        
+        key = self._cache_key('score', seq1, seq2)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached['score']
+        
+        with profiling.phase('dp', cells=len(seq1) * len(seq2)):
+            score = self._score(seq1, seq2)
+        self.cache.put(key, {'score': score})
+        return score
+    
+    def _score(self, seq1: str, seq2: str) -> float:
+        """Compute the score of two prepared sequences with the configured engine."""
+        if self.engine == 'pairwise2':
+            import Bio.pairwise2 as pairwise2
+            return float(pairwise2.align.globalms(
+                str(seq1), str(seq2),
+                self.match_score,
+                self.mismatch_score,
+                self.gap_open,
+                self.gap_extend,
+                score_only=True
+            ))
+        
+        a = engines.encode_sequence(seq1)
+        b = engines.encode_sequence(seq2)
+        
+        if self.affine:
+            score, _ = engines.gotoh_fill(
+                a, b,
+                self.match_score,
+                self.mismatch_score,
+                self.gap_open,
+                self.gap_extend,
+                traceback=False
+            )
+            return score
+        
+        return engines.nw_score(
+            a, b,
+            self.match_score,
+            self.mismatch_score,
+            self.gap_penalty
+        )
+    
+    def _cache_key(self, kind: str, seq1: str, seq2: str) -> str:
+        """
+        Content address of a request for the result cache.
+        
+        Args:
+            kind (str): 'align' or 'score'
+            seq1 (str): First prepared sequence
+            seq2 (str): Second prepared sequence
+            
+        Returns:
+            str: Key covering the sequences, engine (name and output
+                version), scoring parameters and, for 'banded', the band
+                tolerance
+        """
+        version = engines.ENGINE_VERSIONS[self.engine]
+        if self.engine == 'pairwise2':
+            import Bio
+            version = (version, Bio.__version__)
+        # The initial band can pick a different co-optimal alignment
+        band = self.band_tolerance if self.engine == 'banded' else None
+        params = (self.engine, version, self.match_score, self.mismatch_score,
+                  self.gap_open, self.gap_extend, band)
+        return cache_key(kind, seq1, seq2, params)
+    
+    def _prepare(self, seq1: str, seq2: str) -> Tuple[str, str]:
+        """
+        Uppercase both sequences and reject empty input.
+        
+        PackedSequence input is already uppercase and is passed through
+        unchanged, so the engines unpack it directly without a str copy.
+        
+        Args:
+            seq1 (str or PackedSequence): First sequence
+            seq2 (str or PackedSequence): Second sequence
+            
+        Returns:
+            tuple: (seq1, seq2) in uppercase
+            
+        Raises:
+            ValueError: If either sequence is empty
+        """
+        seq1 = _uppercase(seq1)
+        seq2 = _uppercase(seq2)
+        
+        if not seq1 or not seq2:
+            raise ValueError("No alignment found: empty sequence")
+        
+        return seq1, seq2
+    
+    def _align_pairwise2(self, seq1: str, seq2: str) -> Tuple[str, str, float, int]:
+        """
+        Align two uppercase sequences with BioPython's globalms.
+        
+        Args:
+            seq1 (str): First sequence
+            seq2 (str): Second sequence
+            
+        Returns:
+            tuple: (aligned_seq1, aligned_seq2, score, cells)
+        """
+        # BioPython is only needed by this engine; import it on first use
+        import Bio.pairwise2 as pairwise2
         
-        # Perform alignment using BioPython's globalms
         alignments = pairwise2.align.globalms(
             seq1, seq2,
             self.match_score,      # Match score
             self.mismatch_score,   # Mismatch penalty
-            self.gap_penalty,      # Gap open penalty
-            self.gap_penalty       # Gap extension penalty
+            self.gap_open,         # Gap open penalty
+            self.gap_extend,       # Gap extension penalty
+            one_alignment_only=True
         )
         
         if not alignments:
             raise ValueError("No alignment found")
         
-        # Get best alignment (highest score)
-        best_alignment = alignments[0]
-        aligned_seq1, aligned_seq2, score, begin, end = best_alignment
-        
-        # Calculate statistics
-        stats = self._calculate_statistics(aligned_seq1, aligned_seq2, score)
-        
-        return {
-            'aligned_seq1': aligned_seq1,
-            'aligned_seq2': aligned_seq2,
-            'score': score,
-            'matches': stats['matches'],
-            'mismatches': stats['mismatches'],
-            'gaps': stats['gaps'],
-            'gaps_seq1': stats['gaps_seq1'],
-            'gaps_seq2': stats['gaps_seq2'],
-            'identity': stats['identity'],
-            'length': stats['length'],
-            'alignment_stats': stats
-        }
+        aligned_seq1, aligned_seq2, score, begin, end = alignments[0]
+        return aligned_seq1, aligned_seq2, score, len(seq1) * len(seq2)
     
     def _calculate_statistics(self, aligned_seq1: str, aligned_seq2: str, 
                              score: float) -> Dict:
@@ -116,39 +544,16 @@ class NWAligner:
         Returns:
             dict: Statistics dictionary with computed metrics
         """
-        length = len(aligned_seq1)
-        matches = sum(1 for s1, s2 in zip(aligned_seq1, aligned_seq2) if s1 == s2)
-        gaps_seq1 = aligned_seq1.count('-')
-        gaps_seq2 = aligned_seq2.count('-')
-        total_gaps = gaps_seq1 + gaps_seq2
-        
-        # Mismatches = positions that differ (excluding gaps)
-        mismatches = sum(
-            1 for s1, s2 in zip(aligned_seq1, aligned_seq2) 
-            if s1 != s2 and s1 != '-' and s2 != '-'
-        )
-        
-        identity = (matches / length * 100) if length > 0 else 0
-        gap_percentage = (total_gaps / (length * 2) * 100) if length > 0 else 0
-        
-        return {
-            'matches': matches,
-            'mismatches': mismatches,
-            'gaps': total_gaps,
-            'gaps_seq1': gaps_seq1,
-            'gaps_seq2': gaps_seq2,
-            'identity': identity,
-            'length': length,
-            'score': score,
-            'gap_percentage': gap_percentage,
-            'match_percentage': (matches / length * 100) if length > 0 else 0,
-            'mismatch_percentage': (mismatches / length * 100) if length > 0 else 0
-        }
+        counts = engines.alignment_counts(aligned_seq1, aligned_seq2)
+        return build_statistics(length=len(aligned_seq1), score=score, **counts)
     
     def format_alignment(self, result: Dict, line_width: int = 60) -> str:
         """
         Format alignment result for display.
         
+        Builds the whole report in memory; use write_alignment() to
+        stream long alignments to a file instead.
+        
         Args:
             result (dict): Alignment result from align()
             line_width (int): Number of characters per line
@@ -156,39 +561,29 @@ class NWAligner:
         Returns:
             str: Formatted alignment string
         """
-        seq1 = result['aligned_seq1']
-        seq2 = result['aligned_seq2']
-        
-        output = []
-        output.append("=" * 100)
-        output.append("PAIRWISE ALIGNMENT")
-        output.append("=" * 100)
-        output.append("")
-        
-        for i in range(0, len(seq1), line_width):
-            seq1_block = seq1[i:i+line_width]
-            seq2_block = seq2[i:i+line_width]
-            
-            # Create match indicator line
-            match_line = ""
-            for s1, s2 in zip(seq1_block, seq2_block):
-                if s1 == s2:
-                    match_line += "|"
-                elif s1 == "-" or s2 == "-":
-                    match_line += " "
-                else:
-                    match_line += "."
-            
-            output.append(f"Seq1: {seq1_block}")
-            output.append(f"      {match_line}")
-            output.append(f"Seq2: {seq2_block}")
-            output.append("")
+        buffer = io.StringIO()
+        self.write_alignment(result, buffer, line_width)
+        return buffer.getvalue()
+    
+    def write_alignment(self, result: Dict, handle: TextIO, line_width: int = 60):
+        """
+        Write the format_alignment() report to an open text file.
         
-        output.append("=" * 100)
-        output.append("Legend: | = match, . = mismatch, (space) = gap")
-        output.append("=" * 100)
+        Blocks are rendered lazily (see utils.iter_alignment_blocks), so
+        memory use does not grow with the alignment length.
         
-        return "\n".join(output)
+        Args:
+            result (dict): Alignment result from align()
+            handle (file): Writable text file handle
+            line_width (int): Number of characters per line
+        """
+        handle.write("=" * 100 + "\n")
+        handle.write("PAIRWISE ALIGNMENT\n")
+        handle.write("=" * 100 + "\n\n")
+        write_alignment_blocks(result, handle, line_width)
+        handle.write("=" * 100 + "\n")
+        handle.write("Legend: | = match, . = mismatch, (space) = gap\n")
+        handle.write("=" * 100)
     
     def save_result_json(self, result: Dict, output_file: str):
         """
@@ -199,7 +594,7 @@ class NWAligner:
             output_file (str): Path to output JSON file
         """
         with open(output_file, 'w') as f:
-            json.dump(result, f, indent=2)
+            json.dump(dict(result), f, indent=2)
     
     def save_result_text(self, result: Dict, output_file: str, 
                         seq1_id: str = "Seq1", seq2_id: str = "Seq2"):
@@ -214,7 +609,7 @@ class NWAligner:
         """
         stats = result['alignment_stats']
         
-        with open(output_file, 'w') as f:
+        with open(output_file, 'w', buffering=1 << 20) as f:
             f.write("=" * 80 + "\n")
             f.write("NEEDLEMAN-WUNSCH ALIGNMENT RESULT\n")
             f.write("=" * 80 + "\n\n")
@@ -234,4 +629,115 @@ class NWAligner:
             
             f.write("ALIGNMENT\n")
             f.write("-" * 80 + "\n\n")
-            f.write(self.format_alignment(result))
+            self.write_alignment(result, f)
+
+
+def _uppercase(seq):
+    """
+    Uppercase a sequence, returning the same object when it already is.
+    
+    Results reference their input sequences, so reusing the caller's
+    object keeps e.g. a batch reference shared instead of copied per
+    result. PackedSequence input is always uppercase.
+    """
+    if isinstance(seq, PackedSequence):
+        return seq
+    seq = str(seq)
+    upper = seq.upper()
+    return seq if upper == seq else upper
+
+
+def _submit_window(executor: ProcessPoolExecutor, function: Callable, tasks: Iterator,
+                   window: int, ordered: bool) -> Iterator:
+    """
+    Run function over tasks with at most window of them submitted.
+    
+    Unlike Executor.map(), which submits every task up front, the next
+    task is only taken from the iterator once an earlier one is yielded.
+    
+    Args:
+        executor (ProcessPoolExecutor): Pool whose workers hold the state
+            function needs, e.g. _init_worker() for _align_task()
+        function (callable): Picklable task function
+        tasks (iterator): Arguments of function, one per task
+        window (int): Maximum number of submitted, unyielded tasks
+        ordered (bool): Yield in task order (True) or by completion
+        
+    Yields:
+        Return values of function
+    """
+    pending = deque() if ordered else set()
+    for task in tasks:
+        if len(pending) >= window:
+            if ordered:
+                yield pending.popleft().result()
+            else:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        future = executor.submit(function, task)
+        if ordered:
+            pending.append(future)
+        else:
+            pending.add(future)
+    
+    if ordered:
+        while pending:
+            yield pending.popleft().result()
+    else:
+        for future in as_completed(pending):
+            yield future.result()
+
+
+# Per-process state for NWAligner.align_many() workers, set once by
+# _init_worker() so tasks do not carry the aligner or the reference.
+_worker_state = {}
+
+
+def _init_worker(aligner: NWAligner, reference: Optional[str],
+                 min_identity: Optional[float]):
+    """Store the shared aligner and reference in a pool worker."""
+    _worker_state['aligner'] = aligner
+    _worker_state['reference'] = reference
+    _worker_state['min_identity'] = min_identity
+
+
+def _align_task(task: Tuple[int, object]) -> Tuple[int, Optional[Dict], Optional[Exception]]:
+    """Align one (index, item) task inside a pool worker."""
+    index, item = task
+    reference = _worker_state['reference']
+    index, result, error = _align_item(_worker_state['aligner'], reference,
+                                       _worker_state['min_identity'], index, item)
+    if result is not None and reference is not None:
+        # The parent holds the reference already; do not pickle it back
+        result._seq1 = None
+    return index, result, error
+
+
+def _align_item(aligner: NWAligner, reference: Optional[str],
+                min_identity: Optional[float], index: int,
+                item) -> Tuple[int, Optional[Dict], Optional[Exception]]:
+    """
+    Align one align_many() item, capturing any error.
+    
+    Args:
+        aligner (NWAligner): Configured aligner
+        reference (str, optional): Shared first sequence
+        min_identity (float, optional): Prefilter cutoff (%)
+        index (int): Position of the item in the input
+        item: (seq1, seq2) tuple, or seq2 when reference is given
+        
+    Returns:
+        tuple: (index, result, error)
+    """
+    try:
+        seq1, seq2 = (reference, item) if reference is not None else item
+        
+        if min_identity is not None:
+            _, max_identity = identity_bounds(seq1, seq2)
+            if max_identity < min_identity:
+                raise BelowIdentityCutoff(max_identity, min_identity)
+        
+        return index, aligner.align(seq1, seq2), None
+    except Exception as e:
+        return index, None, e
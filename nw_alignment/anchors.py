@@ -0,0 +1,287 @@
+"""
+Anchor-and-Chain Global Alignment
+
+Aligns long, closely related sequences (e.g. two genomes) without
+filling the full m x n DP matrix: exact matches that occur once in each
+sequence are used as anchors, the largest collinear chain of anchors is
+kept, and only the stretches between consecutive anchors are aligned
+with the exact NW engines. The stretches are independent, so they can
+be aligned in parallel.
+"""
+
+from typing import List, Optional, Tuple
+import time
+
+import numpy as np
+
+from . import profiling
+from .result import AlignmentResult, _CIGAR_RUN
+from .sketch import pack_kmers
+
+
+# (start in seq1, start in seq2, length) of an exact match
+Anchor = Tuple[int, int, int]
+
+
+def find_anchors(seq1, seq2, k: int = 21) -> np.ndarray:
+    """
+    Find exact matches seeded by k-mers that are unique in both sequences.
+
+    A k-mer occurring exactly once in seq1 and once in seq2 marks an
+    unambiguous match; overlapping or adjacent seeds on the same diagonal
+    are merged into one longer anchor. Only the forward strand is used.
+
+    Args:
+        seq1 (str or PackedSequence): First nucleotide sequence
+        seq2 (str or PackedSequence): Second nucleotide sequence
+        k (int): Seed length, 1 to 31. Default is 21.
+
+    Returns:
+        np.ndarray: (n, 3) int64 array of (i, j, length) anchors, sorted
+        by i
+
+    Example:
+        >>> find_anchors("TTACGTACCA", "GACGTACG", k=4)
+        array([[1, 4, 4],
+               [2, 1, 6]])
+    """
+    unique = []
+    for seq in (seq1, seq2):
+        kmers, valid = pack_kmers(seq, k)
+        positions = np.flatnonzero(valid)
+        values, first, counts = np.unique(kmers[positions], return_index=True,
+                                          return_counts=True)
+        once = counts == 1
+        unique.append((values[once], positions[first[once]]))
+
+    (values1, positions1), (values2, positions2) = unique
+    _, index1, index2 = np.intersect1d(values1, values2, assume_unique=True,
+                                       return_indices=True)
+    if index1.size == 0:
+        return np.zeros((0, 3), dtype=np.int64)
+
+    i = positions1[index1].astype(np.int64)
+    j = positions2[index2].astype(np.int64)
+    diagonal = i - j
+    order = np.lexsort((i, diagonal))
+    i, diagonal = i[order], diagonal[order]
+
+    # A new anchor starts wherever the diagonal changes or seeds stop overlapping
+    starts = np.ones(i.size, dtype=bool)
+    starts[1:] = (diagonal[1:] != diagonal[:-1]) | (np.diff(i) > k)
+    first = np.flatnonzero(starts)
+    last = np.append(first[1:], i.size) - 1
+
+    anchors = np.column_stack((i[first], i[first] - diagonal[first],
+                               i[last] - i[first] + k))
+    return anchors[np.argsort(anchors[:, 0], kind='stable')]
+
+
+def chain_anchors(anchors: np.ndarray) -> np.ndarray:
+    """
+    Select the heaviest collinear, non-overlapping chain of anchors.
+
+    Each anchor weighs its length; an anchor can follow another when it
+    starts after the other ends in both sequences. The chain is found in
+    O(n log n) with a Fenwick tree of the best chain ending at or before
+    each seq2 position.
+
+    Args:
+        anchors (np.ndarray): (n, 3) array of (i, j, length), see
+            find_anchors()
+
+    Returns:
+        np.ndarray: The chained anchors, in order along both sequences
+    """
+    n = len(anchors)
+    if n == 0:
+        return anchors
+
+    i, j, length = (anchors[:, c].tolist() for c in range(3))
+    j_end = anchors[:, 1] + anchors[:, 2]
+    ends = np.unique(j_end)
+    end_rank = (np.searchsorted(ends, j_end) + 1).tolist()
+    by_start = sorted(range(n), key=lambda a: i[a])
+    by_end = sorted(range(n), key=lambda a: i[a] + length[a])
+
+    # tree[r] holds (best chain weight, anchor) over a range of end ranks
+    tree = [(0, -1)] * (len(ends) + 1)
+    weight = [0] * n
+    previous = [-1] * n
+    inserted = 0
+
+    for a in by_start:
+        # Anchors ending before a starts in seq1 become available; each
+        # started earlier, so its weight is final
+        while inserted < n and i[by_end[inserted]] + length[by_end[inserted]] <= i[a]:
+            b = by_end[inserted]
+            r = end_rank[b]
+            while r <= len(ends):
+                if weight[b] > tree[r][0]:
+                    tree[r] = (weight[b], b)
+                r += r & -r
+            inserted += 1
+
+        # Best available chain ending at or before a starts in seq2
+        best = (0, -1)
+        r = int(np.searchsorted(ends, j[a], side='right'))
+        while r > 0:
+            if tree[r][0] > best[0]:
+                best = tree[r]
+            r -= r & -r
+        weight[a] = best[0] + length[a]
+        previous[a] = best[1]
+
+    chain = []
+    a = max(range(n), key=weight.__getitem__)
+    while a != -1:
+        chain.append(a)
+        a = previous[a]
+    return anchors[chain[::-1]]
+
+
+def anchor_chain(seq1, seq2, k: int = 21, min_k: int = 11,
+                 max_cells: int = 1_000_000) -> List[Anchor]:
+    """
+    Chain anchors, re-anchoring inside stretches that are still large.
+
+    A k-mer repeated elsewhere in the sequences may be unique within one
+    stretch between chained anchors, and an anchor left out of the chain
+    because it overlaps a chained one by a few residues still matches
+    once trimmed. Stretches of more than max_cells DP cells are therefore
+    searched again on their own, with k lowered by 4 (down to min_k)
+    whenever a search finds nothing.
+
+    Args:
+        seq1 (str or PackedSequence): First nucleotide sequence
+        seq2 (str or PackedSequence): Second nucleotide sequence
+        k (int): Seed length. Default is 21.
+        min_k (int): Smallest seed length for re-anchoring. Default is 11.
+        max_cells (int): Re-anchor stretches larger than this. Default
+            is 1,000,000.
+
+    Returns:
+        list: (i, j, length) anchors, collinear and non-overlapping
+    """
+    chain = []
+    _chain_region(str(seq1), str(seq2), 0, 0, k, min_k, max_cells, chain)
+    return chain
+
+
+def _chain_region(seq1: str, seq2: str, offset1: int, offset2: int, k: int,
+                  min_k: int, max_cells: int, chain: List[Anchor]):
+    """Append the anchor chain of seq1 vs seq2 (shifted by the offsets) to chain."""
+    anchors = chain_anchors(find_anchors(seq1, seq2, k))
+    if len(anchors) == 0:
+        if k > min_k and len(seq1) * len(seq2) > max_cells:
+            _chain_region(seq1, seq2, offset1, offset2, max(min_k, k - 4),
+                          min_k, max_cells, chain)
+        return
+
+    end1 = end2 = 0
+    for i, j, length in anchors.tolist() + [(len(seq1), len(seq2), 0)]:
+        if (i - end1) * (j - end2) > max_cells:
+            _chain_region(seq1[end1:i], seq2[end2:j], offset1 + end1,
+                          offset2 + end2, k, min_k, max_cells, chain)
+        if length:
+            chain.append((offset1 + i, offset2 + j, length))
+        end1, end2 = i + length, j + length
+
+
+def gap_segments(seq1, seq2, chain: List[Anchor]) -> List[Tuple[str, str]]:
+    """
+    Cut out the stretches before, between and after the chained anchors.
+
+    Args:
+        seq1 (str or PackedSequence): First sequence
+        seq2 (str or PackedSequence): Second sequence
+        chain (list): (i, j, length) anchors, see anchor_chain()
+
+    Returns:
+        list: len(chain) + 1 (seq1 part, seq2 part) pairs; either part
+        may be empty
+    """
+    segments = []
+    end1 = end2 = 0
+    for i, j, length in list(chain) + [(len(seq1), len(seq2), 0)]:
+        segments.append((seq1[end1:i], seq2[end2:j]))
+        end1, end2 = i + length, j + length
+    return segments
+
+
+def anchored_align(aligner, seq1, seq2, k: int = 21, min_k: int = 11,
+                   max_cells: int = 1_000_000,
+                   workers: Optional[int] = 1) -> AlignmentResult:
+    """
+    Globally align two long sequences through a chain of exact anchors.
+
+    See NWAligner.align_anchored(), which prepares the sequences and
+    calls this function.
+
+    Args:
+        aligner (NWAligner): Aligner used for the segments and scoring
+        seq1 (str or PackedSequence): First prepared sequence
+        seq2 (str or PackedSequence): Second prepared sequence
+        k, min_k, max_cells: See anchor_chain()
+        workers (int, optional): Processes aligning the segments, see
+            NWAligner.align_many(). Default is 1.
+
+    Returns:
+        AlignmentResult: The stitched alignment
+    """
+    start = time.perf_counter()
+    with profiling.phase('anchors'):
+        chain = anchor_chain(seq1, seq2, k, min_k, max_cells)
+    segments = gap_segments(seq1, seq2, chain)
+
+    # Segments with an empty side are a single gap; the engines need both
+    pending = [(n, pair) for n, pair in enumerate(segments) if pair[0] and pair[1]]
+    segment_runs = [_gap_runs(len(part1), len(part2)) for part1, part2 in segments]
+    score = sum(_gap_score(aligner, len(part1) + len(part2))
+                for part1, part2 in segments if not (part1 and part2))
+
+    outputs = aligner.align_many((pair for _, pair in pending), workers=workers)
+    for index, result, error in outputs:
+        if error is not None:
+            raise error
+        segment_runs[pending[index][0]] = [(int(n), op) for n, op in
+                                           _CIGAR_RUN.findall(result.cigar)]
+        score += result.score
+
+    runs = []
+    for n, segment in enumerate(segment_runs):
+        runs.extend(segment)
+        if n < len(chain):
+            runs.append((chain[n][2], '='))
+    score += aligner.match_score * sum(length for _, _, length in chain)
+
+    result = AlignmentResult(seq1, seq2, _merge_runs(runs), score)
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def _gap_runs(length1: int, length2: int) -> List[Tuple[int, str]]:
+    """CIGAR runs of a segment with at most one non-empty side."""
+    if length1 and not length2:
+        return [(length1, 'D')]
+    if length2 and not length1:
+        return [(length2, 'I')]
+    return []
+
+
+def _gap_score(aligner, length: int) -> float:
+    """Score of one gap of the given length (0 for no gap)."""
+    if length == 0:
+        return 0
+    return aligner.gap_open + (length - 1) * aligner.gap_extend
+
+
+def _merge_runs(runs: List[Tuple[int, str]]) -> List[Tuple[int, str]]:
+    """Join adjacent runs of the same operation."""
+    merged = []
+    for n, op in runs:
+        if merged and merged[-1][1] == op:
+            merged[-1] = (merged[-1][0] + n, op)
+        else:
+            merged.append((n, op))
+    return merged
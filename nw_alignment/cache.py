@@ -0,0 +1,196 @@
+"""
+Alignment Result Cache
+
+Content-addressed storage for alignment results, with an in-memory LRU
+tier in front of an optional on-disk tier.
+"""
+
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+import hashlib
+import json
+import os
+
+
+# Bump when the cached result layout changes; old entries then simply
+# stop matching. Engine output changes are covered by the engine version
+# in the key parameters (engines.ENGINE_VERSIONS).
+CACHE_FORMAT = 2
+
+
+def cache_key(kind: str, seq1: str, seq2: str, params: tuple) -> str:
+    """
+    Hash a request into a content address.
+
+    Args:
+        kind (str): What is cached, e.g. 'align' or 'score'
+        seq1 (str): First sequence (already uppercased)
+        seq2 (str): Second sequence (already uppercased)
+        params (tuple): Engine name and version, and scoring parameters
+
+    Returns:
+        str: Hex digest identifying the result
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    header = repr((CACHE_FORMAT, kind, params, len(seq1), len(seq2)))
+    digest.update(header.encode())
+    digest.update(str(seq1).encode('ascii'))
+    digest.update(b'\0')
+    digest.update(str(seq2).encode('ascii'))
+    return digest.hexdigest()
+
+
+class AlignmentCache:
+    """
+    Two-tier cache of alignment results keyed by cache_key().
+
+    Results are held as JSON text, so every hit returns a fresh dict that
+    callers may modify. The memory tier keeps the most recently used
+    entries up to max_memory_entries. With cache_dir set, entries are
+    also written there as one file each; when the directory grows beyond
+    max_disk_bytes the least recently used files are deleted. A pickled
+    cache (e.g. sent to pool workers) keeps its directory and limits but
+    starts with an empty memory tier.
+
+    Args:
+        cache_dir (str, optional): Directory for the on-disk tier.
+            None keeps the cache in memory only.
+        max_memory_entries (int): Size of the LRU tier. Default is 1024.
+        max_disk_bytes (int): Size budget of the on-disk tier.
+            Default is 1 GB.
+
+    Example:
+        >>> cache = AlignmentCache("~/.cache/nw_alignment")
+        >>> aligner = NWAligner(cache=cache)
+        >>> aligner.align(seq1, seq2)   # computed
+        >>> aligner.align(seq1, seq2)   # served from cache
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None,
+                 max_memory_entries: int = 1024,
+                 max_disk_bytes: int = 1 << 30):
+        self.cache_dir = Path(cache_dir).expanduser() if cache_dir else None
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.hits = 0
+        self.misses = 0
+        self._memory: 'OrderedDict[str, str]' = OrderedDict()
+        self._disk_bytes = 0
+
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._disk_bytes = sum(path.stat().st_size for path in self._disk_files())
+
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        Look up a result.
+
+        Args:
+            key (str): Key from cache_key()
+
+        Returns:
+            dict or None: A copy of the cached result, or None on a miss
+        """
+        text = self._memory.get(key)
+        if text is not None:
+            self._memory.move_to_end(key)
+        elif self.cache_dir is not None:
+            path = self._path(key)
+            try:
+                text = path.read_text()
+                os.utime(path)
+            except OSError:
+                text = None
+            if text is not None:
+                self._remember(key, text)
+
+        if text is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(text)
+
+    def put(self, key: str, result: Dict):
+        """
+        Store a result in both tiers.
+
+        Args:
+            key (str): Key from cache_key()
+            result (dict): JSON-serializable alignment result
+        """
+        text = json.dumps(result)
+        self._remember(key, text)
+
+        if self.cache_dir is None:
+            return
+
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+        # Write then rename so readers in other processes never see a partial file
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(text)
+        try:
+            # An overwritten entry no longer takes up its old size
+            self._disk_bytes -= path.stat().st_size
+        except OSError:
+            pass
+        os.replace(tmp, path)
+        self._disk_bytes += path.stat().st_size
+
+        if self._disk_bytes > self.max_disk_bytes:
+            self._evict()
+
+    def clear(self):
+        """Remove every entry from both tiers."""
+        self._memory.clear()
+        if self.cache_dir is not None:
+            for path in self._disk_files():
+                path.unlink(missing_ok=True)
+            self._disk_bytes = 0
+
+    def __getstate__(self):
+        # Pool workers get the directory and limits, not the memory tier
+        return (self.cache_dir, self.max_memory_entries, self.max_disk_bytes,
+                self._disk_bytes)
+
+    def __setstate__(self, state):
+        (self.cache_dir, self.max_memory_entries, self.max_disk_bytes,
+         self._disk_bytes) = state
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+
+    def _remember(self, key: str, text: str):
+        """Insert into the memory tier, dropping the least recently used entry."""
+        self._memory[key] = text
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _path(self, key: str) -> Path:
+        """Shard files by the first two hex digits to keep directories small."""
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def _disk_files(self):
+        return self.cache_dir.glob('*/*.json')
+
+    def _evict(self):
+        """Delete least recently used files until the tier is 10% under budget."""
+        entries = []
+        for path in self._disk_files():
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        total = sum(size for _, size, _ in entries)
+        target = self.max_disk_bytes * 0.9
+        for _, size, path in entries:
+            if total <= target:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+        self._disk_bytes = total
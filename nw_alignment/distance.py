@@ -0,0 +1,247 @@
+"""
+All-vs-All Alignment Matrices
+
+Aligns every pair of a sequence set once and stores the identity and
+score matrices as memory-mappable .npy files, with checkpoints so an
+interrupted run resumes where it stopped.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+import os
+
+import numpy as np
+
+from .alignment import NWAligner, _submit_window
+
+
+# File names inside the output directory
+IDENTITY_FILE = 'identity.npy'
+SCORE_FILE = 'score.npy'
+IDS_FILE = 'ids.txt'
+
+
+def _open_matrix(path: Path, n: int, dtype, resume: bool) -> np.memmap:
+    """
+    Open an existing n x n matrix for update, or create one filled with NaN.
+
+    Raises:
+        ValueError: If resuming and the existing file is not an n x n
+            matrix of dtype (e.g. written by another version or edited)
+    """
+    if resume and path.exists():
+        matrix = np.load(path, mmap_mode='r+')
+        if matrix.shape != (n, n) or matrix.dtype != np.dtype(dtype):
+            found = f"{matrix.shape} {matrix.dtype}"
+            del matrix
+            raise ValueError(
+                f"Cannot resume from {path}: expected a ({n}, {n}) "
+                f"{np.dtype(dtype)} matrix, found {found}. Remove it or "
+                f"pass resume=False to start over"
+            )
+        return matrix
+    matrix = np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=(n, n))
+    matrix[:] = np.nan
+    return matrix
+
+
+def _pending_pairs(score: np.ndarray) -> Iterator[Tuple[int, int]]:
+    """Yield the (i, j), i <= j, pairs whose score is still missing."""
+    for i in range(score.shape[0]):
+        for j in np.flatnonzero(np.isnan(score[i, i:])) + i:
+            yield i, int(j)
+
+
+# Per-process state for all_vs_all() workers, set once by _init_worker()
+# so tasks carry only a pair of indices.
+_worker_state = {}
+
+
+def _init_worker(aligner: NWAligner, sequences: Sequence):
+    """Store the aligner and every sequence in a pool worker."""
+    _worker_state['aligner'] = aligner
+    _worker_state['sequences'] = sequences
+
+
+def _pair_task(pair: Tuple[int, int]) -> Tuple[int, int, float, float, Optional[Exception]]:
+    """Align one pair inside a pool worker."""
+    return _align_pair(_worker_state['aligner'], _worker_state['sequences'], *pair)
+
+
+def _align_pair(aligner: NWAligner, sequences: Sequence, i: int,
+                j: int) -> Tuple[int, int, float, float, Optional[Exception]]:
+    """
+    Score one pair, keeping only the numbers the matrices need.
+
+    The diagonal is a sequence against itself: identity is 100% and only
+    the score is computed, see _self_score().
+
+    Returns:
+        tuple: (i, j, score, identity, error)
+    """
+    try:
+        if i == j:
+            return i, j, _self_score(aligner, sequences[i]), 100.0, None
+        result = aligner.align(sequences[i], sequences[j])
+        return i, j, result['score'], result['identity'], None
+    except Exception as e:
+        return i, j, np.nan, np.nan, e
+
+
+def _self_score(aligner: NWAligner, seq) -> float:
+    """
+    Score a sequence against itself.
+
+    When a match scores at least as much as a mismatch and as zero, and
+    no gap scores above zero, matching every residue is optimal, so the
+    score is len(seq) * match without a DP. Other schemes are aligned.
+    """
+    if (aligner.match_score >= max(aligner.mismatch_score, 0)
+            and max(aligner.gap_open, aligner.gap_extend) <= 0):
+        if not len(seq):
+            raise ValueError("No alignment found: empty sequence")
+        return float(len(seq) * aligner.match_score)
+    return aligner.score(seq, seq)
+
+
+def all_vs_all(ids: List[str], sequences: Sequence, output_dir: str,
+               aligner: Optional[NWAligner] = None, workers: Optional[int] = 1,
+               checkpoint_every: int = 1000, resume: bool = True,
+               log: Optional[Callable[[str], None]] = None) -> Dict:
+    """
+    Align every pair of sequences once and write the matrices to disk.
+
+    Only the upper triangle (including the diagonal) is aligned; each
+    value is written to both halves of the symmetric matrices. Results
+    are reduced to a score and an identity as soon as they arrive, and
+    the matrices live in memory-mapped .npy files, so memory use does
+    not grow with the number of pairs.
+
+    The matrices are flushed every checkpoint_every pairs. Missing
+    entries are NaN, so with resume a later call on the same output
+    directory and ids only aligns the pairs that are still missing
+    (including pairs that failed).
+
+    Output files in output_dir:
+        - identity.npy: float32 identity (%) matrix
+        - score.npy: float64 alignment score matrix
+        - ids.txt: Sequence ids, one per line, in matrix order
+
+    Args:
+        ids (list): Sequence identifiers
+        sequences (sequence): Sequences, in the same order as ids
+        output_dir (str): Directory for the matrix files
+        aligner (NWAligner, optional): Configured aligner. Defaults to
+            NWAligner().
+        workers (int, optional): Number of processes. 1 aligns in the
+            current process; None or 0 uses every CPU. Default is 1.
+        checkpoint_every (int): Pairs between flushes to disk. Default
+            is 1000.
+        resume (bool): Continue from matrices already in output_dir when
+            they were written for the same ids. Default is True.
+        log (callable, optional): Called with a progress message after
+            each checkpoint
+
+    Returns:
+        dict: 'aligned' (pairs aligned by this call), 'failed' (pairs
+        that raised) and 'errors' (up to 10 (id1, id2, message) tuples)
+
+    Raises:
+        ValueError: If ids and sequences differ in length or ids repeat,
+            or if resumed matrices do not have the expected shape and dtype
+
+    Example:
+        >>> all_vs_all(ids, seqs, "output/matrix", workers=8)
+        >>> identity = load_matrices("output/matrix")['identity']
+        >>> distance = 1 - identity / 100
+    """
+    if len(ids) != len(sequences):
+        raise ValueError("ids and sequences must have the same length")
+    if len(set(ids)) != len(ids):
+        raise ValueError("Sequence ids must be unique")
+
+    aligner = aligner or NWAligner()
+    n = len(ids)
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+
+    # Matrices from another sequence set cannot be resumed
+    ids_path = output_path / IDS_FILE
+    resume = resume and ids_path.exists() and ids_path.read_text().splitlines() == list(ids)
+    ids_path.write_text("".join(f"{seq_id}\n" for seq_id in ids))
+
+    identity = _open_matrix(output_path / IDENTITY_FILE, n, np.float32, resume)
+    score = _open_matrix(output_path / SCORE_FILE, n, np.float64, resume)
+
+    pending = _pending_pairs(score)
+    total = sum(1 for _ in _pending_pairs(score))
+    stats = {'aligned': 0, 'failed': 0, 'errors': []}
+
+    if not workers:
+        workers = os.cpu_count() or 1
+    executor = (ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                    initargs=(aligner, sequences))
+                if workers > 1 and total > 1 else None)
+
+    def checkpoint():
+        identity.flush()
+        score.flush()
+        if log is not None:
+            done = stats['aligned'] + stats['failed']
+            log(f"{done}/{total} pairs ({done / total * 100:.1f}%)")
+
+    try:
+        if executor is None:
+            outputs = (_align_pair(aligner, sequences, i, j) for i, j in pending)
+        else:
+            # A bounded window of pairs stays in flight across checkpoints,
+            # so no checkpoint waits for the slowest pair of a batch
+            outputs = _submit_window(executor, _pair_task, pending, workers * 4,
+                                     ordered=False)
+
+        since_checkpoint = 0
+        for i, j, pair_score, pair_identity, error in outputs:
+            if error is not None:
+                stats['failed'] += 1
+                if len(stats['errors']) < 10:
+                    stats['errors'].append((ids[i], ids[j], str(error)))
+            else:
+                score[i, j] = score[j, i] = pair_score
+                identity[i, j] = identity[j, i] = pair_identity
+                stats['aligned'] += 1
+
+            since_checkpoint += 1
+            if since_checkpoint == checkpoint_every:
+                checkpoint()
+                since_checkpoint = 0
+        if since_checkpoint:
+            checkpoint()
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        identity.flush()
+        score.flush()
+
+    return stats
+
+
+def load_matrices(output_dir: str, mmap: bool = True) -> Dict:
+    """
+    Load the matrices written by all_vs_all().
+
+    Args:
+        output_dir (str): Directory passed to all_vs_all()
+        mmap (bool): Memory-map the matrices read-only instead of reading
+            them into memory. Default is True.
+
+    Returns:
+        dict: 'ids' (list), 'identity' and 'score' (n x n arrays)
+    """
+    output_path = Path(output_dir)
+    mode = 'r' if mmap else None
+    return {
+        'ids': (output_path / IDS_FILE).read_text().splitlines(),
+        'identity': np.load(output_path / IDENTITY_FILE, mmap_mode=mode),
+        'score': np.load(output_path / SCORE_FILE, mmap_mode=mode),
+    }
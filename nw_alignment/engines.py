@@ -0,0 +1,1116 @@
+"""
+Dynamic Programming Engines
+
+NumPy implementations of the Needleman-Wunsch recurrences used by
+NWAligner. Sequences are handled as uint8 byte arrays so that a whole
+anti-diagonal of the score matrix can be filled with a handful of
+vectorized operations instead of one Python step per cell.
+"""
+
+from math import gcd
+from typing import Dict, Iterator, List, Tuple
+import numpy as np
+
+from .packed import PackedSequence
+
+
+# Traceback direction bits. A cell carries every bit whose predecessor
+# reaches the optimal score, so co-optimal paths can be recovered later.
+DIAG = 1   # consume one residue from both sequences
+UP = 2     # consume seq1 only (gap in seq2)
+LEFT = 4   # consume seq2 only (gap in seq1)
+
+# Extra bits used by the affine (Gotoh) engine: set when the gap at this
+# cell extends the previous gap instead of opening a new one.
+UP_EXTEND = 8
+LEFT_EXTEND = 16
+
+# Output version of each NWAligner engine, part of the result cache key.
+# Bump an engine's entry whenever a change can alter the alignment it
+# returns (e.g. tie-breaking), so cached results of the old code stop
+# matching. 'pairwise2' is also keyed on the installed Biopython version.
+ENGINE_VERSIONS = {'numpy': 1, 'hirschberg': 1, 'banded': 1, 'wfa': 1, 'pairwise2': 1}
+
+# Largest sub-problem (in cells) that hirschberg_align() solves with a
+# full traceback matrix: 4M cells is 4 MB of direction bits.
+HIRSCHBERG_BLOCK_CELLS = 1 << 22
+
+
+def encode_sequence(seq) -> np.ndarray:
+    """
+    Convert a sequence to a uint8 array of ASCII codes.
+
+    Args:
+        seq (str or PackedSequence): DNA/protein sequence
+
+    Returns:
+        np.ndarray: One byte per residue
+    """
+    if isinstance(seq, PackedSequence):
+        return seq.codes()
+    return np.frombuffer(str(seq).encode('ascii'), dtype=np.uint8)
+
+
+def _as_text(seq, codes: np.ndarray) -> str:
+    """Return seq as a str, decoding packed input from its unpacked codes."""
+    return seq if isinstance(seq, str) else codes.tobytes().decode('ascii')
+
+
+def score_dtype(params: Tuple, max_length: int) -> np.dtype:
+    """
+    Pick the narrowest dtype that holds every score of the DP matrix.
+
+    Integer parameters use int32 when the worst-case score fits and int64
+    otherwise; any fractional parameter switches to float64.
+
+    Args:
+        params (tuple): Scoring parameters (match, mismatch, gap scores)
+        max_length (int): Upper bound on the alignment length
+
+    Returns:
+        np.dtype: dtype for the score vectors
+    """
+    if not all(float(p).is_integer() for p in params):
+        return np.dtype(np.float64)
+    bound = max(abs(int(p)) for p in params) * (max_length + 1)
+    return np.dtype(np.int32 if bound < 2 ** 31 - 1 else np.int64)
+
+
+def nw_fill(a: np.ndarray, b: np.ndarray, match, mismatch,
+            gap) -> Tuple[float, List[np.ndarray]]:
+    """
+    Fill the linear-gap Needleman-Wunsch matrix one anti-diagonal at a time.
+
+    Every cell (i, j) on anti-diagonal d = i + j depends only on diagonals
+    d - 1 and d - 2, so each diagonal is computed with vector operations.
+    Only three score diagonals are kept; the traceback directions are
+    stored as one uint8 bitmask per interior cell.
+
+    Args:
+        a (np.ndarray): First sequence as uint8 codes (length m)
+        b (np.ndarray): Second sequence as uint8 codes (length n)
+        match: Score for identical residues
+        mismatch: Score for differing residues
+        gap: Score for each gap position
+
+    Returns:
+        tuple: (score, pointers) where pointers[d] holds the direction
+            bits of the interior cells of diagonal d, ordered by i from
+            max(1, d - n) to min(m, d - 1)
+    """
+    m, n = len(a), len(b)
+    dtype = score_dtype((match, mismatch, gap), m + n)
+    match, mismatch, gap = dtype.type(match), dtype.type(mismatch), dtype.type(gap)
+    b_rev = b[::-1].copy()
+
+    # Score diagonals indexed by i; only the valid range of each is read
+    prev2 = np.zeros(m + 1, dtype=dtype)
+    prev1 = np.zeros(m + 1, dtype=dtype)
+    cur = np.zeros(m + 1, dtype=dtype)
+    pointers = [np.empty(0, dtype=np.uint8)]
+
+    for d in range(1, m + n + 1):
+        ilo = max(1, d - n)
+        ihi = min(m, d - 1)
+
+        if ilo <= ihi:
+            subst = np.where(a[ilo - 1:ihi] == b_rev[n - d + ilo:n - d + ihi + 1],
+                             match, mismatch)
+            diag = prev2[ilo - 1:ihi] + subst
+            up = prev1[ilo - 1:ihi] + gap
+            left = prev1[ilo:ihi + 1] + gap
+
+            best = np.maximum(diag, up)
+            np.maximum(best, left, out=best)
+            cur[ilo:ihi + 1] = best
+
+            ptr = (diag == best).view(np.uint8)
+            ptr |= (up == best).view(np.uint8) << 1
+            ptr |= (left == best).view(np.uint8) << 2
+            pointers.append(ptr)
+        else:
+            pointers.append(np.empty(0, dtype=np.uint8))
+
+        # First row and first column
+        if d <= n:
+            cur[0] = gap * d
+        if d <= m:
+            cur[d] = gap * d
+
+        prev2, prev1, cur = prev1, cur, prev2
+
+    score = prev1[m] if m + n > 0 else 0
+    return float(score), pointers
+
+
+def nw_score_row(a: np.ndarray, b: np.ndarray, match, mismatch,
+                 gap) -> np.ndarray:
+    """
+    Compute the last row of the linear-gap matrix with two rows of memory.
+
+    Within a row, H[j] = max(D[j], H[j - 1] + gap) where D holds the
+    diagonal and vertical candidates. Unrolling the horizontal chain gives
+    H[j] = gap * j + max(D[k] - gap * k for k <= j), a running maximum
+    that np.maximum.accumulate evaluates in one vectorized pass.
+
+    Args:
+        a (np.ndarray): Sequence along the rows (length m)
+        b (np.ndarray): Sequence along the columns (length n)
+        match: Score for identical residues
+        mismatch: Score for differing residues
+        gap: Score for each gap position
+
+    Returns:
+        np.ndarray: Scores of cells (m, 0) .. (m, n)
+    """
+    m, n = len(a), len(b)
+    dtype = score_dtype((match, mismatch, gap), m + n)
+    gap = dtype.type(gap)
+
+    # One substitution row per distinct residue of a
+    codes, rows = np.unique(a, return_inverse=True)
+    profile = np.where(b[None, :] == codes[:, None], match, mismatch).astype(dtype)
+
+    ramp = np.arange(n + 1, dtype=dtype) * gap
+    prev = ramp.copy()
+    cur = np.empty_like(prev)
+    up = np.empty(n, dtype=dtype)
+
+    for i in range(1, m + 1):
+        np.add(prev[:-1], profile[rows[i - 1]], out=cur[1:])
+        np.add(prev[1:], gap, out=up)
+        np.maximum(cur[1:], up, out=cur[1:])
+        cur[0] = gap * i
+
+        cur -= ramp
+        np.maximum.accumulate(cur, out=cur)
+        cur += ramp
+        prev, cur = cur, prev
+
+    return prev
+
+
+def nw_score(a: np.ndarray, b: np.ndarray, match, mismatch, gap) -> float:
+    """
+    Compute the optimal global alignment score without a traceback.
+
+    The shorter sequence is laid along the columns, so memory use is
+    O(min(m, n)).
+
+    Args:
+        a (np.ndarray): First sequence as uint8 codes
+        b (np.ndarray): Second sequence as uint8 codes
+        match: Score for identical residues
+        mismatch: Score for differing residues
+        gap: Score for each gap position
+
+    Returns:
+        float: Optimal alignment score
+    """
+    if len(b) > len(a):
+        a, b = b, a
+    return float(nw_score_row(a, b, match, mismatch, gap)[-1])
+
+
+def nw_traceback(seq1: str, seq2: str,
+                 pointers: List[np.ndarray]) -> Tuple[str, str]:
+    """
+    Recover one optimal alignment from the direction bitmasks.
+
+    When several predecessors are optimal the step is chosen in the fixed
+    order DIAG, UP, LEFT, so the result is deterministic.
+
+    Args:
+        seq1 (str): First sequence
+        seq2 (str): Second sequence
+        pointers (list): Direction bits from nw_fill()
+
+    Returns:
+        tuple: (aligned_seq1, aligned_seq2)
+    """
+    m, n = len(seq1), len(seq2)
+    out1, out2 = [], []
+    i, j = m, n
+
+    while i > 0 or j > 0:
+        if i == 0:
+            step = LEFT
+        elif j == 0:
+            step = UP
+        else:
+            bits = pointers[i + j][i - max(1, i + j - n)]
+            step = DIAG if bits & DIAG else (UP if bits & UP else LEFT)
+
+        if step == DIAG:
+            i -= 1
+            j -= 1
+            out1.append(seq1[i])
+            out2.append(seq2[j])
+        elif step == UP:
+            i -= 1
+            out1.append(seq1[i])
+            out2.append('-')
+        else:
+            j -= 1
+            out1.append('-')
+            out2.append(seq2[j])
+
+    return ''.join(reversed(out1)), ''.join(reversed(out2))
+
+
+def nw_iter_tracebacks(seq1: str, seq2: str,
+                       pointers: List[np.ndarray]) -> Iterator[Tuple[str, str]]:
+    """
+    Lazily enumerate every optimal alignment encoded in the direction bits.
+
+    Paths are explored depth-first with the same DIAG, UP, LEFT priority
+    as nw_traceback(), so the first alignment yielded is the one
+    nw_traceback() returns. Only the current path and the pending branch
+    points are held in memory; nothing is enumerated until requested.
+
+    Args:
+        seq1 (str): First sequence
+        seq2 (str): Second sequence
+        pointers (list): Direction bits from nw_fill()
+
+    Yields:
+        tuple: (aligned_seq1, aligned_seq2)
+    """
+    n = len(seq2)
+    out1, out2 = [], []
+
+    # Stack entries: (i, j, depth, c1, c2) -- truncate the path to depth,
+    # append the column (c1, c2) and continue from cell (i, j).
+    stack = [(len(seq1), n, 0, None, None)]
+
+    while stack:
+        i, j, depth, c1, c2 = stack.pop()
+        del out1[depth:]
+        del out2[depth:]
+        if c1 is not None:
+            out1.append(c1)
+            out2.append(c2)
+
+        if i == 0 and j == 0:
+            yield ''.join(reversed(out1)), ''.join(reversed(out2))
+            continue
+
+        if i == 0:
+            bits = LEFT
+        elif j == 0:
+            bits = UP
+        else:
+            bits = int(pointers[i + j][i - max(1, i + j - n)])
+
+        # Pushed in reverse priority so DIAG is explored first
+        depth = len(out1)
+        if bits & LEFT:
+            stack.append((i, j - 1, depth, '-', seq2[j - 1]))
+        if bits & UP:
+            stack.append((i - 1, j, depth, seq1[i - 1], '-'))
+        if bits & DIAG:
+            stack.append((i - 1, j - 1, depth, seq1[i - 1], seq2[j - 1]))
+
+
+def hirschberg_align(seq1: str, seq2: str, match, mismatch, gap,
+                     block_cells: int = HIRSCHBERG_BLOCK_CELLS) -> Tuple[str, str, float, int]:
+    """
+    Globally align two sequences in linear memory (Hirschberg).
+
+    seq1 is split in half; a forward score row for the top half and a
+    backward score row for the reversed bottom half locate the column
+    where an optimal path crosses the middle row. Both halves are then
+    solved recursively. Sub-problems of at most block_cells cells are
+    finished with nw_fill()/nw_traceback(), which bounds peak memory
+    while avoiding recursion down to single residues.
+
+    Args:
+        seq1 (str): First sequence
+        seq2 (str): Second sequence
+        match: Score for identical residues
+        mismatch: Score for differing residues
+        gap: Score for each gap position
+        block_cells (int): Largest sub-problem solved with a full matrix
+
+    Returns:
+        tuple: (aligned_seq1, aligned_seq2, score, cells) where cells
+            counts every DP cell computed, including the score rows that
+            are recomputed at each level of the recursion (about 2 * m * n)
+    """
+    a = encode_sequence(seq1)
+    b = encode_sequence(seq2)
+    out1, out2 = [], []
+    cells = 0
+
+    def solve(i0, i1, j0, j1):
+        # Emits the alignment of seq1[i0:i1] with seq2[j0:j1] and returns its score
+        nonlocal cells
+        rows, cols = i1 - i0, j1 - j0
+
+        if rows == 0:
+            out1.append('-' * cols)
+            out2.append(seq2[j0:j1])
+            return gap * cols
+        if cols == 0:
+            out1.append(seq1[i0:i1])
+            out2.append('-' * rows)
+            return gap * rows
+        cells += rows * cols
+        if rows == 1 or cols == 1 or rows * cols <= block_cells:
+            score, pointers = nw_fill(a[i0:i1], b[j0:j1], match, mismatch, gap)
+            aligned1, aligned2 = nw_traceback(seq1[i0:i1], seq2[j0:j1], pointers)
+            out1.append(aligned1)
+            out2.append(aligned2)
+            return score
+
+        mid = i0 + rows // 2
+        forward = nw_score_row(a[i0:mid], b[j0:j1], match, mismatch, gap)
+        backward = nw_score_row(a[mid:i1][::-1], b[j0:j1][::-1],
+                                match, mismatch, gap)[::-1]
+        total = forward + backward
+        split = int(np.argmax(total))
+
+        solve(i0, mid, j0, j0 + split)
+        solve(mid, i1, j0 + split, j1)
+        return total[split]
+
+    score = solve(0, len(a), 0, len(b))
+    return ''.join(out1), ''.join(out2), float(score), cells
+
+
+def nw_align(seq1: str, seq2: str, match, mismatch,
+             gap) -> Tuple[str, str, float, int]:
+    """
+    Globally align two sequences with the anti-diagonal NumPy engine.
+
+    Args:
+        seq1 (str): First sequence
+        seq2 (str): Second sequence
+        match: Score for identical residues
+        mismatch: Score for differing residues
+        gap: Score for each gap position
+
+    Returns:
+        tuple: (aligned_seq1, aligned_seq2, score, cells) where cells is
+            the m * n DP cells filled
+    """
+    a = encode_sequence(seq1)
+    b = encode_sequence(seq2)
+    score, pointers = nw_fill(a, b, match, mismatch, gap)
+    aligned_seq1, aligned_seq2 = nw_traceback(_as_text(seq1, a),
+                                              _as_text(seq2, b), pointers)
+    return aligned_seq1, aligned_seq2, score, len(a) * len(b)
+
+
+def gotoh_fill(a: np.ndarray, b: np.ndarray, match, mismatch, gap_open,
+               gap_extend, traceback: bool = True) -> Tuple[float, List[np.ndarray]]:
+    """
+    Fill the affine-gap (Gotoh) matrices one anti-diagonal at a time.
+
+    A gap of length L scores gap_open + (L - 1) * gap_extend. Three
+    matrices are used: X (alignment ends with a gap in seq2), Y (ends with
+    a gap in seq1) and H, the best of X, Y and the diagonal move:
+
+        X[i, j] = max(H[i-1, j] + gap_open, X[i-1, j] + gap_extend)
+        Y[i, j] = max(H[i, j-1] + gap_open, Y[i, j-1] + gap_extend)
+        H[i, j] = max(H[i-1, j-1] + s(i, j), X[i, j], Y[i, j])
+
+    As in nw_fill(), each anti-diagonal only needs the two before it.
+
+    Args:
+        a (np.ndarray): First sequence as uint8 codes (length m)
+        b (np.ndarray): Second sequence as uint8 codes (length n)
+        match: Score for identical residues
+        mismatch: Score for differing residues
+        gap_open: Score of the first position of a gap
+        gap_extend: Score of each further position of the same gap
+        traceback (bool): Keep direction bits. With False only the score
+            is computed and memory stays O(min(m, n)).
+
+    Returns:
+        tuple: (score, pointers) laid out as in nw_fill(); each cell
+            holds DIAG/UP/LEFT for H plus UP_EXTEND/LEFT_EXTEND
+    """
+    if traceback is False and len(a) < len(b):
+        a, b = b, a
+    m, n = len(a), len(b)
+    dtype = score_dtype((match, mismatch, gap_open, gap_extend), m + n)
+    match, mismatch = dtype.type(match), dtype.type(mismatch)
+    gap_open, gap_extend = dtype.type(gap_open), dtype.type(gap_extend)
+    b_rev = b[::-1].copy()
+
+    # Stands in for -infinity where a gap state is unreachable
+    if dtype.kind == 'f':
+        unreachable = -np.inf
+    else:
+        unreachable = np.iinfo(dtype).min // 2
+
+    h2 = np.zeros(m + 1, dtype=dtype)
+    h1 = np.zeros(m + 1, dtype=dtype)
+    h0 = np.zeros(m + 1, dtype=dtype)
+    x1 = np.full(m + 1, unreachable, dtype=dtype)
+    x0 = np.full(m + 1, unreachable, dtype=dtype)
+    y1 = np.full(m + 1, unreachable, dtype=dtype)
+    y0 = np.full(m + 1, unreachable, dtype=dtype)
+    pointers = [np.empty(0, dtype=np.uint8)]
+
+    for d in range(1, m + n + 1):
+        ilo = max(1, d - n)
+        ihi = min(m, d - 1)
+
+        if ilo <= ihi:
+            subst = np.where(a[ilo - 1:ihi] == b_rev[n - d + ilo:n - d + ihi + 1],
+                             match, mismatch)
+            diag = h2[ilo - 1:ihi] + subst
+
+            up_open = h1[ilo - 1:ihi] + gap_open
+            up_extend = x1[ilo - 1:ihi] + gap_extend
+            up = np.maximum(up_open, up_extend)
+
+            left_open = h1[ilo:ihi + 1] + gap_open
+            left_extend = y1[ilo:ihi + 1] + gap_extend
+            left = np.maximum(left_open, left_extend)
+
+            best = np.maximum(diag, up)
+            np.maximum(best, left, out=best)
+            h0[ilo:ihi + 1] = best
+            x0[ilo:ihi + 1] = up
+            y0[ilo:ihi + 1] = left
+
+            if traceback:
+                ptr = (diag == best).view(np.uint8)
+                ptr |= (up == best).view(np.uint8) << 1
+                ptr |= (left == best).view(np.uint8) << 2
+                ptr |= (up_extend >= up_open).view(np.uint8) << 3
+                ptr |= (left_extend >= left_open).view(np.uint8) << 4
+                pointers.append(ptr)
+        elif traceback:
+            pointers.append(np.empty(0, dtype=np.uint8))
+
+        # First row (gap in seq1) and first column (gap in seq2)
+        edge = gap_open + gap_extend * (d - 1)
+        if d <= n:
+            h0[0] = y0[0] = edge
+            x0[0] = unreachable
+        if d <= m:
+            h0[d] = x0[d] = edge
+            y0[d] = unreachable
+
+        h2, h1, h0 = h1, h0, h2
+        x1, x0 = x0, x1
+        y1, y0 = y0, y1
+
+    score = h1[m] if m + n > 0 else 0
+    return float(score), pointers
+
+
+def gotoh_traceback(seq1: str, seq2: str,
+                    pointers: List[np.ndarray]) -> Tuple[str, str]:
+    """
+    Recover one optimal affine-gap alignment from gotoh_fill() bits.
+
+    In H the step order is DIAG, UP, LEFT as in nw_traceback(); inside a
+    gap, extending is preferred over opening when both are optimal.
+
+    Args:
+        seq1 (str): First sequence
+        seq2 (str): Second sequence
+        pointers (list): Direction bits from gotoh_fill()
+
+    Returns:
+        tuple: (aligned_seq1, aligned_seq2)
+    """
+    m, n = len(seq1), len(seq2)
+    out1, out2 = [], []
+    i, j = m, n
+    state = DIAG   # DIAG means "in H"; UP / LEFT mean inside X / Y
+
+    while i > 0 or j > 0:
+        if i == 0:
+            bits, state = LEFT | LEFT_EXTEND, LEFT
+        elif j == 0:
+            bits, state = UP | UP_EXTEND, UP
+        else:
+            bits = pointers[i + j][i - max(1, i + j - n)]
+            if state == DIAG:
+                state = DIAG if bits & DIAG else (UP if bits & UP else LEFT)
+
+        if state == DIAG:
+            i -= 1
+            j -= 1
+            out1.append(seq1[i])
+            out2.append(seq2[j])
+        elif state == UP:
+            i -= 1
+            out1.append(seq1[i])
+            out2.append('-')
+            if not bits & UP_EXTEND:
+                state = DIAG
+        else:
+            j -= 1
+            out1.append('-')
+            out2.append(seq2[j])
+            if not bits & LEFT_EXTEND:
+                state = DIAG
+
+    return ''.join(reversed(out1)), ''.join(reversed(out2))
+
+
+def gotoh_align(seq1: str, seq2: str, match, mismatch, gap_open,
+                gap_extend) -> Tuple[str, str, float, int]:
+    """
+    Globally align two sequences with affine gap penalties.
+
+    Args:
+        seq1 (str): First sequence
+        seq2 (str): Second sequence
+        match: Score for identical residues
+        mismatch: Score for differing residues
+        gap_open: Score of the first position of a gap
+        gap_extend: Score of each further position of the same gap
+
+    Returns:
+        tuple: (aligned_seq1, aligned_seq2, score, cells) where cells is
+            the m * n DP cells filled (each holding the three Gotoh states)
+    """
+    a = encode_sequence(seq1)
+    b = encode_sequence(seq2)
+    score, pointers = gotoh_fill(a, b, match, mismatch, gap_open, gap_extend)
+    aligned_seq1, aligned_seq2 = gotoh_traceback(_as_text(seq1, a),
+                                                 _as_text(seq2, b), pointers)
+    return aligned_seq1, aligned_seq2, score, len(a) * len(b)
+
+
+def banded_fill(a: np.ndarray, b: np.ndarray, match, mismatch, gap,
+                lo: int, hi: int) -> Tuple[float, np.ndarray]:
+    """
+    Fill the linear-gap matrix restricted to the diagonals lo <= j - i <= hi.
+
+    Rows are stored in band coordinates t = j - i - lo, so the diagonal
+    predecessor of (i, t) is (i - 1, t), the vertical one (i - 1, t + 1)
+    and the horizontal one (i, t - 1). Horizontal gap chains are resolved
+    with the same running maximum as nw_score_row(). Cells outside the
+    band or the matrix hold a large negative sentinel.
+
+    Args:
+        a (np.ndarray): First sequence as uint8 codes (length m)
+        b (np.ndarray): Second sequence as uint8 codes (length n)
+        match: Score for identical residues
+        mismatch: Score for differing residues
+        gap: Score for each gap position
+        lo (int): Lowest diagonal j - i inside the band (-m <= lo <= 0)
+        hi (int): Highest diagonal j - i inside the band (n - m <= hi <= n)
+
+    Returns:
+        tuple: (score, pointers) where pointers[i, t] holds the direction
+            bits of cell (i, i + lo + t)
+    """
+    m, n = len(a), len(b)
+    width = hi - lo + 1
+    dtype = score_dtype((match, mismatch, gap), m + n)
+    match, mismatch, gap = dtype.type(match), dtype.type(mismatch), dtype.type(gap)
+    if dtype.kind == 'f':
+        outside = -np.inf
+    else:
+        outside = np.iinfo(dtype).min // 2
+
+    # Pad b so that b_pad[i - 1 + t] is b[j - 1] for band cell (i, t);
+    # code 0 never occurs in a sequence, so padding never matches.
+    b_pad = np.zeros(m + width, dtype=np.uint8)
+    b_pad[-lo:n - lo] = b
+
+    ramp = np.arange(width, dtype=dtype) * gap
+    t_all = np.arange(width)
+    pointers = np.zeros((m + 1, width), dtype=np.uint8)
+
+    # Row 0: H[0, j] = gap * j for 0 <= j <= hi
+    prev = np.full(width, outside, dtype=dtype)
+    t0 = -lo
+    prev[t0:t0 + min(n, hi) + 1] = gap * np.arange(min(n, hi) + 1)
+
+    cur = np.empty(width, dtype=dtype)
+    up = np.full(width, outside, dtype=dtype)
+
+    for i in range(1, m + 1):
+        subst = np.where(b_pad[i - 1:i - 1 + width] == a[i - 1], match, mismatch)
+        diag = prev + subst
+        up[:-1] = prev[1:] + gap
+        np.maximum(diag, up, out=cur)
+
+        # Valid columns 0 <= j <= n of this row, in band coordinates
+        tmin = max(0, -i - lo)
+        tmax = min(width - 1, n - i - lo)
+        cur[:tmin] = outside
+        cur[tmax + 1:] = outside
+        if tmin == -i - lo:
+            cur[tmin] = gap * i   # column 0
+
+        cur -= ramp
+        np.maximum.accumulate(cur, out=cur)
+        cur += ramp
+        cur[tmax + 1:] = outside
+
+        row = pointers[i]
+        row |= (diag == cur).view(np.uint8)
+        row |= (up == cur).view(np.uint8) << 1
+        row[1:] |= (cur[:-1] + gap == cur[1:]).view(np.uint8) << 2
+
+        prev, cur = cur, prev
+
+    score = prev[n - m - lo]
+    return float(score), pointers
+
+
+def banded_traceback(seq1: str, seq2: str, pointers: np.ndarray,
+                     lo: int) -> Tuple[str, str]:
+    """
+    Recover one optimal alignment from banded_fill() direction bits.
+
+    Uses the same DIAG, UP, LEFT priority as nw_traceback().
+
+    Args:
+        seq1 (str): First sequence
+        seq2 (str): Second sequence
+        pointers (np.ndarray): Direction bits from banded_fill()
+        lo (int): Lowest diagonal of the band
+
+    Returns:
+        tuple: (aligned_seq1, aligned_seq2)
+    """
+    out1, out2 = [], []
+    i, j = len(seq1), len(seq2)
+
+    while i > 0 or j > 0:
+        if i == 0:
+            step = LEFT
+        elif j == 0:
+            step = UP
+        else:
+            bits = pointers[i, j - i - lo]
+            step = DIAG if bits & DIAG else (UP if bits & UP else LEFT)
+
+        if step == DIAG:
+            i -= 1
+            j -= 1
+            out1.append(seq1[i])
+            out2.append(seq2[j])
+        elif step == UP:
+            i -= 1
+            out1.append(seq1[i])
+            out2.append('-')
+        else:
+            j -= 1
+            out1.append('-')
+            out2.append(seq2[j])
+
+    return ''.join(reversed(out1)), ''.join(reversed(out2))
+
+
+def band_score_bound(m: int, n: int, match, mismatch, gap,
+                     lo: int, hi: int) -> float:
+    """
+    Upper bound on the score of any path that leaves the band [lo, hi].
+
+    Each gap moves the path by one diagonal, so a path that reaches
+    diagonal k needs at least |k| + |n - m - k| gap columns. With G gap
+    columns there are (m + n - G) / 2 aligned columns, so the score is at
+    most max(match, mismatch) * (m + n - G) / 2 + gap * G, which is linear
+    in G and is therefore maximized at one end of the feasible range.
+
+    Args:
+        m, n (int): Sequence lengths
+        match, mismatch, gap: Scoring parameters
+        lo, hi (int): Band diagonals
+
+    Returns:
+        float: Bound, or -inf when the band already covers the matrix
+    """
+    d = n - m
+    escapes = []
+    if lo > -m:
+        escapes.append(abs(lo - 1) + abs(d - lo + 1))
+    if hi < n:
+        escapes.append(abs(hi + 1) + abs(d - hi - 1))
+    if not escapes:
+        return float('-inf')
+
+    best_column = max(match, mismatch)
+
+    def bound(gaps):
+        return best_column * (m + n - gaps) / 2 + gap * gaps
+
+    return max(bound(min(escapes)), bound(m + n))
+
+
+def banded_align(seq1: str, seq2: str, match, mismatch, gap,
+                 tolerance: int = 64) -> Tuple[str, str, float, int]:
+    """
+    Globally align two similar sequences inside an adaptive diagonal band.
+
+    The band spans the diagonals between 0 and n - m, widened by
+    tolerance on each side, so filling it costs O(n * band). After each
+    fill the score is compared with band_score_bound(); if a path leaving
+    the band could still score higher, the band is widened and
+    recomputed. The returned alignment is therefore always optimal, and
+    in the worst case the band grows to the full matrix.
+
+    The banded score is a lower bound on the optimum, so the next
+    tolerance is chosen as the smallest one whose escape bound falls
+    below it (at least double the previous one). That band is certain
+    to pass the check, so at most two fills are needed for linear gaps.
+
+    Args:
+        seq1 (str): First sequence
+        seq2 (str): Second sequence
+        match: Score for identical residues
+        mismatch: Score for differing residues
+        gap: Score for each gap position
+        tolerance (int): Initial band half-width beyond the length
+            difference
+
+    Returns:
+        tuple: (aligned_seq1, aligned_seq2, score, cells) where cells is
+            the band cells filled, summed over every fill
+    """
+    a = encode_sequence(seq1)
+    b = encode_sequence(seq2)
+    m, n = len(a), len(b)
+    tolerance = max(1, tolerance)
+    cells = 0
+
+    while True:
+        lo = max(-m, min(0, n - m) - tolerance)
+        hi = min(n, max(0, n - m) + tolerance)
+        score, pointers = banded_fill(a, b, match, mismatch, gap, lo, hi)
+        cells += m * (hi - lo + 1)
+
+        if score >= band_score_bound(m, n, match, mismatch, gap, lo, hi):
+            aligned_seq1, aligned_seq2 = banded_traceback(
+                _as_text(seq1, a), _as_text(seq2, b), pointers, lo)
+            return aligned_seq1, aligned_seq2, score, int(cells)
+
+        # Smallest escape gap count G with bound(G) <= score, then the
+        # tolerance whose escape paths need at least G gaps
+        slope = max(match, mismatch) / 2 - gap
+        if slope > 0:
+            gaps = (max(match, mismatch) * (m + n) / 2 - score) / slope
+            needed = int(np.ceil((gaps - abs(n - m)) / 2))
+        else:
+            needed = m + n
+        tolerance = max(2 * tolerance, needed)
+
+
+def wfa_penalties(match, mismatch, gap) -> Tuple[int, int, int]:
+    """
+    Translate a match/mismatch/gap score scheme into WFA penalties.
+
+    With A aligned columns and G gap columns, m + n = 2A + G, so any
+    global alignment scores match * (m + n) / 2 - P / 2 where
+
+        P = 2 * (match - mismatch) * mismatches + (match - 2 * gap) * gaps
+
+    Maximizing the score is minimizing P, whose match penalty is zero,
+    which is the form the wavefront algorithm needs. The penalties are
+    divided by their greatest common divisor to keep wavefronts dense.
+
+    Args:
+        match, mismatch, gap: Scoring parameters
+
+    Returns:
+        tuple: (mismatch_penalty, gap_penalty, unit) with P = unit *
+            (mismatch_penalty * mismatches + gap_penalty * gaps)
+
+    Raises:
+        ValueError: If the penalties are not positive integers
+    """
+    x = 2 * (match - mismatch)
+    g = match - 2 * gap
+    if not (float(x).is_integer() and float(g).is_integer()) or x <= 0 or g <= 0:
+        raise ValueError(
+            "The 'wfa' engine needs match > mismatch and match > 2 * gap, "
+            "with 2 * (match - mismatch) and match - 2 * gap integral"
+        )
+    x, g = int(x), int(g)
+    unit = gcd(x, g)
+    return x // unit, g // unit, unit
+
+
+def _match_run(seq1: str, seq2: str, i: int, j: int) -> int:
+    """
+    Length of the common prefix of seq1[i:] and seq2[j:].
+
+    Compares growing slices (C-level string equality) and narrows down
+    on the first mismatch by bisection.
+    """
+    limit = min(len(seq1) - i, len(seq2) - j)
+    run = 0
+    step = 32
+    while run < limit:
+        size = min(step, limit - run)
+        if seq1[i + run:i + run + size] == seq2[j + run:j + run + size]:
+            run += size
+            step *= 2
+            continue
+        while size > 1:
+            half = size // 2
+            if seq1[i + run:i + run + half] == seq2[j + run:j + run + half]:
+                run += half
+                size -= half
+            else:
+                size = half
+        return run
+    return run
+
+
+def wfa_align(seq1: str, seq2: str, match, mismatch,
+              gap) -> Tuple[str, str, float, int]:
+    """
+    Globally align two sequences with the wavefront algorithm (WFA).
+
+    Works on the penalty form from wfa_penalties(). Wavefront s stores,
+    for each diagonal k = j - i, the furthest column j reachable with
+    penalty exactly s. It is built from wavefronts s - mismatch (same
+    diagonal) and s - gap (neighbouring diagonals), then every diagonal
+    is slid along its run of matches for free. The first wavefront that
+    reaches (m, n) gives the optimum. Work and memory grow with the
+    square of the penalty, not with m * n, so near-identical sequences
+    align in close to linear time.
+
+    When several moves reach the same cell, the traceback prefers a
+    mismatch, then a gap in seq2, then a gap in seq1.
+
+    Args:
+        seq1 (str): First sequence
+        seq2 (str): Second sequence
+        match: Score for identical residues
+        mismatch: Score for differing residues
+        gap: Score for each gap position
+
+    Returns:
+        tuple: (aligned_seq1, aligned_seq2, score, cells) where cells is
+            the DP cells visited: one per wavefront diagonal computed plus
+            one per residue pair compared while sliding along matches
+    """
+    x, g, unit = wfa_penalties(match, mismatch, gap)
+    seq1, seq2 = str(seq1), str(seq2)
+    m, n = len(seq1), len(seq2)
+    final_k = n - m
+    none = -(1 << 40)
+
+    # wavefronts[s] = (lowest diagonal, offsets) or None if unreachable
+    run = _match_run(seq1, seq2, 0, 0)
+    wavefronts = [(0, np.array([run], dtype=np.int64))]
+    cells = 1 + run
+
+    def candidates(s, shift, lo, size):
+        # Offsets of wavefront s read at diagonals lo - shift .. lo - shift + size - 1
+        out = np.full(size, none, dtype=np.int64)
+        if s < 0 or wavefronts[s] is None:
+            return out
+        src_lo, src = wavefronts[s]
+        start = max(lo - shift, src_lo)
+        stop = min(lo - shift + size, src_lo + len(src))
+        if start < stop:
+            out[start - (lo - shift):stop - (lo - shift)] = src[start - src_lo:stop - src_lo]
+        return out
+
+    s = 0
+    while True:
+        if wavefronts[s] is not None:
+            lo, offsets = wavefronts[s]
+            if lo <= final_k < lo + len(offsets) and offsets[final_k - lo] == n:
+                break
+
+        s += 1
+        sources = [wavefronts[t] for t in (s - x, s - g) if t >= 0 and wavefronts[t]]
+        if not sources:
+            wavefronts.append(None)
+            continue
+
+        new_lo = min(src_lo for src_lo, _ in sources) - 1
+        new_hi = max(src_lo + len(src) for src_lo, src in sources)
+        size = new_hi - new_lo + 1
+        ks = np.arange(new_lo, new_lo + size)
+        cells += size
+
+        best = np.full(size, none, dtype=np.int64)
+        for cand in (candidates(s - x, 0, new_lo, size) + 1,    # mismatch
+                     candidates(s - g, -1, new_lo, size),        # gap in seq2
+                     candidates(s - g, 1, new_lo, size) + 1):    # gap in seq1
+            valid = (cand >= 0) & (cand <= n) & (cand - ks >= 0) & (cand - ks <= m)
+            np.maximum(best, np.where(valid, cand, none), out=best)
+
+        reached = np.flatnonzero(best >= 0)
+        if len(reached) == 0:
+            wavefronts.append(None)
+            continue
+
+        first, last = reached[0], reached[-1]
+        offsets = best[first:last + 1]
+        lo = new_lo + first
+        for idx in np.flatnonzero(offsets >= 0):
+            j = int(offsets[idx])
+            run = _match_run(seq1, seq2, j - (lo + idx), j)
+            offsets[idx] = j + run
+            cells += run
+        wavefronts.append((lo, offsets))
+
+    penalty = s
+
+    # Traceback from (m, n) through the stored wavefronts
+    out1, out2 = [], []
+    k, j = final_k, n
+    while s > 0:
+        lo, offsets = wavefronts[s]
+        options = (
+            (s - x, 0, 1, DIAG),
+            (s - g, -1, 0, UP),
+            (s - g, 1, 1, LEFT),
+        )
+        origin = none
+        step = None
+        for t, shift, advance, move in options:
+            cand = candidates(t, shift, k, 1)[0] + advance
+            i_cand = cand - k
+            if 0 <= cand <= n and 0 <= i_cand <= m and cand > origin:
+                origin, step = cand, move
+
+        for _ in range(j - origin):
+            j -= 1
+            out1.append(seq1[j - k])
+            out2.append(seq2[j])
+
+        if step == DIAG:
+            j -= 1
+            out1.append(seq1[j - k])
+            out2.append(seq2[j])
+            s -= x
+        elif step == UP:
+            k += 1
+            out1.append(seq1[j - k])
+            out2.append('-')
+            s -= g
+        else:
+            j -= 1
+            k -= 1
+            out1.append('-')
+            out2.append(seq2[j])
+            s -= g
+
+    # Leading run of matches on diagonal 0
+    while j > 0:
+        j -= 1
+        out1.append(seq1[j])
+        out2.append(seq2[j])
+
+    score = (match * (m + n) - unit * penalty) / 2
+    return ''.join(reversed(out1)), ''.join(reversed(out2)), score, int(cells)
+
+
+_GAP = ord('-')
+# Match-line symbols indexed by column class: 0 match, 1 mismatch, 2 gap
+_MATCH_SYMBOLS = np.frombuffer(b'|. ', dtype=np.uint8)
+
+
+def alignment_counts(aligned_seq1: str, aligned_seq2: str) -> Dict[str, int]:
+    """
+    Count column types of a finished alignment in one vectorized pass.
+
+    Args:
+        aligned_seq1 (str): First aligned sequence
+        aligned_seq2 (str): Second aligned sequence
+
+    Returns:
+        dict: 'matches', 'mismatches', 'gaps_seq1', 'gaps_seq2',
+        'gap_opens_seq1' and 'gap_opens_seq2' (maximal runs of '-')
+    """
+    a = encode_sequence(aligned_seq1)
+    b = encode_sequence(aligned_seq2)
+    gap1 = a == _GAP
+    gap2 = b == _GAP
+    equal = a == b
+
+    def runs(gaps):
+        # A run starts at a gap column not preceded by another gap
+        if not gaps.size:
+            return 0
+        return int(gaps[0]) + int(np.count_nonzero(gaps[1:] & ~gaps[:-1]))
+
+    return {
+        'matches': int(np.count_nonzero(equal)),
+        'mismatches': int(np.count_nonzero(~(equal | gap1 | gap2))),
+        'gaps_seq1': int(np.count_nonzero(gap1)),
+        'gaps_seq2': int(np.count_nonzero(gap2)),
+        'gap_opens_seq1': runs(gap1),
+        'gap_opens_seq2': runs(gap2),
+    }
+
+
+def window_track(aligned_seq1: str, aligned_seq2: str,
+                 window: int = 100) -> Dict[str, np.ndarray]:
+    """
+    Sliding-window identity and gap density along an alignment.
+
+    Each column is classified once and every window sum is read off a
+    cumulative sum, so the cost is O(L) whatever the window size.
+
+    Args:
+        aligned_seq1 (str): First aligned sequence
+        aligned_seq2 (str): Second aligned sequence
+        window (int): Window width in alignment columns; clamped to the
+            alignment length. Default is 100.
+
+    Returns:
+        dict: Arrays with one entry per window position:
+            - 'position': Alignment column (1-based) at the window centre
+            - 'identity': Percentage of identical columns in the window
+            - 'gaps': Percentage of gap columns in the window
+
+    Raises:
+        ValueError: If window is smaller than 1
+
+    Example:
+        >>> track = window_track(result['aligned_seq1'], result['aligned_seq2'], 50)
+        >>> track['position'][track['identity'].argmin()]
+    """
+    if window < 1:
+        raise ValueError("window must be at least 1")
+
+    a = encode_sequence(aligned_seq1)
+    b = encode_sequence(aligned_seq2)
+    length = a.size
+    window = min(window, length)
+    if not length:
+        empty = np.zeros(0)
+        return {'position': empty, 'identity': empty, 'gaps': empty}
+
+    gap = (a == _GAP) | (b == _GAP)
+    match = (a == b) & ~gap
+
+    def window_sums(flags):
+        totals = np.concatenate(([0], np.cumsum(flags, dtype=np.int64)))
+        return totals[window:] - totals[:-window]
+
+    positions = np.arange(length - window + 1)
+    return {
+        'position': positions + (window + 1) / 2,
+        'identity': window_sums(match) * (100.0 / window),
+        'gaps': window_sums(gap) * (100.0 / window),
+    }
+
+
+def match_line(aligned_seq1: str, aligned_seq2: str) -> str:
+    """
+    Build the match indicator line of an alignment.
+
+    Args:
+        aligned_seq1 (str): First aligned sequence
+        aligned_seq2 (str): Second aligned sequence
+
+    Returns:
+        str: '|' for matches, '.' for mismatches and ' ' for gap columns
+    """
+    a = encode_sequence(aligned_seq1)
+    b = encode_sequence(aligned_seq2)
+    kind = np.where(a == b, 0, np.where((a == _GAP) | (b == _GAP), 2, 1))
+    return _MATCH_SYMBOLS[kind].tobytes().decode('ascii')
@@ -0,0 +1,151 @@
+"""
+Packed Sequences
+
+A compact nucleotide container that stores A/C/G/T at two bits per
+residue and keeps every other character (N, IUPAC ambiguity codes, gaps)
+as run-length exceptions in a side table.
+"""
+
+from typing import Optional, Tuple
+import numpy as np
+
+
+# 2-bit code for each ASCII byte; 255 marks characters kept as exceptions
+_PACK = np.full(256, 255, dtype=np.uint8)
+for _code, _base in enumerate(b'ACGT'):
+    _PACK[_base] = _code
+_UNPACK = np.frombuffer(b'ACGT', dtype=np.uint8)
+_SHIFTS = np.array([6, 4, 2, 0], dtype=np.uint8)
+
+
+class PackedSequence:
+    """
+    Nucleotide sequence packed four residues per byte.
+
+    The sequence is uppercased once when packed. A, C, G and T go into a
+    2-bit array; runs of any other character are recorded as (start, end,
+    character) triples, so long N stretches cost one entry each. Resident
+    size is about a quarter of the equivalent ``str``.
+
+    NWAligner and the DP engines accept PackedSequence wherever they take
+    a ``str``; codes() unpacks straight to the uint8 array the engines
+    fill from, without an intermediate string or uppercase copy.
+
+    Args:
+        seq (str): DNA sequence (any case, any ASCII characters)
+
+    Example:
+        >>> packed = PackedSequence("acgtNNNNacgt")
+        >>> len(packed), str(packed)
+        (12, 'ACGTNNNNACGT')
+    """
+
+    __slots__ = ('_length', '_bits', '_run_starts', '_run_ends', '_run_chars')
+
+    def __init__(self, seq: str):
+        raw = np.frombuffer(str(seq).upper().encode('ascii'), dtype=np.uint8)
+        codes = _PACK[raw]
+        self._length = len(raw)
+
+        # Collapse non-ACGT positions into runs of the same character
+        other = np.flatnonzero(codes == 255)
+        if other.size:
+            chars = raw[other]
+            breaks = np.flatnonzero((np.diff(other) != 1) | (np.diff(chars) != 0)) + 1
+            first = np.concatenate(([0], breaks))
+            last = np.concatenate((breaks - 1, [other.size - 1]))
+            self._run_starts = other[first].astype(np.int64)
+            self._run_ends = other[last].astype(np.int64) + 1
+            self._run_chars = chars[first].copy()
+            codes[other] = 0
+        else:
+            self._run_starts = np.zeros(0, dtype=np.int64)
+            self._run_ends = np.zeros(0, dtype=np.int64)
+            self._run_chars = np.zeros(0, dtype=np.uint8)
+
+        padded = np.zeros(-(-self._length // 4) * 4, dtype=np.uint8)
+        padded[:self._length] = codes
+        quads = padded.reshape(-1, 4)
+        self._bits = ((quads[:, 0] << 6) | (quads[:, 1] << 4) |
+                      (quads[:, 2] << 2) | quads[:, 3]).astype(np.uint8)
+
+    def codes(self, start: int = 0, end: Optional[int] = None) -> np.ndarray:
+        """
+        Unpack residues [start, end) to a uint8 array of ASCII codes.
+
+        Args:
+            start (int): First position (default: 0)
+            end (int): Position after the last one (default: length)
+
+        Returns:
+            np.ndarray: One byte per residue, as from engines.encode_sequence()
+        """
+        start, end, _ = slice(start, end).indices(self._length)
+        if end <= start:
+            return np.zeros(0, dtype=np.uint8)
+
+        block = self._bits[start // 4:-(-end // 4)]
+        out = _UNPACK[((block[:, None] >> _SHIFTS) & 3).ravel()]
+        out = out[start % 4:start % 4 + end - start]
+
+        # Overwrite the exception runs that overlap the window
+        hit = (self._run_starts < end) & (self._run_ends > start)
+        for run_start, run_end, char in zip(self._run_starts[hit],
+                                            self._run_ends[hit],
+                                            self._run_chars[hit]):
+            out[max(run_start, start) - start:min(run_end, end) - start] = char
+        return out
+
+    @property
+    def nbytes(self) -> int:
+        """int: Bytes held by the packed array and the exception table."""
+        return (self._bits.nbytes + self._run_starts.nbytes +
+                self._run_ends.nbytes + self._run_chars.nbytes)
+
+    @property
+    def exception_runs(self) -> Tuple[Tuple[int, int, str], ...]:
+        """tuple: (start, end, character) for each run of non-ACGT residues."""
+        return tuple((int(s), int(e), chr(c)) for s, e, c in
+                     zip(self._run_starts, self._run_ends, self._run_chars))
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __str__(self) -> str:
+        return self.codes().tobytes().decode('ascii')
+
+    def __repr__(self) -> str:
+        preview = str(self[:20]) + ('...' if self._length > 20 else '')
+        return f"PackedSequence('{preview}', length={self._length})"
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            if key.step not in (None, 1):
+                return str(self)[key]
+            start, end, _ = key.indices(self._length)
+            return self.codes(start, end).tobytes().decode('ascii')
+        if key < 0:
+            key += self._length
+        if not 0 <= key < self._length:
+            raise IndexError("PackedSequence index out of range")
+        return chr(self.codes(key, key + 1)[0])
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, PackedSequence):
+            return NotImplemented
+        return (self._length == other._length and
+                np.array_equal(self._bits, other._bits) and
+                np.array_equal(self._run_starts, other._run_starts) and
+                np.array_equal(self._run_ends, other._run_ends) and
+                np.array_equal(self._run_chars, other._run_chars))
+
+    def __hash__(self) -> int:
+        return hash((self._length, self._bits.tobytes(),
+                     self._run_starts.tobytes(), self._run_chars.tobytes()))
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
@@ -4,17 +4,95 @@ FASTA File Parser
 Functions for reading and writing FASTA format sequence files.
 """
 
+import mmap
 from pathlib import Path
-from typing import Tuple, Dict, List
-from Bio import SeqIO
+from typing import Tuple, Dict, List, Iterator, Optional
 
+from .packed import PackedSequence
 
-def read_fasta(fasta_file: str) -> Tuple[str, str, str]:
+
+def iter_fasta(fasta_file: str, upper: bool = True,
+               packed: bool = False) -> Iterator[Tuple[str, str, str]]:
+    """
+    Lazily iterate over the records of a FASTA file.
+    
+    Records are parsed straight from the text lines; no SeqRecord objects
+    are built and only the current record is held in memory, so
+    multi-gigabyte multi-FASTA files can be streamed.
+    
+    Args:
+        fasta_file (str): Path to FASTA file
+        upper (bool): Uppercase the sequences (default: True)
+        packed (bool): Yield sequences as PackedSequence (always uppercase)
+            instead of str (default: False)
+        
+    Yields:
+        tuple: (sequence_id, sequence, description) for each record
+        
+    Raises:
+        FileNotFoundError: If FASTA file not found
+        ValueError: If text other than blank lines precedes the first header
+        
+    Example:
+        >>> for seq_id, seq, desc in iter_fasta("multi.fasta"):
+        ...     print(f"{seq_id}: {len(seq)} bp")
+    """
+    fasta_path = Path(fasta_file)
+    
+    if not fasta_path.exists():
+        raise FileNotFoundError(f"FASTA file not found: {fasta_file}")
+    
+    with open(fasta_path, 'r') as f:
+        title = None
+        chunks = []
+        
+        for line in f:
+            if line.startswith('>'):
+                if title is not None:
+                    yield _make_record(title, chunks, upper, packed)
+                title = line[1:].strip()
+                chunks = []
+            elif title is not None:
+                chunks.append(line.rstrip())
+            elif line.strip():
+                raise ValueError(f"Text before first FASTA header in {fasta_file}")
+        
+        if title is not None:
+            yield _make_record(title, chunks, upper, packed)
+
+
+def _make_record(title: str, chunks: List[str], upper: bool,
+                 packed: bool = False) -> Tuple[str, str, str]:
+    """
+    Build an (id, sequence, description) tuple from a header and its lines.
+    
+    Args:
+        title (str): Header line without the leading '>'
+        chunks (list): Sequence lines of the record
+        upper (bool): Uppercase the sequence
+        packed (bool): Return the sequence as a PackedSequence
+        
+    Returns:
+        tuple: (sequence_id, sequence, description)
+    """
+    seq_id = title.split(None, 1)[0] if title else ""
+    sequence = "".join(chunks).replace(" ", "")
+    if packed:
+        return seq_id, PackedSequence(sequence), title
+    if upper:
+        sequence = sequence.upper()
+    return seq_id, sequence, title
+
+
+def read_fasta(fasta_file: str, packed: bool = False) -> Tuple[str, str, str]:
     """
     Read a FASTA file and return sequence ID and sequence.
     
+    Only the first record is parsed; the rest of the file is not read.
+    
     Args:
         fasta_file (str): Path to FASTA file
+        packed (bool): Return the sequence as a PackedSequence (default: False)
         
     Returns:
         tuple: (sequence_id, sequence, description)
@@ -34,28 +112,24 @@ def read_fasta(fasta_file: str) -> Tuple[str, str, str]:
         raise FileNotFoundError(f"FASTA file not found: {fasta_file}")
     
     try:
-        records = list(SeqIO.parse(str(fasta_path), "fasta"))
+        record = next(iter_fasta(str(fasta_path), packed=packed), None)
         
-        if not records:
+        if record is None:
             raise ValueError(f"Empty FASTA file: {fasta_file}")
         
-        record = records[0]
-        seq_id = record.id
-        sequence = str(record.seq).upper()
-        description = record.description
-        
-        return seq_id, sequence, description
+        return record
     
     except Exception as e:
         raise ValueError(f"Error reading FASTA file: {e}")
 
 
-def read_multiple_fasta(fasta_file: str) -> List[Tuple[str, str, str]]:
+def read_multiple_fasta(fasta_file: str, packed: bool = False) -> List[Tuple[str, str, str]]:
     """
     Read a FASTA file with multiple sequences.
     
     Args:
         fasta_file (str): Path to FASTA file
+        packed (bool): Return sequences as PackedSequence (default: False)
         
     Returns:
         list: List of (sequence_id, sequence, description) tuples
@@ -70,15 +144,8 @@ def read_multiple_fasta(fasta_file: str) -> List[Tuple[str, str, str]]:
     if not fasta_path.exists():
         raise FileNotFoundError(f"FASTA file not found: {fasta_file}")
     
-    results = []
     try:
-        records = SeqIO.parse(str(fasta_path), "fasta")
-        
-        for record in records:
-            seq_id = record.id
-            sequence = str(record.seq).upper()
-            description = record.description
-            results.append((seq_id, sequence, description))
+        results = list(iter_fasta(str(fasta_path), packed=packed))
         
         if not results:
             raise ValueError(f"Empty FASTA file: {fasta_file}")
@@ -140,22 +207,221 @@ def validate_fasta(fasta_file: str) -> Dict:
         raise FileNotFoundError(f"FASTA file not found: {fasta_file}")
     
     try:
-        records = list(SeqIO.parse(str(fasta_path), "fasta"))
+        # Only (id, length) pairs are kept; sequences are dropped as read
+        sequences = [(seq_id, len(seq))
+                     for seq_id, seq, _ in iter_fasta(str(fasta_path), upper=False)]
         
-        if not records:
+        if not sequences:
             raise ValueError("Empty FASTA file")
         
-        total_length = sum(len(record.seq) for record in records)
+        lengths = [length for _, length in sequences]
+        total_length = sum(lengths)
         
         return {
             'file': str(fasta_path),
-            'num_sequences': len(records),
+            'num_sequences': len(sequences),
             'total_length': total_length,
-            'average_length': total_length / len(records),
-            'min_length': min(len(record.seq) for record in records),
-            'max_length': max(len(record.seq) for record in records),
-            'sequences': [(record.id, len(record.seq)) for record in records]
+            'average_length': total_length / len(sequences),
+            'min_length': min(lengths),
+            'max_length': max(lengths),
+            'sequences': sequences
         }
     
     except Exception as e:
         raise ValueError(f"Error validating FASTA file: {e}")
+
+
+class FastaIndex:
+    """
+    Random access to FASTA records through a .fai-style index.
+    
+    The index stores, per record, the sequence length, the byte offset of
+    the first residue, the residues per line and the bytes per line
+    (samtools faidx layout). It is written next to the FASTA file as
+    ``<file>.fai`` and reused until the FASTA file is modified. Lookups
+    compute byte offsets directly and slice a memory map of the file, so
+    fetching a record or a subrange never parses the rest of the file.
+    
+    Every sequence line of a record except the last must have the same
+    length, as required by the .fai format.
+    
+    Args:
+        fasta_file (str): Path to FASTA file
+        index_file (str): Index path (default: fasta_file + '.fai')
+        rebuild (bool): Rebuild the index even if an up-to-date one exists
+        
+    Raises:
+        FileNotFoundError: If FASTA file not found
+        ValueError: If the file has duplicate IDs or uneven line lengths
+        
+    Example:
+        >>> with FastaIndex("panel.fasta") as index:
+        ...     seq = index.get("NC_026992.1")
+        ...     window = index.get("NC_026992.1", 1000, 2000)
+    """
+    
+    def __init__(self, fasta_file: str, index_file: Optional[str] = None,
+                 rebuild: bool = False):
+        self.fasta_path = Path(fasta_file)
+        if not self.fasta_path.exists():
+            raise FileNotFoundError(f"FASTA file not found: {fasta_file}")
+        
+        self.index_path = (Path(index_file) if index_file
+                           else self.fasta_path.with_name(self.fasta_path.name + '.fai'))
+        self._file = None
+        self._map = None
+        
+        if (not rebuild and self.index_path.exists() and
+                self.index_path.stat().st_mtime >= self.fasta_path.stat().st_mtime):
+            self.entries = self._load()
+        else:
+            self.entries = self.build_entries(str(self.fasta_path))
+            self._save()
+    
+    @staticmethod
+    def build_entries(fasta_file: str) -> Dict[str, Tuple[int, int, int, int]]:
+        """
+        Scan a FASTA file once and compute its index entries.
+        
+        Args:
+            fasta_file (str): Path to FASTA file
+            
+        Returns:
+            dict: seq_id -> (length, offset, line_bases, line_width)
+            
+        Raises:
+            ValueError: If a record has duplicate ID or uneven line lengths
+        """
+        entries = {}
+        
+        with open(fasta_file, 'rb') as f:
+            seq_id = None
+            position = 0
+            
+            for line in f:
+                width = len(line)
+                bases = len(line.rstrip(b'\r\n'))
+                
+                if line.startswith(b'>'):
+                    if seq_id is not None:
+                        entries[seq_id] = (length, offset, line_bases, line_width)
+                    title = line[1:].decode().strip()
+                    seq_id = title.split(None, 1)[0] if title else ""
+                    if seq_id in entries:
+                        raise ValueError(f"Duplicate sequence ID in FASTA index: {seq_id}")
+                    length = 0
+                    offset = position + width
+                    line_bases = line_width = 0
+                    last_line_short = False
+                elif seq_id is not None:
+                    if bases:
+                        if last_line_short:
+                            raise ValueError(
+                                f"Uneven line lengths in record {seq_id}; "
+                                f"cannot build FASTA index"
+                            )
+                        if line_bases == 0:
+                            line_bases, line_width = bases, width
+                        elif bases > line_bases or (bases == line_bases and
+                                                    width != line_width):
+                            raise ValueError(
+                                f"Uneven line lengths in record {seq_id}; "
+                                f"cannot build FASTA index"
+                            )
+                        length += bases
+                    last_line_short = bases < line_bases or bases == 0
+                elif line.strip():
+                    raise ValueError(f"Text before first FASTA header in {fasta_file}")
+                
+                position += width
+            
+            if seq_id is not None:
+                entries[seq_id] = (length, offset, line_bases, line_width)
+        
+        return entries
+    
+    def _load(self) -> Dict[str, Tuple[int, int, int, int]]:
+        """Read index entries from the .fai file."""
+        entries = {}
+        with open(self.index_path, 'r') as f:
+            for line in f:
+                fields = line.rstrip('\n').split('\t')
+                if len(fields) >= 5:
+                    entries[fields[0]] = tuple(int(x) for x in fields[1:5])
+        return entries
+    
+    def _save(self):
+        """Write index entries to the .fai file."""
+        with open(self.index_path, 'w') as f:
+            for seq_id, (length, offset, line_bases, line_width) in self.entries.items():
+                f.write(f"{seq_id}\t{length}\t{offset}\t{line_bases}\t{line_width}\n")
+    
+    def get(self, seq_id: str, start: int = 0, end: Optional[int] = None) -> str:
+        """
+        Fetch a record, or the 0-based half-open range [start, end) of it.
+        
+        Args:
+            seq_id (str): Sequence identifier
+            start (int): First position (default: 0)
+            end (int): Position after the last one (default: record length)
+            
+        Returns:
+            str: Uppercase sequence
+            
+        Raises:
+            KeyError: If seq_id is not in the index
+            ValueError: If the range is invalid
+            
+        Example:
+            >>> index.get("seq1", 0, 10)
+            'ATGCATGCAT'
+        """
+        length, offset, line_bases, line_width = self.entries[seq_id]
+        if end is None:
+            end = length
+        if not 0 <= start <= end <= length:
+            raise ValueError(f"Invalid range [{start}, {end}) for {seq_id} "
+                             f"of length {length}")
+        if start == end:
+            return ""
+        
+        first = offset + (start // line_bases) * line_width + start % line_bases
+        last = offset + ((end - 1) // line_bases) * line_width + (end - 1) % line_bases
+        
+        data = self._mapping()[first:last + 1]
+        return data.replace(b'\n', b'').replace(b'\r', b'').decode().upper()
+    
+    def _mapping(self) -> mmap.mmap:
+        """Open the memory map on first use."""
+        if self._map is None:
+            self._file = open(self.fasta_path, 'rb')
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+    
+    def length(self, seq_id: str) -> int:
+        """Return the length of a record."""
+        return self.entries[seq_id][0]
+    
+    def keys(self) -> List[str]:
+        """Return the record IDs in file order."""
+        return list(self.entries)
+    
+    def close(self):
+        """Release the memory map and file handle."""
+        if self._map is not None:
+            self._map.close()
+            self._file.close()
+            self._map = None
+            self._file = None
+    
+    def __contains__(self, seq_id: str) -> bool:
+        return seq_id in self.entries
+    
+    def __len__(self) -> int:
+        return len(self.entries)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
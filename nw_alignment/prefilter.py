@@ -0,0 +1,124 @@
+"""
+Alignment Prefilters
+
+Cheap similarity bounds used to skip pairs before running a full
+Needleman-Wunsch alignment.
+"""
+
+from typing import Dict, Tuple
+
+
+def edit_distance(seq1: str, seq2: str) -> int:
+    """
+    Compute the unit-cost (Levenshtein) distance between two sequences.
+
+    Uses Myers' bit-parallel algorithm in Hyyro's global formulation: one
+    column of the DP matrix is encoded as vertical +1/-1 delta bit
+    vectors over seq1, and each residue of seq2 updates the whole column
+    with a constant number of integer operations. Python integers act as
+    arbitrarily wide bit vectors, so the cost is O(len(seq2) * len(seq1) / w)
+    for machine word size w.
+
+    Args:
+        seq1 (str): First sequence (bit-vector axis)
+        seq2 (str): Second sequence
+
+    Returns:
+        int: Minimum number of substitutions, insertions and deletions
+
+    Example:
+        >>> edit_distance("GATTACA", "GCATGCU")
+        4
+    """
+    m = len(seq1)
+    if m == 0:
+        return len(seq2)
+
+    # Peq[c] has bit i set where seq1[i] == c
+    peq: Dict[str, int] = {}
+    for i, residue in enumerate(seq1):
+        peq[residue] = peq.get(residue, 0) | (1 << i)
+
+    full = (1 << m) - 1
+    last = 1 << (m - 1)
+    pv, mv = full, 0
+    distance = m
+
+    for residue in seq2:
+        eq = peq.get(residue, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & full)
+        mh = pv & xh
+
+        if ph & last:
+            distance += 1
+        elif mh & last:
+            distance -= 1
+
+        # Row 0 of a global alignment grows by one per column
+        ph = ((ph << 1) | 1) & full
+        mh = (mh << 1) & full
+        pv = mh | (~(xv | ph) & full)
+        mv = ph & xv
+
+    return distance
+
+
+def identity_bounds(seq1: str, seq2: str) -> Tuple[float, float]:
+    """
+    Bound the identity percentage of a global alignment from the edit distance.
+
+    Let s and l be the shorter and longer length and D the edit distance.
+    Every alignment has at least D non-match columns, at most s matches
+    and at least l columns, so no alignment has identity above
+    s / max(s + D, l). The unit-cost alignment itself has at least l - D
+    matches in at most l + D columns, so some alignment reaches at least
+    (l - D) / (l + D).
+
+    Args:
+        seq1 (str): First sequence
+        seq2 (str): Second sequence
+
+    Returns:
+        tuple: (lower, upper) identity percentages
+
+    Example:
+        >>> lower, upper = identity_bounds(ref_seq, seq)
+        >>> if upper < 90.0:
+        ...     print("cannot reach 90% identity")
+    """
+    seq1 = str(seq1).upper()
+    seq2 = str(seq2).upper()
+    short, long_ = sorted((len(seq1), len(seq2)))
+    if long_ == 0:
+        return 0.0, 0.0
+
+    # The shorter sequence is the narrower bit vector
+    if len(seq1) > len(seq2):
+        seq1, seq2 = seq2, seq1
+    distance = edit_distance(seq1, seq2)
+
+    upper = short / max(short + distance, long_) * 100
+    lower = max(0, long_ - distance) / (long_ + distance) * 100
+    return lower, upper
+
+
+class BelowIdentityCutoff(ValueError):
+    """
+    Raised when a pair cannot reach the requested identity.
+
+    Attributes:
+        max_identity (float): Upper bound from identity_bounds() (%)
+        min_identity (float): Requested cutoff (%)
+    """
+
+    def __init__(self, max_identity: float, min_identity: float):
+        # Keep both values in args so the exception pickles across processes
+        super().__init__(max_identity, min_identity)
+        self.max_identity = max_identity
+        self.min_identity = min_identity
+
+    def __str__(self) -> str:
+        return (f"identity <= {self.max_identity:.2f}% is below the "
+                f"{self.min_identity:.2f}% cutoff")
@@ -0,0 +1,208 @@
+"""
+Per-Phase Instrumentation
+
+Lightweight timers for the phases of an alignment run (parsing, dynamic
+programming, export, plotting). Library code marks its phases with
+phase(); nothing is measured unless a Profiler is active, so the hooks
+cost next to nothing in normal use.
+"""
+
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+import json
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+# Profilers receiving phase() records, innermost last
+_active: List['Profiler'] = []
+
+
+def peak_rss_mb() -> Optional[float]:
+    """
+    Peak resident set size of this process so far.
+
+    Returns:
+        float or None: Megabytes, or None where the platform does not
+        report it
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10
+
+
+class Profiler:
+    """
+    Collect wall time, CPU time, peak RSS and DP cell counts per phase.
+
+    Each finished phase produces a record dict with the keys 'phase',
+    'depth' (nesting level), 'wall_s', 'cpu_s', 'peak_rss_mb' and
+    'cells' (DP cells the engine actually computed, or None for phases
+    without a DP). Cells measure work done, not matrix size: 'banded'
+    and 'wfa' compute far fewer than m * n, 'hirschberg' recomputes
+    about twice as many, so cells / wall_s is a fair throughput. Records
+    are kept in finishing order and passed to callback, if given, so
+    they can be forwarded to a metrics system as they happen.
+
+    CPU time covers this process only; work done in align_many() worker
+    processes shows up as wall time. Peak RSS is the process high-water
+    mark at the end of the phase, so it never decreases from one phase to
+    the next.
+
+    Args:
+        callback (callable, optional): Called with each finished record
+
+    Example:
+        >>> profiler = Profiler()
+        >>> with profiler:
+        ...     with profiler.phase('parse'):
+        ...         seq_id, seq, _ = read_fasta("seq.fasta")
+        ...     result = aligner.align(seq, other)   # records 'dp'
+        >>> print(profiler.format_table())
+    """
+
+    def __init__(self, callback: Optional[Callable[[Dict], None]] = None):
+        self.callback = callback
+        self.records: List[Dict] = []
+        self._depth = 0
+
+    @contextmanager
+    def phase(self, name: str, cells: Optional[int] = None):
+        """
+        Time the enclosed block as one phase.
+
+        Args:
+            name (str): Phase name
+            cells (int, optional): DP cells computed in the phase; may
+                also be set later through the yielded record
+
+        Yields:
+            dict: The phase record, filled in when the block exits
+        """
+        record = {'phase': name, 'depth': self._depth, 'cells': cells}
+        self._depth += 1
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield record
+        finally:
+            record['wall_s'] = time.perf_counter() - wall
+            record['cpu_s'] = time.process_time() - cpu
+            record['peak_rss_mb'] = peak_rss_mb()
+            self._depth -= 1
+            self.records.append(record)
+            if self.callback is not None:
+                self.callback(record)
+
+    def totals(self) -> Dict:
+        """
+        Sum the top-level phases.
+
+        Returns:
+            dict: 'wall_s', 'cpu_s', 'cells' (over all phases) and the
+            final 'peak_rss_mb'
+        """
+        top = [r for r in self.records if r['depth'] == 0]
+        return {
+            'wall_s': sum(r['wall_s'] for r in top),
+            'cpu_s': sum(r['cpu_s'] for r in top),
+            'cells': sum(r['cells'] or 0 for r in self.records),
+            'peak_rss_mb': peak_rss_mb(),
+        }
+
+    def ordered_records(self) -> List[Dict]:
+        """
+        Records in starting order, so nested phases follow their parent.
+
+        Returns:
+            list: Phase records
+        """
+        # A phase finishes after the phases nested in it; move each
+        # parent in front of its children
+        pending: List[List[Dict]] = [[]]
+        for record in self.records:
+            while len(pending) <= record['depth'] + 1:
+                pending.append([])
+            children = pending[record['depth'] + 1]
+            pending[record['depth']].extend([record] + children)
+            children.clear()
+        return pending[0]
+
+    def format_table(self) -> str:
+        """
+        Render the phases as a text table.
+
+        Returns:
+            str: Breakdown table with a total row
+        """
+        def fmt(value, spec):
+            return format(value, spec) if value is not None else '-'
+
+        lines = [f"{'Phase':<24}{'Wall (s)':>10}{'CPU (s)':>10}"
+                 f"{'Peak RSS (MB)':>15}{'DP cells':>15}",
+                 "-" * 74]
+        for record in self.ordered_records():
+            name = "  " * record['depth'] + record['phase']
+            lines.append(f"{name:<24}{record['wall_s']:>10.4f}{record['cpu_s']:>10.4f}"
+                         f"{fmt(record['peak_rss_mb'], '.1f'):>15}"
+                         f"{fmt(record['cells'], ','):>15}")
+        totals = self.totals()
+        lines.append("-" * 74)
+        lines.append(f"{'Total':<24}{totals['wall_s']:>10.4f}{totals['cpu_s']:>10.4f}"
+                     f"{fmt(totals['peak_rss_mb'], '.1f'):>15}"
+                     f"{fmt(totals['cells'] or None, ','):>15}")
+        return "\n".join(lines)
+
+    def to_dict(self) -> Dict:
+        """
+        JSON-serializable report.
+
+        Returns:
+            dict: 'phases' (records in starting order) and 'total'
+        """
+        return {'phases': self.ordered_records(), 'total': self.totals()}
+
+    def save(self, output_file: str):
+        """
+        Write to_dict() as JSON.
+
+        Args:
+            output_file (str): Path to output JSON file
+        """
+        Path(output_file).write_text(json.dumps(self.to_dict(), indent=2))
+
+    def __enter__(self):
+        _active.append(self)
+        return self
+
+    def __exit__(self, *exc):
+        _active.remove(self)
+
+
+@contextmanager
+def phase(name: str, cells: Optional[int] = None):
+    """
+    Mark a phase for the active profiler, if any.
+
+    Used by library code; a no-op unless a Profiler is active.
+
+    Args:
+        name (str): Phase name
+        cells (int, optional): DP cells computed in the phase
+
+    Yields:
+        dict or None: The phase record, or None when not profiling
+    """
+    if not _active:
+        yield None
+        return
+    with _active[-1].phase(name, cells) as record:
+        yield record
@@ -0,0 +1,353 @@
+"""
+Alignment Results
+
+Compact container for a pairwise alignment: the two input sequences are
+referenced, and the alignment itself is kept as a run-length edit
+script (CIGAR) instead of two gapped strings.
+"""
+
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional, Tuple
+import re
+
+import numpy as np
+
+from .engines import encode_sequence
+
+
+# Extended CIGAR operations, with seq1 as the reference:
+#   '=' match, 'X' mismatch, 'D' residue of seq1 against a gap in seq2,
+#   'I' residue of seq2 against a gap in seq1
+_OP_MATCH, _OP_MISMATCH, _OP_DELETE, _OP_INSERT = b'=XDI'
+_GAP = ord('-')
+_CIGAR_RUN = re.compile(r'(\d+)([=XDI])')
+
+
+def build_statistics(matches: int, mismatches: int, gaps_seq1: int,
+                     gaps_seq2: int, gap_opens_seq1: int, gap_opens_seq2: int,
+                     length: int, score: float) -> Dict:
+    """
+    Assemble the alignment_stats dictionary from column counts.
+
+    Args:
+        matches (int): Identical columns
+        mismatches (int): Substitution columns
+        gaps_seq1 (int): Gap characters in the first aligned sequence
+        gaps_seq2 (int): Gap characters in the second aligned sequence
+        gap_opens_seq1 (int): Gap runs in the first aligned sequence
+        gap_opens_seq2 (int): Gap runs in the second aligned sequence
+        length (int): Alignment length in columns
+        score (float): Alignment score
+
+    Returns:
+        dict: Statistics dictionary with computed metrics
+    """
+    total_gaps = gaps_seq1 + gaps_seq2
+    identity = (matches / length * 100) if length > 0 else 0
+    gap_percentage = (total_gaps / (length * 2) * 100) if length > 0 else 0
+
+    return {
+        'matches': matches,
+        'mismatches': mismatches,
+        'gaps': total_gaps,
+        'gaps_seq1': gaps_seq1,
+        'gaps_seq2': gaps_seq2,
+        'gap_opens': gap_opens_seq1 + gap_opens_seq2,
+        'gap_opens_seq1': gap_opens_seq1,
+        'gap_opens_seq2': gap_opens_seq2,
+        'identity': identity,
+        'length': length,
+        'score': score,
+        'gap_percentage': gap_percentage,
+        'match_percentage': (matches / length * 100) if length > 0 else 0,
+        'mismatch_percentage': (mismatches / length * 100) if length > 0 else 0
+    }
+
+
+def cigar_runs(aligned_seq1: str, aligned_seq2: str) -> List[Tuple[int, str]]:
+    """
+    Run-length encode two gapped strings as extended CIGAR operations.
+
+    Args:
+        aligned_seq1 (str): First aligned sequence
+        aligned_seq2 (str): Second aligned sequence
+
+    Returns:
+        list: (length, op) runs with op one of '=', 'X', 'D', 'I'
+
+    Example:
+        >>> cigar_runs("AC-GT", "ACTG-")
+        [(2, '='), (1, 'I'), (1, '='), (1, 'D')]
+    """
+    a = encode_sequence(aligned_seq1)
+    b = encode_sequence(aligned_seq2)
+    if not a.size:
+        return []
+
+    ops = np.full(a.size, _OP_MISMATCH, dtype=np.uint8)
+    ops[a == _GAP] = _OP_INSERT
+    ops[b == _GAP] = _OP_DELETE
+    ops[a == b] = _OP_MATCH
+
+    starts = np.concatenate(([0], np.flatnonzero(ops[1:] != ops[:-1]) + 1))
+    lengths = np.diff(np.concatenate((starts, [a.size])))
+    return [(int(n), chr(op)) for n, op in zip(lengths, ops[starts])]
+
+
+class AlignmentResult(Mapping):
+    """
+    Result of NWAligner.align().
+
+    The alignment is stored as a CIGAR string plus references to the two
+    (uppercased) input sequences, so a result costs O(edit runs) rather
+    than O(alignment length); sequences shared between results, such as
+    a batch reference, are not copied. The gapped strings are rebuilt
+    from the CIGAR each time they are accessed.
+
+    The references keep both input sequences alive for as long as the
+    result is, so a live result still holds O(m + n) memory unless its
+    sequences are referenced elsewhere anyway. Callers that keep many
+    results (e.g. one per query of a batch) should keep only
+    to_record(), which omits the sequences, and rebuild a result with
+    from_record() when the gapped strings are needed.
+
+    The elapsed attribute holds the seconds align() spent producing the
+    result (None when built directly); it is not one of the keys.
+
+    Results behave as read-only dictionaries with the keys listed in
+    KEYS, so code written against the former dict results keeps working;
+    dict(result) gives a plain dictionary (e.g. for JSON).
+
+    Example:
+        >>> result = aligner.align("ACGT", "AGT")
+        >>> result.cigar
+        '1=1D2='
+        >>> result['aligned_seq1'], result['aligned_seq2']
+        ('ACGT', 'A-GT')
+    """
+
+    KEYS = ('aligned_seq1', 'aligned_seq2', 'cigar', 'score', 'matches',
+            'mismatches', 'gaps', 'gaps_seq1', 'gaps_seq2', 'gap_opens_seq1',
+            'gap_opens_seq2', 'identity', 'length', 'alignment_stats')
+
+    __slots__ = ('score', 'cigar', 'matches', 'mismatches', 'gaps_seq1',
+                 'gaps_seq2', 'gap_opens_seq1', 'gap_opens_seq2', 'length',
+                 'elapsed', '_seq1', '_seq2', '_aligned')
+
+    def __init__(self, seq1, seq2, runs: List[Tuple[int, str]], score: float,
+                 aligned: Optional[Tuple[str, str]] = None):
+        """
+        Build a result from CIGAR runs.
+
+        Args:
+            seq1 (str or PackedSequence): First (ungapped) sequence
+            seq2 (str or PackedSequence): Second (ungapped) sequence
+            runs (list): (length, op) runs, see cigar_runs()
+            score (float): Alignment score
+            aligned (tuple, optional): Gapped strings to keep verbatim
+                when the CIGAR cannot reproduce them
+        """
+        totals = {'=': 0, 'X': 0, 'D': 0, 'I': 0}
+        opens = {'D': 0, 'I': 0}
+        previous = None
+        for n, op in runs:
+            totals[op] += n
+            if op in opens and op != previous:
+                opens[op] += 1
+            previous = op
+
+        self.score = score
+        self.cigar = ''.join(f"{n}{op}" for n, op in runs)
+        self.matches = totals['=']
+        self.mismatches = totals['X']
+        self.gaps_seq1 = totals['I']
+        self.gaps_seq2 = totals['D']
+        self.gap_opens_seq1 = opens['I']
+        self.gap_opens_seq2 = opens['D']
+        self.length = sum(totals.values())
+        self.elapsed = None
+        self._seq1 = seq1
+        self._seq2 = seq2
+        self._aligned = aligned
+
+    @classmethod
+    def from_aligned(cls, seq1, seq2, aligned_seq1: str, aligned_seq2: str,
+                     score: float) -> 'AlignmentResult':
+        """
+        Encode an engine's gapped strings.
+
+        If the sequences themselves contain '-', the gap columns are
+        ambiguous; the gapped strings are then kept as they are.
+
+        Args:
+            seq1 (str or PackedSequence): First (ungapped) sequence
+            seq2 (str or PackedSequence): Second (ungapped) sequence
+            aligned_seq1 (str): First aligned sequence
+            aligned_seq2 (str): Second aligned sequence
+            score (float): Alignment score
+
+        Returns:
+            AlignmentResult: The encoded result
+        """
+        result = cls(seq1, seq2, cigar_runs(aligned_seq1, aligned_seq2), score)
+        if (result.length - result.gaps_seq1 != len(seq1) or
+                result.length - result.gaps_seq2 != len(seq2)):
+            result._aligned = (aligned_seq1, aligned_seq2)
+        return result
+
+    @classmethod
+    def from_record(cls, seq1, seq2, record: Dict) -> 'AlignmentResult':
+        """
+        Rebuild a result from to_record() output and its sequences.
+
+        Args:
+            seq1 (str or PackedSequence): First (ungapped) sequence
+            seq2 (str or PackedSequence): Second (ungapped) sequence
+            record (dict): Output of to_record()
+
+        Returns:
+            AlignmentResult: The restored result
+        """
+        if 'aligned_seq1' in record:
+            return cls.from_aligned(seq1, seq2, record['aligned_seq1'],
+                                    record['aligned_seq2'], record['score'])
+        runs = [(int(n), op) for n, op in _CIGAR_RUN.findall(record['cigar'])]
+        return cls(seq1, seq2, runs, record['score'])
+
+    def to_record(self) -> Dict:
+        """
+        Compact JSON-serializable form that omits the input sequences.
+
+        Returns:
+            dict: 'score' and 'cigar' (plus the gapped strings when they
+            are stored verbatim)
+        """
+        record = {'score': self.score, 'cigar': self.cigar}
+        if self._aligned is not None:
+            record['aligned_seq1'], record['aligned_seq2'] = self._aligned
+        return record
+
+    def _gapped(self) -> Tuple[str, str]:
+        """Expand the CIGAR against the input sequences."""
+        if self._aligned is not None:
+            return self._aligned
+
+        seq1, seq2 = str(self._seq1), str(self._seq2)
+        out1, out2 = [], []
+        i = j = 0
+        for n, op in _CIGAR_RUN.findall(self.cigar):
+            n = int(n)
+            if op == 'I':
+                out1.append('-' * n)
+                out2.append(seq2[j:j + n])
+                j += n
+            elif op == 'D':
+                out1.append(seq1[i:i + n])
+                out2.append('-' * n)
+                i += n
+            else:
+                out1.append(seq1[i:i + n])
+                out2.append(seq2[j:j + n])
+                i += n
+                j += n
+        return ''.join(out1), ''.join(out2)
+
+    def iter_chunks(self, size: int) -> Iterator[Tuple[str, str]]:
+        """
+        Yield the gapped strings in pieces of size columns.
+
+        The CIGAR is expanded lazily, so only one piece of each string is
+        in memory at a time; the last piece may be shorter.
+
+        Args:
+            size (int): Columns per piece
+
+        Yields:
+            tuple: (piece of aligned_seq1, piece of aligned_seq2)
+        """
+        if self._aligned is not None:
+            aligned_seq1, aligned_seq2 = self._aligned
+            for k in range(0, len(aligned_seq1), size):
+                yield aligned_seq1[k:k + size], aligned_seq2[k:k + size]
+            return
+
+        seq1, seq2 = self._seq1, self._seq2
+        out1, out2 = [], []
+        filled = i = j = 0
+        for run in _CIGAR_RUN.finditer(self.cigar):
+            n, op = int(run.group(1)), run.group(2)
+            while n:
+                take = min(n, size - filled)
+                if op == 'I':
+                    out1.append('-' * take)
+                    out2.append(seq2[j:j + take])
+                    j += take
+                elif op == 'D':
+                    out1.append(seq1[i:i + take])
+                    out2.append('-' * take)
+                    i += take
+                else:
+                    out1.append(seq1[i:i + take])
+                    out2.append(seq2[j:j + take])
+                    i += take
+                    j += take
+                n -= take
+                filled += take
+                if filled == size:
+                    yield ''.join(out1), ''.join(out2)
+                    out1, out2 = [], []
+                    filled = 0
+        if filled:
+            yield ''.join(out1), ''.join(out2)
+
+    @property
+    def aligned_seq1(self) -> str:
+        """str: First sequence with gaps, rebuilt on every access."""
+        return self._gapped()[0]
+
+    @property
+    def aligned_seq2(self) -> str:
+        """str: Second sequence with gaps, rebuilt on every access."""
+        return self._gapped()[1]
+
+    @property
+    def gaps(self) -> int:
+        """int: Gap characters in both aligned sequences."""
+        return self.gaps_seq1 + self.gaps_seq2
+
+    @property
+    def identity(self) -> float:
+        """float: Percentage of identical columns."""
+        return (self.matches / self.length * 100) if self.length > 0 else 0
+
+    @property
+    def alignment_stats(self) -> Dict:
+        """dict: Detailed statistics, as built by build_statistics()."""
+        return build_statistics(self.matches, self.mismatches, self.gaps_seq1,
+                                self.gaps_seq2, self.gap_opens_seq1,
+                                self.gap_opens_seq2, self.length, self.score)
+
+    def __getitem__(self, key: str):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        if key in ('aligned_seq1', 'aligned_seq2'):
+            return self._gapped()[key == 'aligned_seq2']
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.KEYS)
+
+    def __len__(self) -> int:
+        return len(self.KEYS)
+
+    def __repr__(self) -> str:
+        return (f"AlignmentResult(score={self.score}, length={self.length}, "
+                f"identity={self.identity:.2f}, cigar='{self.cigar[:40]}"
+                f"{'...' if len(self.cigar) > 40 else ''}')")
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
@@ -0,0 +1,396 @@
+"""
+k-mer Sketch Index
+
+MinHash-style bottom-s sketches of nucleotide sequences, used to
+estimate how similar a query is to many references before running any
+alignment, and to pick the few references worth aligning.
+"""
+
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .engines import encode_sequence
+
+
+# Bump when the hashing or the saved layout changes
+SKETCH_FORMAT = 1
+
+# 2-bit code for each ASCII byte; 4 marks characters that break k-mers
+_KMER_CODE = np.full(256, 4, dtype=np.uint8)
+for _code, _base in enumerate(b'ACGT'):
+    _KMER_CODE[_base] = _code
+    _KMER_CODE[ord(chr(_base).lower())] = _code
+
+# Pads sketches shorter than sketch_size; never a real hash below it
+_EMPTY = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+
+def _mix64(values: np.ndarray) -> np.ndarray:
+    """Scramble 64-bit integers (splitmix64 finalizer) so order is random."""
+    values = values ^ (values >> np.uint64(30))
+    values = values * np.uint64(0xBF58476D1CE4E5B9)
+    values = values ^ (values >> np.uint64(27))
+    values = values * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+def kmer_hashes(seq, k: int = 21, canonical: bool = True) -> np.ndarray:
+    """
+    Hash every k-mer of a nucleotide sequence.
+
+    k-mers are packed two bits per base into 64-bit integers with k
+    vectorized shifts, so the cost is O(k * len(seq)). k-mers containing
+    a character other than A, C, G or T are skipped.
+
+    Args:
+        seq (str or PackedSequence): Nucleotide sequence
+        k (int): k-mer length, 1 to 31. Default is 21.
+        canonical (bool): Hash the smaller of each k-mer and its reverse
+            complement, so both strands give the same hashes. Default is True.
+
+    Returns:
+        np.ndarray: uint64 hashes, one per valid k-mer, in sequence order
+
+    Raises:
+        ValueError: If k is outside 1..31
+    """
+    kmers, valid = pack_kmers(seq, k, canonical)
+    return _mix64(kmers[valid])
+
+
+def pack_kmers(seq, k: int, canonical: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pack the k-mer starting at every position into a 64-bit integer.
+
+    Args:
+        seq (str or PackedSequence): Nucleotide sequence
+        k (int): k-mer length, 1 to 31
+        canonical (bool): Use the smaller of each k-mer and its reverse
+            complement. Default is False.
+
+    Returns:
+        tuple: (kmers, valid) arrays with one entry per start position;
+        valid is False for k-mers containing a character other than
+        A, C, G or T
+
+    Raises:
+        ValueError: If k is outside 1..31
+    """
+    if not 1 <= k <= 31:
+        raise ValueError("k must be between 1 and 31")
+
+    codes = _KMER_CODE[encode_sequence(seq)]
+    count = codes.size - k + 1
+    if count <= 0:
+        return np.zeros(0, dtype=np.uint64), np.zeros(0, dtype=bool)
+
+    # Windows containing a non-ACGT character are invalid
+    invalid = np.concatenate(([0], np.cumsum(codes == 4)))
+    valid = invalid[k:] == invalid[:-k]
+
+    values = codes.astype(np.uint64)
+    forward = np.zeros(count, dtype=np.uint64)
+    reverse = np.zeros(count, dtype=np.uint64)
+    for t in range(k):
+        window = values[t:t + count]
+        forward = (forward << np.uint64(2)) | window
+        if canonical:
+            reverse |= (np.uint64(3) - window) << np.uint64(2 * t)
+
+    return (np.minimum(forward, reverse) if canonical else forward), valid
+
+
+def sketch(seq, k: int = 21, sketch_size: int = 1000,
+           canonical: bool = True) -> np.ndarray:
+    """
+    Bottom-s MinHash sketch of a sequence.
+
+    Args:
+        seq (str or PackedSequence): Nucleotide sequence
+        k (int): k-mer length. Default is 21.
+        sketch_size (int): Number of smallest distinct hashes kept.
+            Default is 1000.
+        canonical (bool): Strand-independent k-mers. Default is True.
+
+    Returns:
+        np.ndarray: Sorted uint64 hashes (fewer than sketch_size for
+        sequences with fewer distinct k-mers)
+    """
+    return np.unique(kmer_hashes(seq, k, canonical))[:sketch_size]
+
+
+def jaccard_to_identity(jaccard: np.ndarray, k: int) -> np.ndarray:
+    """
+    Convert k-mer Jaccard estimates to identity estimates (Mash distance).
+
+    Args:
+        jaccard (np.ndarray): Jaccard similarities in [0, 1]
+        k (int): k-mer length of the sketches
+
+    Returns:
+        np.ndarray: Estimated identity (%), 0 where no k-mer is shared
+    """
+    jaccard = np.asarray(jaccard, dtype=np.float64)
+    identity = np.zeros_like(jaccard)
+    shared = jaccard > 0
+    identity[shared] = 1 + np.log(2 * jaccard[shared] / (1 + jaccard[shared])) / k
+    return np.clip(identity, 0, 1) * 100
+
+
+class SketchIndex:
+    """
+    Sketches of many reference sequences, searchable by similarity.
+
+    Every reference is reduced to a bottom-s MinHash sketch; the sketches
+    are kept as rows of one uint64 matrix, so a query is compared with
+    all references in a few vectorized NumPy operations (microseconds per
+    reference). The k-mer Jaccard similarity is estimated from the hashes
+    both sketches share below the smaller of their two largest hashes,
+    and turned into an identity estimate with the Mash formula.
+
+    Estimates are approximate (a few percent) and only meaningful for
+    reasonably similar sequences; use them to rank or discard
+    references, then align the survivors.
+
+    Args:
+        k (int): k-mer length, 1 to 31. Default is 21.
+        sketch_size (int): Hashes kept per sequence. Default is 1000.
+        canonical (bool): Strand-independent k-mers. Default is True.
+
+    Example:
+        >>> index = SketchIndex.from_fasta("references.fasta")
+        >>> index.save("references.sketch.npz")
+        >>> for ref_id, jaccard, identity in index.search(query, top_k=3):
+        ...     print(ref_id, f"~{identity:.1f}%")
+    """
+
+    def __init__(self, k: int = 21, sketch_size: int = 1000, canonical: bool = True):
+        if not 1 <= k <= 31:
+            raise ValueError("k must be between 1 and 31")
+        if sketch_size < 1:
+            raise ValueError("sketch_size must be at least 1")
+
+        self.k = k
+        self.sketch_size = sketch_size
+        self.canonical = canonical
+        self.ids: List[str] = []
+        self._sketches: List[np.ndarray] = []
+        self._matrix: Optional[np.ndarray] = None
+        self._sizes: Optional[np.ndarray] = None
+        self._lookup = None
+
+    @classmethod
+    def from_fasta(cls, fasta_file: str, k: int = 21, sketch_size: int = 1000,
+                   canonical: bool = True, index_file: Optional[str] = None,
+                   rebuild: bool = False) -> 'SketchIndex':
+        """
+        Sketch every record of a (multi-)FASTA file.
+
+        With index_file, a saved index is reused when it is not older
+        than the FASTA file and was built with the same parameters;
+        otherwise the index is built and saved there.
+
+        Args:
+            fasta_file (str): Path to FASTA file
+            k (int): k-mer length. Default is 21.
+            sketch_size (int): Hashes kept per sequence. Default is 1000.
+            canonical (bool): Strand-independent k-mers. Default is True.
+            index_file (str, optional): .npz file to load from or save to
+            rebuild (bool): Ignore an existing index_file. Default is False.
+
+        Returns:
+            SketchIndex: Index of the file's records
+        """
+        from .parser import iter_fasta
+
+        fasta_path = Path(fasta_file)
+        if not fasta_path.exists():
+            raise FileNotFoundError(f"FASTA file not found: {fasta_file}")
+
+        if (index_file and not rebuild and Path(index_file).exists() and
+                Path(index_file).stat().st_mtime >= fasta_path.stat().st_mtime):
+            try:
+                index = cls.load(index_file)
+            except ValueError:
+                index = None
+            params = (k, sketch_size, canonical)
+            if index is not None and (index.k, index.sketch_size, index.canonical) == params:
+                return index
+
+        index = cls(k, sketch_size, canonical)
+        index.add_many((seq_id, seq) for seq_id, seq, _ in iter_fasta(str(fasta_path)))
+        if index_file:
+            index.save(index_file)
+        return index
+
+    def add(self, seq_id: str, seq):
+        """
+        Sketch one reference sequence.
+
+        Args:
+            seq_id (str): Reference identifier
+            seq (str or PackedSequence): Reference sequence
+        """
+        self.ids.append(seq_id)
+        self._sketches.append(sketch(seq, self.k, self.sketch_size, self.canonical))
+        self._matrix = None
+
+    def add_many(self, records: Iterable[Tuple[str, str]]):
+        """
+        Sketch several reference sequences.
+
+        Args:
+            records (iterable): (seq_id, seq) pairs
+        """
+        for seq_id, seq in records:
+            self.add(seq_id, seq)
+
+    def _rows(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Stack the sketches into a padded matrix, once per change."""
+        if self._matrix is None:
+            self._matrix = np.full((len(self._sketches), self.sketch_size), _EMPTY,
+                                   dtype=np.uint64)
+            self._sizes = np.zeros(len(self._sketches), dtype=np.int64)
+            for row, hashes in enumerate(self._sketches):
+                self._matrix[row, :hashes.size] = hashes
+                self._sizes[row] = hashes.size
+            self._lookup = None
+        return self._matrix, self._sizes
+
+    def _inverted(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Every reference hash in sorted order, with the row it came from.
+
+        Returns:
+            tuple: (sorted hashes, their rows, largest hash of each row)
+        """
+        matrix, sizes = self._rows()
+        if self._lookup is None:
+            rows = np.repeat(np.arange(len(sizes)), sizes)
+            hashes = np.concatenate([matrix[row, :size] for row, size in enumerate(sizes)]
+                                    or [np.zeros(0, dtype=np.uint64)])
+            order = np.argsort(hashes, kind='stable')
+            largest = matrix[np.arange(len(sizes)), np.maximum(sizes - 1, 0)]
+            self._lookup = (hashes[order], rows[order], largest)
+        return self._lookup
+
+    def similarity(self, seq) -> np.ndarray:
+        """
+        Estimate the k-mer Jaccard similarity of a query to every reference.
+
+        The query's hashes are looked up in an inverted index of all
+        reference hashes, so the cost grows with the number of shared
+        hashes rather than with the size of the index.
+
+        Args:
+            seq (str or PackedSequence): Query sequence
+
+        Returns:
+            np.ndarray: Jaccard estimate per reference, in ids order
+        """
+        matrix, sizes = self._rows()
+        query = sketch(seq, self.k, self.sketch_size, self.canonical)
+        if not query.size or not matrix.size:
+            return np.zeros(len(self.ids))
+        hashes, rows, largest = self._inverted()
+
+        # Only hashes up to the smaller of the two largest are comparable
+        cutoff = np.minimum(largest, query[-1])
+
+        # Reference rows holding each query hash
+        first = np.searchsorted(hashes, query, side='left')
+        counts = np.searchsorted(hashes, query, side='right') - first
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        hit_rows = rows[np.repeat(first, counts) + offsets]
+        hit_hashes = np.repeat(query, counts)
+        keep = hit_hashes <= cutoff[hit_rows]
+        shared = np.bincount(hit_rows[keep], minlength=len(sizes))
+
+        # Reference hashes under the cutoff: all of them unless the row
+        # extends beyond the query's largest hash
+        below = sizes.copy()
+        longer = np.flatnonzero(largest > query[-1])
+        below[longer] = np.count_nonzero(matrix[longer] <= query[-1], axis=1)
+        union = below + np.searchsorted(query, cutoff, side='right') - shared
+
+        jaccard = np.zeros(len(sizes))
+        np.divide(shared, union, out=jaccard, where=(union > 0) & (sizes > 0))
+        return jaccard
+
+    def search(self, seq, top_k: int = 5,
+               min_identity: Optional[float] = None) -> List[Tuple[str, float, float]]:
+        """
+        Find the references most similar to a query.
+
+        Args:
+            seq (str or PackedSequence): Query sequence
+            top_k (int): Number of references to return. Default is 5.
+            min_identity (float, optional): Drop references whose
+                estimated identity (%) is below this
+
+        Returns:
+            list: (ref_id, jaccard, estimated identity %) tuples, most
+            similar first; references sharing no sketch hash are omitted
+        """
+        jaccard = self.similarity(seq)
+        identity = jaccard_to_identity(jaccard, self.k)
+
+        keep = jaccard > 0
+        if min_identity is not None:
+            keep &= identity >= min_identity
+        candidates = np.flatnonzero(keep)
+        order = candidates[np.argsort(-jaccard[candidates], kind='stable')][:top_k]
+        return [(self.ids[i], float(jaccard[i]), float(identity[i])) for i in order]
+
+    def save(self, index_file: str):
+        """
+        Write the index to a compressed .npz file.
+
+        Args:
+            index_file (str): Output path
+        """
+        matrix, sizes = self._rows()
+        Path(index_file).parent.mkdir(parents=True, exist_ok=True)
+        with open(index_file, 'wb') as f:
+            np.savez_compressed(
+                f,
+                format=SKETCH_FORMAT,
+                params=np.array([self.k, self.sketch_size, int(self.canonical)]),
+                ids=np.array(self.ids, dtype=str),
+                sketches=matrix,
+                sizes=sizes,
+            )
+
+    @classmethod
+    def load(cls, index_file: str) -> 'SketchIndex':
+        """
+        Read an index written by save().
+
+        Args:
+            index_file (str): Path to the .npz file
+
+        Returns:
+            SketchIndex: The restored index
+
+        Raises:
+            ValueError: If the file was written by an incompatible version
+        """
+        with np.load(index_file) as data:
+            if int(data['format']) != SKETCH_FORMAT:
+                raise ValueError(f"Unsupported sketch index format in {index_file}")
+            k, sketch_size, canonical = (int(value) for value in data['params'])
+            index = cls(k, sketch_size, bool(canonical))
+            index.ids = [str(seq_id) for seq_id in data['ids']]
+            index._matrix = data['sketches']
+            index._sizes = data['sizes']
+            index._lookup = None
+        index._sketches = [row[:size] for row, size in zip(index._matrix, index._sizes)]
+        return index
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, seq_id: str) -> bool:
+        return seq_id in self.ids
@@ -0,0 +1,216 @@
+"""
+Columnar Batch Output
+
+Collects one summary row per aligned pair and writes them to a single
+columnar file, with an optional compressed companion file holding the
+alignments themselves.
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional
+import gzip
+import json
+
+import numpy as np
+
+
+# Summary columns, in file order
+SUMMARY_COLUMNS = ('seq1_id', 'seq2_id', 'score', 'identity', 'matches',
+                   'mismatches', 'gaps', 'gaps_seq1', 'gaps_seq2', 'length',
+                   'elapsed')
+
+# Supported summary formats by file suffix
+SUMMARY_FORMATS = {
+    '.parquet': 'parquet',
+    '.feather': 'feather',
+    '.npz': 'npz',
+    '.csv': 'csv',
+}
+
+
+def _summary_format(path: Path) -> str:
+    """Pick the summary format from the file suffix."""
+    fmt = SUMMARY_FORMATS.get(path.suffix.lower())
+    if fmt is None:
+        raise ValueError(
+            f"Unsupported summary file '{path.name}'. "
+            f"Use one of: {', '.join(SUMMARY_FORMATS)}"
+        )
+    if fmt in ('parquet', 'feather'):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ImportError(
+                f"{fmt.capitalize()} output requires pyarrow "
+                f"(pip install pyarrow); use .npz or .csv otherwise"
+            ) from None
+    return fmt
+
+
+class SummaryWriter:
+    """
+    Accumulate per-pair summary rows and write them as one columnar file.
+
+    Rows are kept as NumPy-friendly column lists (a few dozen bytes per
+    pair) and written by close(); the format follows the file suffix:
+    .parquet and .feather (pandas + pyarrow), .npz (NumPy, compressed) or
+    .csv. When alignments_file is given, each alignment is appended to
+    it straight away as one gzip-compressed JSON line holding the ids,
+    score and CIGAR string, from which AlignmentResult.from_record()
+    rebuilds the alignment given the input sequences.
+
+    Args:
+        summary_file (str): Output path; its suffix selects the format
+        alignments_file (str, optional): Path of a .jsonl.gz alignment store
+
+    Raises:
+        ValueError: If the summary suffix is not supported
+        ImportError: If Parquet/Feather is requested without pyarrow
+
+    Example:
+        >>> with SummaryWriter("batch.parquet", "batch_alignments.jsonl.gz") as out:
+        ...     for seq_id, seq in queries:
+        ...         out.add(ref_id, seq_id, aligner.align(ref_seq, seq))
+        >>> table = read_summary("batch.parquet")
+    """
+
+    def __init__(self, summary_file: str, alignments_file: Optional[str] = None):
+        self.summary_path = Path(summary_file)
+        self.format = _summary_format(self.summary_path)
+        self.summary_path.parent.mkdir(parents=True, exist_ok=True)
+        self.columns: Dict[str, List] = {name: [] for name in SUMMARY_COLUMNS}
+
+        self._alignments = None
+        if alignments_file:
+            alignments_path = Path(alignments_file)
+            alignments_path.parent.mkdir(parents=True, exist_ok=True)
+            self._alignments = gzip.open(alignments_path, 'wt', encoding='utf-8')
+
+    def add(self, seq1_id: str, seq2_id: str, result, elapsed: Optional[float] = None):
+        """
+        Append the summary row of one alignment.
+
+        Args:
+            seq1_id (str): First sequence identifier
+            seq2_id (str): Second sequence identifier
+            result (dict): Alignment result from NWAligner.align()
+            elapsed (float, optional): Alignment time in seconds; defaults
+                to result.elapsed when available
+        """
+        if elapsed is None:
+            elapsed = getattr(result, 'elapsed', None)
+
+        row = {
+            'seq1_id': seq1_id,
+            'seq2_id': seq2_id,
+            'score': result['score'],
+            'identity': result['identity'],
+            'matches': result['matches'],
+            'mismatches': result['mismatches'],
+            'gaps': result['gaps'],
+            'gaps_seq1': result['gaps_seq1'],
+            'gaps_seq2': result['gaps_seq2'],
+            'length': result['length'],
+            'elapsed': np.nan if elapsed is None else elapsed,
+        }
+        for name in SUMMARY_COLUMNS:
+            self.columns[name].append(row[name])
+
+        if self._alignments is not None:
+            record = result.to_record() if hasattr(result, 'to_record') else {
+                'score': result['score'],
+                'aligned_seq1': result['aligned_seq1'],
+                'aligned_seq2': result['aligned_seq2'],
+            }
+            record = {'seq1_id': seq1_id, 'seq2_id': seq2_id, **record}
+            self._alignments.write(json.dumps(record) + "\n")
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """
+        Return the collected columns as typed NumPy arrays.
+
+        Returns:
+            dict: Column name -> array
+        """
+        arrays = {}
+        for name, values in self.columns.items():
+            if name in ('seq1_id', 'seq2_id'):
+                arrays[name] = np.array(values, dtype=str)
+            elif name in ('score', 'identity', 'elapsed'):
+                arrays[name] = np.array(values, dtype=np.float64)
+            else:
+                arrays[name] = np.array(values, dtype=np.int64)
+        return arrays
+
+    def close(self):
+        """Write the summary file and close the alignment store."""
+        if self._alignments is not None:
+            self._alignments.close()
+            self._alignments = None
+
+        arrays = self.arrays()
+        if self.format == 'npz':
+            np.savez_compressed(self.summary_path, **arrays)
+            return
+
+        import pandas as pd
+        table = pd.DataFrame(arrays, columns=list(SUMMARY_COLUMNS))
+        if self.format == 'parquet':
+            table.to_parquet(self.summary_path, index=False)
+        elif self.format == 'feather':
+            table.to_feather(self.summary_path)
+        else:
+            table.to_csv(self.summary_path, index=False)
+
+    def __len__(self) -> int:
+        return len(self.columns['seq1_id'])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_summary(summary_file: str):
+    """
+    Load a summary file written by SummaryWriter.
+
+    Args:
+        summary_file (str): Path to a .parquet, .feather, .npz or .csv file
+
+    Returns:
+        pandas.DataFrame: One row per aligned pair
+
+    Example:
+        >>> table = read_summary("batch.npz")
+        >>> table.sort_values('identity', ascending=False).head()
+    """
+    import pandas as pd
+
+    path = Path(summary_file)
+    fmt = _summary_format(path)
+    if fmt == 'npz':
+        with np.load(path) as data:
+            return pd.DataFrame({name: data[name] for name in SUMMARY_COLUMNS})
+    if fmt == 'parquet':
+        return pd.read_parquet(path)
+    if fmt == 'feather':
+        return pd.read_feather(path)
+    return pd.read_csv(path, dtype={'seq1_id': str, 'seq2_id': str})
+
+
+def iter_alignment_records(alignments_file: str):
+    """
+    Iterate over the records of a SummaryWriter alignment store.
+
+    Args:
+        alignments_file (str): Path to the .jsonl.gz store
+
+    Yields:
+        dict: 'seq1_id', 'seq2_id', 'score' and 'cigar' (or the gapped
+        strings for results that were not CIGAR-encoded)
+    """
+    with gzip.open(alignments_file, 'rt', encoding='utf-8') as f:
+        for line in f:
+            yield json.loads(line)
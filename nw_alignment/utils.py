@@ -4,10 +4,68 @@ Utility Functions
 Helper functions for alignment analysis and data processing.
 """
 
-from typing import Dict, List
+from typing import Dict, Iterator, List, TextIO, Tuple
 from pathlib import Path
 import json
 
+from .engines import match_line as build_match_line
+from .result import AlignmentResult
+
+
+# Blocks rendered per vectorized match-line pass
+RENDER_BATCH_BLOCKS = 1024
+
+
+def _iter_aligned_chunks(result, size: int) -> Iterator[Tuple[str, str]]:
+    """Yield the gapped strings of a result in pieces of size columns."""
+    if isinstance(result, AlignmentResult):
+        yield from result.iter_chunks(size)
+        return
+    seq1 = result['aligned_seq1']
+    seq2 = result['aligned_seq2']
+    for i in range(0, len(seq1), size):
+        yield seq1[i:i+size], seq2[i:i+size]
+
+
+def iter_alignment_blocks(result, line_width: int = 60) -> Iterator[str]:
+    """
+    Lazily render an alignment as wrapped text blocks.
+    
+    Each block is three lines (seq1, match line, seq2) followed by a
+    blank line. Columns are processed RENDER_BATCH_BLOCKS blocks at a
+    time, with one vectorized match-line pass per batch, so memory stays
+    constant however long the alignment is.
+    
+    Args:
+        result (dict): Alignment result from NWAligner.align()
+        line_width (int): Characters per line (default: 60)
+        
+    Yields:
+        str: Text of one block, ending with a blank line
+        
+    Example:
+        >>> with open("alignment.txt", "w") as f:
+        ...     f.writelines(iter_alignment_blocks(result))
+    """
+    for seq1, seq2 in _iter_aligned_chunks(result, line_width * RENDER_BATCH_BLOCKS):
+        matches = build_match_line(seq1, seq2)
+        for i in range(0, len(seq1), line_width):
+            yield (f"Seq1: {seq1[i:i+line_width]}\n"
+                   f"      {matches[i:i+line_width]}\n"
+                   f"Seq2: {seq2[i:i+line_width]}\n\n")
+
+
+def write_alignment_blocks(result, handle: TextIO, line_width: int = 60) -> None:
+    """
+    Write the blocks of iter_alignment_blocks() to an open text file.
+    
+    Args:
+        result (dict): Alignment result from NWAligner.align()
+        handle (file): Writable text file handle
+        line_width (int): Characters per line (default: 60)
+    """
+    handle.writelines(iter_alignment_blocks(result, line_width))
+
 
 def print_alignment_summary(result: Dict, seq1_id: str = "Seq1", 
                            seq2_id: str = "Seq2") -> None:
@@ -35,14 +93,22 @@ def print_alignment_summary(result: Dict, seq1_id: str = "Seq1",
     print("="*70 + "\n")
 
 
-def export_results(result: Dict, output_dir: str, base_name: str = "alignment") -> Dict:
+def export_results(result: Dict, output_dir: str, base_name: str = "alignment",
+                   expanded: bool = False) -> Dict:
     """
     Export alignment results to multiple formats.
     
+    The JSON file holds the compact record of an AlignmentResult (score
+    and CIGAR string, see AlignmentResult.to_record()) plus
+    'alignment_stats'; restore the alignment with
+    AlignmentResult.from_record(seq1, seq2, record).
+    
     Args:
         result (dict): Alignment result
         output_dir (str): Directory to save results
         base_name (str): Base name for output files
+        expanded (bool): Write every key instead, including both gapped
+            strings, indented. Default is False.
         
     Returns:
         dict: Paths to saved files
@@ -60,12 +126,17 @@ def export_results(result: Dict, output_dir: str, base_name: str = "alignment")
     # Save JSON
     json_file = output_path / f"{base_name}.json"
     with open(json_file, 'w', encoding='utf-8') as f:
-        json.dump(result, f, indent=2)
+        if expanded or not isinstance(result, AlignmentResult):
+            json.dump(dict(result), f, indent=2 if expanded else None)
+        else:
+            record = result.to_record()
+            record['alignment_stats'] = result['alignment_stats']
+            json.dump(record, f)
     files['json'] = str(json_file)
     
     # Save text alignment
     txt_file = output_path / f"{base_name}.txt"
-    with open(txt_file, 'w', encoding='utf-8') as f:
+    with open(txt_file, 'w', encoding='utf-8', buffering=1 << 20) as f:
         f.write("="*80 + "\n")
         f.write("NEEDLEMAN-WUNSCH ALIGNMENT RESULT\n")
         f.write("="*80 + "\n\n")
@@ -83,25 +154,7 @@ def export_results(result: Dict, output_dir: str, base_name: str = "alignment")
         f.write("ALIGNMENT\n")
         f.write("-"*80 + "\n\n")
         
-        # Write alignment with wrapping
-        seq1 = result['aligned_seq1']
-        seq2 = result['aligned_seq2']
-        line_width = 60
-        
-        for i in range(0, len(seq1), line_width):
-            f.write(f"Seq1: {seq1[i:i+line_width]}\n")
-            
-            match_line = ""
-            for s1, s2 in zip(seq1[i:i+line_width], seq2[i:i+line_width]):
-                if s1 == s2:
-                    match_line += "|"
-                elif s1 == "-" or s2 == "-":
-                    match_line += " "
-                else:
-                    match_line += "."
-            
-            f.write(f"      {match_line}\n")
-            f.write(f"Seq2: {seq2[i:i+line_width]}\n\n")
+        write_alignment_blocks(result, f)
     
     files['text'] = str(txt_file)
     
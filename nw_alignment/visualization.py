@@ -4,10 +4,20 @@ Visualization Functions for Alignment Results
 Create publication-quality plots for alignment statistics and analysis.
 """
 
-import matplotlib.pyplot as plt
-import seaborn as sns
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
+import os
+
+import numpy as np
+
+from .engines import window_track
+
+
+def _pyplot():
+    """Import matplotlib.pyplot on first use; it takes longer than the rest of the package."""
+    import matplotlib.pyplot as plt
+    return plt
 
 
 def plot_alignment_statistics(result: Dict, output_file: Optional[str] = None,
@@ -26,6 +36,7 @@ def plot_alignment_statistics(result: Dict, output_file: Optional[str] = None,
         >>> result = aligner.align(seq1, seq2)
         >>> plot_alignment_statistics(result, "output.png")
     """
+    plt = _pyplot()
     stats = result['alignment_stats']
     
     fig, axes = plt.subplots(2, 2, figsize=(14, 10))
@@ -99,6 +110,7 @@ def plot_percentage_distribution(result: Dict, output_file: Optional[str] = None
         result (dict): Alignment result
         output_file (str, optional): Save figure to file
     """
+    plt = _pyplot()
     stats = result['alignment_stats']
     
     fig, ax = plt.subplots(figsize=(10, 6))
@@ -141,6 +153,7 @@ def plot_gap_analysis(result: Dict, output_file: Optional[str] = None) -> None:
         result (dict): Alignment result
         output_file (str, optional): Save figure to file
     """
+    plt = _pyplot()
     stats = result['alignment_stats']
     
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 5))
@@ -174,3 +187,384 @@ def plot_gap_analysis(result: Dict, output_file: Optional[str] = None) -> None:
         plt.show()
     
     plt.close()
+
+
+def decimate_track(position: np.ndarray, values: np.ndarray,
+                   bins: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Reduce a track to at most bins points, keeping its extremes.
+
+    Consecutive values are grouped into bins and each bin is replaced by
+    its minimum and maximum, so narrow dips survive downsampling to the
+    pixel width of a plot.
+
+    Args:
+        position (np.ndarray): X coordinates of the track
+        values (np.ndarray): Track values
+        bins (int): Maximum number of points to keep
+
+    Returns:
+        tuple: (position, low, high) arrays; low equals high when the
+        track already fits
+    """
+    n = values.size
+    if n <= bins:
+        return position, values, values
+
+    starts = np.linspace(0, n, bins + 1).astype(np.int64)[:-1]
+    ends = np.append(starts[1:], n) - 1
+    low = np.minimum.reduceat(values, starts)
+    high = np.maximum.reduceat(values, starts)
+    return (position[starts] + position[ends]) / 2, low, high
+
+
+def plot_identity_track(result: Dict, output_file: Optional[str] = None,
+                        window: int = 100, dpi: int = 150) -> None:
+    """
+    Plot sliding-window identity and gap density along the alignment.
+
+    The track is computed by engines.window_track() and downsampled to
+    the pixel width of the figure, so even megabase alignments render
+    quickly; each pixel column shows the range of the windows it covers.
+
+    Args:
+        result (dict): Alignment result from NWAligner.align()
+        output_file (str, optional): Save figure to file. If None, displays plot.
+        window (int): Window width in alignment columns. Default is 100.
+        dpi (int): Resolution of the saved figure. Default is 150.
+
+    Example:
+        >>> plot_identity_track(result, "output/identity_track.png", window=200)
+    """
+    plt = _pyplot()
+    track = window_track(result['aligned_seq1'], result['aligned_seq2'], window)
+    width = min(window, result['length']) if result['length'] else window
+
+    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 6), sharex=True)
+    fig.suptitle(f'Identity and Gaps Along the Alignment (window = {width} columns)',
+                 fontsize=14, fontweight='bold')
+
+    # One point per pixel column of the axes
+    bins = max(1, int(fig.get_figwidth() * dpi))
+    for ax, key, color, label in ((ax1, 'identity', '#2ecc71', 'Identity (%)'),
+                                  (ax2, 'gaps', '#e74c3c', 'Gap density (%)')):
+        x, low, high = decimate_track(track['position'], track[key], bins)
+        ax.fill_between(x, low, high, facecolor=color, edgecolor=color, linewidth=0.8)
+        ax.set_ylabel(label)
+        ax.set_ylim(0, 100)
+        ax.grid(True, alpha=0.3)
+    ax2.set_xlabel('Alignment column')
+    if result['length']:
+        ax2.set_xlim(1, result['length'])
+
+    plt.tight_layout()
+
+    if output_file:
+        output_path = Path(output_file)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        plt.savefig(str(output_path), dpi=dpi)
+        print(f"[+] Figure saved to: {output_file}")
+    else:
+        plt.show()
+
+    plt.close()
+
+
+# Resolution of saved figures: final output, and quick previews
+PUBLICATION_DPI = 300
+DRAFT_DPI = 72
+
+# Figure file names per plot kind, as written by the CLI scripts
+PLOT_FILES = {
+    'statistics': 'alignment_statistics.png',
+    'percentage': 'alignment_percentage.png',
+    'gaps': 'alignment_gap_analysis.png',
+}
+
+
+def _set_pie(wedges, labels, autotexts, values, label_texts=None, startangle=90):
+    """
+    Move the wedges and texts of an existing pie chart to new values.
+
+    Mirrors the geometry of Axes.pie() with its default radius, label
+    and percentage distances; the pie is hidden when all values are 0.
+    """
+    total = float(sum(values))
+    theta = startangle / 360
+    for k, (wedge, label, autotext, value) in enumerate(zip(wedges, labels, autotexts, values)):
+        fraction = value / total if total > 0 else 0
+        wedge.set_theta1(360 * theta)
+        wedge.set_theta2(360 * (theta + fraction))
+
+        middle = 2 * np.pi * (theta + fraction / 2)
+        x, y = np.cos(middle), np.sin(middle)
+        label.set_position((1.1 * x, 1.1 * y))
+        label.set_horizontalalignment('left' if x > 0 else 'right')
+        if label_texts is not None:
+            label.set_text(label_texts[k])
+        autotext.set_position((0.6 * x, 0.6 * y))
+        autotext.set_text(f'{fraction * 100:.1f}%')
+
+        for artist in (wedge, label, autotext):
+            artist.set_visible(total > 0)
+        theta += fraction
+
+
+def _set_bars(ax, bars, labels, values, vertical=True, offset=0):
+    """Resize the bars of an existing bar chart and move their value labels."""
+    for bar, label, value in zip(bars, labels, values):
+        if vertical:
+            bar.set_height(value)
+            label.set_position((bar.get_x() + bar.get_width() / 2, value))
+        else:
+            bar.set_width(value)
+            label.set_position((value + offset, bar.get_y() + bar.get_height() / 2))
+    if vertical:
+        ax.relim()
+        ax.autoscale_view()
+
+
+class BatchPlotter:
+    """
+    Render the standard alignment plots for many results, quickly.
+
+    Each figure is built once, off-screen (Agg canvas, no pyplot and no
+    window), and then reused: for every result only the bar heights,
+    wedge angles and texts are updated before saving. The layout is
+    fixed when the figure is built, so figures are saved at their full
+    size instead of being cropped to their content. Use a lower dpi
+    (e.g. DRAFT_DPI) for quick previews of large batches.
+
+    The figures match plot_alignment_statistics(),
+    plot_percentage_distribution() and plot_gap_analysis().
+
+    Args:
+        dpi (int): Resolution of saved figures. Default is PUBLICATION_DPI.
+        kinds (tuple): Plots to render, keys of PLOT_FILES. Default is all.
+        title (str): Title of the statistics figure
+
+    Example:
+        >>> plotter = BatchPlotter(dpi=DRAFT_DPI)
+        >>> for seq_id, result in results:
+        ...     plotter.plot(result, "output/", prefix=f"{seq_id}_")
+    """
+
+    def __init__(self, dpi: int = PUBLICATION_DPI, kinds: Tuple[str, ...] = tuple(PLOT_FILES),
+                 title: str = "Needleman-Wunsch Alignment Analysis"):
+        unknown = [kind for kind in kinds if kind not in PLOT_FILES]
+        if unknown:
+            raise ValueError(
+                f"Unknown plot kind(s) {', '.join(unknown)}. "
+                f"Choose from: {', '.join(PLOT_FILES)}"
+            )
+
+        self.dpi = dpi
+        self.kinds = tuple(kinds)
+        self._figures = {}
+        builders = {
+            'statistics': lambda: self._build_statistics(title),
+            'percentage': self._build_percentage,
+            'gaps': self._build_gaps,
+        }
+        for kind in self.kinds:
+            self._figures[kind] = builders[kind]()
+
+    @staticmethod
+    def _figure(figsize):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+        fig = Figure(figsize=figsize)
+        FigureCanvasAgg(fig)
+        return fig
+
+    def _build_statistics(self, title):
+        fig = self._figure((14, 10))
+        fig.suptitle(title, fontsize=16, fontweight='bold')
+        axes = fig.subplots(2, 2)
+
+        ax1 = axes[0, 0]
+        pie = ax1.pie([1, 1], labels=['Matches', 'Mismatches'], autopct='%1.1f%%',
+                      colors=['#2ecc71', '#e74c3c'], startangle=90)
+        ax1.set_title('Identity Analysis', fontweight='bold')
+
+        ax2 = axes[0, 1]
+        composition = ax2.bar(['Matches', 'Mismatches', 'Gaps'], [1, 1, 1],
+                              color=['#2ecc71', '#e74c3c', '#f39c12'])
+        composition_labels = [ax2.text(0, 0, '', ha='center', va='bottom', fontsize=9)
+                              for _ in composition]
+        ax2.set_ylabel('Count (bp)')
+        ax2.set_title('Alignment Composition', fontweight='bold')
+
+        ax3 = axes[1, 0]
+        gaps = ax3.bar(['Seq1 Gaps', 'Seq2 Gaps'], [1, 1], color=['#3498db', '#9b59b6'])
+        gap_labels = [ax3.text(0, 0, '', ha='center', va='bottom', fontsize=10)
+                      for _ in gaps]
+        ax3.set_ylabel('Count (bp)')
+        ax3.set_title('Gap Distribution', fontweight='bold')
+
+        ax4 = axes[1, 1]
+        ax4.axis('off')
+        summary = ax4.text(0.1, 0.5, '', fontsize=11, verticalalignment='center',
+                           fontfamily='monospace',
+                           bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
+
+        def update(stats):
+            _set_pie(*pie, [stats['matches'], stats['mismatches']])
+            _set_bars(ax2, composition, composition_labels,
+                      [stats['matches'], stats['mismatches'], stats['gaps']])
+            for label, value in zip(composition_labels,
+                                    [stats['matches'], stats['mismatches'], stats['gaps']]):
+                label.set_text(f'{int(value)}')
+            _set_bars(ax3, gaps, gap_labels, [stats['gaps_seq1'], stats['gaps_seq2']])
+            for label, value in zip(gap_labels, [stats['gaps_seq1'], stats['gaps_seq2']]):
+                label.set_text(str(value))
+            summary.set_text(f"""
+ALIGNMENT SUMMARY
+
+Length:           {stats['length']} bp
+Identity:         {stats['identity']:.2f}%
+Score:            {stats['score']:.1f}
+
+Matches:          {stats['matches']} ({stats['match_percentage']:.2f}%)
+Mismatches:       {stats['mismatches']} ({stats['mismatch_percentage']:.2f}%)
+Total Gaps:       {stats['gaps']} ({stats['gap_percentage']:.2f}%)
+""")
+
+        fig.tight_layout()
+        return fig, update
+
+    def _build_percentage(self):
+        fig = self._figure((10, 6))
+        ax = fig.subplots()
+
+        bars = ax.barh(['Match %', 'Mismatch %', 'Gap %'], [1, 1, 1],
+                       color=['#2ecc71', '#e74c3c', '#f39c12'])
+        labels = [ax.text(0, 0, '', va='center', fontweight='bold') for _ in bars]
+        ax.set_xlabel('Percentage (%)', fontweight='bold')
+        ax.set_title('Alignment Composition (Percentage)', fontweight='bold', fontsize=14)
+        ax.set_xlim(0, 100)
+
+        def update(stats):
+            percentages = [stats['match_percentage'], stats['mismatch_percentage'],
+                           stats['gap_percentage']]
+            _set_bars(ax, bars, labels, percentages, vertical=False, offset=2)
+            for label, value in zip(labels, percentages):
+                label.set_text(f'{value:.2f}%')
+
+        fig.tight_layout()
+        return fig, update
+
+    def _build_gaps(self):
+        fig = self._figure((12, 5))
+        ax1, ax2 = fig.subplots(1, 2)
+
+        pie = ax1.pie([1, 1], labels=['Seq1 Gaps', 'Seq2 Gaps'], autopct='%1.1f%%',
+                      colors=['#3498db', '#9b59b6'], startangle=90)
+        ax1.set_title('Gap Distribution by Sequence', fontweight='bold')
+
+        bars = ax2.bar(['Match', 'Gap'], [1, 1], color=['#2ecc71', '#e74c3c'])
+        labels = [ax2.text(0, 0, '', ha='center', va='bottom', fontweight='bold')
+                  for _ in bars]
+        ax2.set_ylabel('Position Count (bp)')
+        ax2.set_title('Aligned vs Gap Positions', fontweight='bold')
+
+        def update(stats):
+            _set_pie(*pie, [stats['gaps_seq1'], stats['gaps_seq2']],
+                     label_texts=[f"Seq1 Gaps\n({stats['gaps_seq1']})",
+                                  f"Seq2 Gaps\n({stats['gaps_seq2']})"])
+            values = [stats['length'] - stats['gaps'], stats['gaps']]
+            _set_bars(ax2, bars, labels, values)
+            for label, value in zip(labels, values):
+                label.set_text(str(value))
+
+        fig.tight_layout()
+        return fig, update
+
+    def plot(self, result: Dict, output_dir: str, prefix: str = "") -> Dict[str, str]:
+        """
+        Save every configured plot of one result.
+
+        Args:
+            result (dict): Alignment result from NWAligner.align(); only
+                its 'alignment_stats' are used
+            output_dir (str): Directory to save the figures in
+            prefix (str): Prepended to each PLOT_FILES name
+
+        Returns:
+            dict: Plot kind -> saved file path
+        """
+        output_path = Path(output_dir)
+        output_path.mkdir(parents=True, exist_ok=True)
+        stats = result['alignment_stats']
+
+        files = {}
+        for kind in self.kinds:
+            fig, update = self._figures[kind]
+            update(stats)
+            path = output_path / f"{prefix}{PLOT_FILES[kind]}"
+            fig.savefig(str(path), dpi=self.dpi)
+            files[kind] = str(path)
+        return files
+
+
+# Per-process plotter used by plot_batch() workers
+_worker_plotter: Optional[BatchPlotter] = None
+
+
+def _init_plot_worker(dpi: int, kinds: Tuple[str, ...]):
+    global _worker_plotter
+    _worker_plotter = BatchPlotter(dpi=dpi, kinds=kinds)
+
+
+def _plot_task(task: Tuple[Dict, str, str]) -> Dict[str, str]:
+    stats, output_dir, prefix = task
+    return _worker_plotter.plot({'alignment_stats': stats}, output_dir, prefix)
+
+
+def plot_batch(results: Iterable[Dict], output_dir: str,
+               prefixes: Optional[Iterable[str]] = None, dpi: int = PUBLICATION_DPI,
+               kinds: Tuple[str, ...] = tuple(PLOT_FILES),
+               workers: Optional[int] = 1) -> List[Dict[str, str]]:
+    """
+    Save the standard plots of many results with BatchPlotter.
+
+    With several workers, each process builds its own figures once and
+    receives only the statistics of each result.
+
+    Args:
+        results (iterable): Alignment results from NWAligner.align()
+        output_dir (str): Directory to save the figures in
+        prefixes (iterable, optional): File name prefix per result, e.g.
+            sequence ids; defaults to "<index>_"
+        dpi (int): Resolution of saved figures. Default is PUBLICATION_DPI.
+        kinds (tuple): Plots to render, keys of PLOT_FILES. Default is all.
+        workers (int, optional): Number of processes. 1 renders in the
+            current process; None or 0 uses every CPU. Default is 1.
+
+    Returns:
+        list: One dict of plot kind -> file path per result, in input order
+
+    Example:
+        >>> plot_batch(results, "output/plots", prefixes=ids, dpi=DRAFT_DPI, workers=4)
+    """
+    results = list(results)
+    prefixes = list(prefixes) if prefixes is not None else [f"{i}_" for i in range(len(results))]
+    if len(prefixes) != len(results):
+        raise ValueError("prefixes must have one entry per result")
+
+    if not workers:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(results))
+
+    if workers <= 1:
+        plotter = BatchPlotter(dpi=dpi, kinds=kinds)
+        return [plotter.plot(result, output_dir, prefix)
+                for result, prefix in zip(results, prefixes)]
+
+    tasks = [(dict(result['alignment_stats']), output_dir, prefix)
+             for result, prefix in zip(results, prefixes)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_plot_worker,
+                             initargs=(dpi, tuple(kinds))) as executor:
+        chunksize = max(1, len(tasks) // (workers * 4))
+        return list(executor.map(_plot_task, tasks, chunksize=chunksize))
@@ -7,6 +7,13 @@ Useful for comparing many sequences against a reference.
 
 Usage:
     python batch_analysis.py -ref reference.fasta -dir sequences/ -o output/
+    python batch_analysis.py -ref reference.fasta -dir sequences/ --min-identity 90
+    python batch_analysis.py -ref reference.fasta -dir sequences/ --workers 8
+    python batch_analysis.py -ref reference.fasta -dir sequences/ --cache-dir .nw_cache
+    python batch_analysis.py -ref reference.fasta -dir sequences/ --summary out/batch.parquet
+    python batch_analysis.py -ref reference.fasta -dir sequences/ -v --draft --workers 4
+    python batch_analysis.py --all-vs-all -dir sequences/ -o matrix/ --workers 8
+    python batch_analysis.py --references refs.fasta -dir sequences/ --top-k 3
 """
 
 import sys
@@ -16,12 +23,20 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 import argparse
-from nw_alignment import NWAligner
-from nw_alignment.parser import read_fasta, read_multiple_fasta
+from nw_alignment import NWAligner, AlignmentResult
+from nw_alignment.cache import AlignmentCache
+from nw_alignment.distance import all_vs_all
+from nw_alignment.parser import read_fasta, read_multiple_fasta, FastaIndex
+from nw_alignment.prefilter import BelowIdentityCutoff
+from nw_alignment.sketch import SketchIndex
+from nw_alignment.summary import SummaryWriter
 from nw_alignment.utils import export_results, print_alignment_summary
+from nw_alignment.visualization import plot_batch, PUBLICATION_DPI, DRAFT_DPI
 
 
-def batch_align(reference_file, sequence_dir, output_dir, match=2, mismatch=-1, gap=-2):
+def batch_align(reference_file, sequence_dir, output_dir, match=2, mismatch=-1, gap=-2,
+                min_identity=None, workers=1, cache_dir=None, summary_file=None,
+                alignments_file=None, visualize=False, plot_dpi=PUBLICATION_DPI):
     """
     Align reference sequence against all sequences in a directory.
     
@@ -32,6 +47,24 @@ def batch_align(reference_file, sequence_dir, output_dir, match=2, mismatch=-1,
         match (int): Match score
         mismatch (int): Mismatch penalty
         gap (int): Gap penalty
+        min_identity (float, optional): Identity cutoff (%). Sequences whose
+            edit-distance upper bound on identity is below it are skipped
+            without a full alignment.
+        workers (int): Number of worker processes (None or 0 = all CPUs)
+        cache_dir (str, optional): Directory of cached results; unchanged
+            pairs are loaded from it instead of being re-aligned
+        summary_file (str, optional): Write one row per pair to this
+            .parquet/.feather/.npz/.csv file instead of a JSON and a TXT
+            file per sequence
+        alignments_file (str, optional): With summary_file, also store the
+            alignments (CIGAR strings) in this .jsonl.gz file
+        visualize (bool): Save the statistics, percentage and gap plots of
+            every alignment, rendered across the worker processes
+        plot_dpi (int): Resolution of the plots
+        
+    Returns:
+        list: One dict per aligned sequence with 'file', 'seq_id', 'score'
+        and 'identity'
     """
     ref_id, ref_seq, _ = read_fasta(reference_file)
     
@@ -44,44 +77,334 @@ def batch_align(reference_file, sequence_dir, output_dir, match=2, mismatch=-1,
     print(f"\nFound {len(fasta_files)} FASTA files")
     print(f"Reference: {ref_id}\n")
     
-    aligner = NWAligner(match=match, mismatch=mismatch, gap=gap)
-    results = []
+    summary = SummaryWriter(summary_file, alignments_file) if summary_file else None
+    cache = AlignmentCache(cache_dir) if cache_dir else None
+    aligner = NWAligner(match=match, mismatch=mismatch, gap=gap, cache=cache)
+    results, plotted = [], []
+    skipped = 0
+    
+    # Queries are read as align_many() takes them, so only the tasks in
+    # flight are held in memory; queries keeps the names of each one
+    queries = []
+    
+    def read_queries():
+        for i, fasta_file in enumerate(fasta_files, 1):
+            try:
+                seq_id, seq, _ = read_fasta(str(fasta_file))
+            except Exception as e:
+                print(f"[{i}/{len(fasta_files)}] {fasta_file.name} - ERROR: {e}")
+                continue
+            queries.append((i, fasta_file, seq_id))
+            yield seq
+    
+    alignments = aligner.align_many(read_queries(), workers=workers,
+                                    reference=ref_seq, min_identity=min_identity)
     
-    for i, fasta_file in enumerate(fasta_files, 1):
+    for index, result, error in alignments:
+        i, fasta_file, seq_id = queries[index]
+        
+        if isinstance(error, BelowIdentityCutoff):
+            skipped += 1
+            print(f"[{i}/{len(fasta_files)}] {seq_id} - SKIPPED "
+                  f"(identity <= {error.max_identity:.2f}%)")
+            continue
+        
         try:
-            seq_id, seq, _ = read_fasta(str(fasta_file))
-            result = aligner.align(ref_seq, seq)
+            if error is not None:
+                raise error
+            
+            identity = result['alignment_stats']['identity']
+            score = result['alignment_stats']['score']
+            
             results.append({
                 'file': fasta_file.name,
                 'seq_id': seq_id,
-                'result': result
+                'score': score,
+                'identity': identity
             })
-            
-            identity = result['alignment_stats']['identity']
-            score = result['alignment_stats']['score']
+            if visualize:
+                # Results keep their query alive; hold them only for plotting
+                plotted.append(result)
             
             print(f"[{i}/{len(fasta_files)}] {seq_id}")
             print(f"  Score: {score:.1f} | Identity: {identity:.2f}%")
             
-            # Save individual results
-            export_results(result, str(output_dir), f'{seq_id}_alignment')
+            if summary is not None:
+                summary.add(ref_id, seq_id, result)
+            else:
+                # Save individual results
+                export_results(result, str(output_dir), f'{seq_id}_alignment')
         
         except Exception as e:
             print(f"[{i}/{len(fasta_files)}] {fasta_file.name} - ERROR: {e}")
     
+    if visualize and results:
+        plots = plot_batch(plotted, str(output_dir),
+                           prefixes=[f"{entry['seq_id']}_" for entry in results],
+                           dpi=plot_dpi, workers=workers)
+        print(f"\nSaved {sum(len(files) for files in plots)} plot(s) at {plot_dpi} dpi")
+    
+    if summary is not None:
+        summary.close()
+        print(f"\nSummary of {len(summary)} alignment(s) written to: {summary_file}")
+    
+    if min_identity is not None:
+        print(f"\nPrefilter skipped {skipped} sequence(s) below {min_identity:.2f}% identity")
+    
     print(f"\n✓ Batch analysis complete. Results saved to: {output_dir}/")
     return results
 
 
+def nearest_reference_align(references_file, sequence_dir, output_dir, match=2,
+                            mismatch=-1, gap=-2, top_k=1, min_identity=None,
+                            index_file=None, workers=1, cache_dir=None):
+    """
+    Align each sequence against its most similar references only.
+    
+    The references (a multi-FASTA file) are sketched into a k-mer
+    SketchIndex, reused from index_file when it is up to date. Each
+    query is aligned only against its top_k references by estimated
+    similarity, and the best-scoring alignment is exported.
+    
+    Queries are streamed twice: once to sketch-search them, keeping only
+    their file names per candidate reference, and once per candidate
+    while aligning. Alignments are grouped by reference, so each
+    reference is fetched through a FastaIndex when its group starts and
+    shipped to the workers once; only one reference and the in-flight
+    queries are in memory at a time. A query that can no longer be read
+    is reported and skipped. The best alignment of each query is kept as
+    a compact record until it is exported, again grouped by reference.
+    
+    Args:
+        references_file (str): Multi-FASTA file of reference sequences
+        sequence_dir (str): Directory containing FASTA files to align
+        output_dir (str): Directory to save results
+        match (int): Match score
+        mismatch (int): Mismatch penalty
+        gap (int): Gap penalty
+        top_k (int): Candidate references aligned per query
+        min_identity (float, optional): Skip references whose estimated
+            identity (%) is below this
+        index_file (str, optional): Sketch index (.npz) to reuse or create;
+            defaults to <references_file>.sketch.npz
+        workers (int): Number of worker processes (None or 0 = all CPUs)
+        cache_dir (str, optional): Directory of cached results
+        
+    Returns:
+        list: One dict per aligned query with 'seq_id', 'reference',
+        'score' and 'identity'
+    """
+    index_file = index_file or f"{references_file}.sketch.npz"
+    sketches = SketchIndex.from_fasta(references_file, index_file=index_file)
+    
+    sequence_dir = Path(sequence_dir)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    fasta_files = list(sequence_dir.glob('*.fasta')) + list(sequence_dir.glob('*.fa'))
+    
+    print(f"\nFound {len(fasta_files)} FASTA files")
+    print(f"References: {len(sketches)} (sketch index: {index_file})\n")
+    
+    # Names and files of the queries, and query numbers per candidate reference
+    queries, candidates = [], {}
+    for fasta_file in fasta_files:
+        try:
+            seq_id, seq, _ = read_fasta(str(fasta_file))
+        except Exception as e:
+            print(f"{fasta_file.name} - ERROR: {e}")
+            continue
+        hits = sketches.search(seq, top_k=top_k, min_identity=min_identity)
+        if not hits:
+            print(f"{seq_id} - SKIPPED (no similar reference)")
+            continue
+        for ref_id, _, _ in hits:
+            candidates.setdefault(ref_id, []).append(len(queries))
+        queries.append((seq_id, fasta_file))
+    
+    cache = AlignmentCache(cache_dir) if cache_dir else None
+    aligner = NWAligner(match=match, mismatch=mismatch, gap=gap, cache=cache)
+    
+    def read_query(query):
+        # A query that can no longer be read is reported and left out
+        seq_id, fasta_file = queries[query]
+        try:
+            return read_fasta(str(fasta_file))[1]
+        except Exception as e:
+            print(f"{fasta_file.name} - ERROR: {e}")
+            return None
+    
+    def read_group(group, read):
+        # read keeps the query number of each sequence yielded
+        for query in group:
+            seq = read_query(query)
+            if seq is not None:
+                read.append(query)
+                yield seq
+    
+    best = {}
+    results = []
+    with FastaIndex(references_file) as references:
+        for ref_id in sketches.ids:
+            group = candidates.pop(ref_id, None)
+            if not group:
+                continue
+            reference = references.get(ref_id)
+            read = []
+            for i, result, error in aligner.align_many(read_group(group, read),
+                                                       workers=workers,
+                                                       reference=reference):
+                query = read[i]
+                if error is not None:
+                    print(f"{queries[query][0]} vs {ref_id} - ERROR: {error}")
+                elif query not in best or result['score'] > best[query][1]['score']:
+                    best[query] = (ref_id, result.to_record(), result['identity'])
+        
+        # Export grouped by reference, so each reference is fetched once more
+        exports = {}
+        for query in sorted(best):
+            exports.setdefault(best[query][0], []).append(query)
+        for ref_id in sketches.ids:
+            if ref_id not in exports:
+                continue
+            reference = references.get(ref_id)
+            for query in exports[ref_id]:
+                _, record, identity = best.pop(query)
+                seq_id = queries[query][0]
+                seq = read_query(query)
+                if seq is None:
+                    continue
+                print(f"{seq_id} -> {ref_id}")
+                print(f"  Score: {record['score']:.1f} | Identity: {identity:.2f}%")
+                result = AlignmentResult.from_record(reference, seq, record)
+                export_results(result, str(output_dir), f'{seq_id}_alignment')
+                results.append({'seq_id': seq_id, 'reference': ref_id,
+                                'score': record['score'], 'identity': identity})
+    
+    print(f"\n✓ Nearest-reference analysis complete. Results saved to: {output_dir}/")
+    return results
+
+
+def all_vs_all_align(sequence_dir, output_dir, match=2, mismatch=-1, gap=-2,
+                     workers=1, cache_dir=None, checkpoint_every=1000):
+    """
+    Align every pair of sequences found in a directory.
+    
+    Every record of every FASTA file is read once. Only the upper
+    triangle of pairs is aligned, and the identity and score matrices
+    are written as identity.npy and score.npy (with ids.txt) in
+    output_dir. Rerunning on the same directory resumes an interrupted
+    run.
+    
+    Args:
+        sequence_dir (str): Directory containing FASTA files
+        output_dir (str): Directory for the matrix files
+        match (int): Match score
+        mismatch (int): Mismatch penalty
+        gap (int): Gap penalty
+        workers (int): Number of worker processes (None or 0 = all CPUs)
+        cache_dir (str, optional): Directory of cached results
+        checkpoint_every (int): Pairs aligned between checkpoints
+    """
+    sequence_dir = Path(sequence_dir)
+    fasta_files = sorted(list(sequence_dir.glob('*.fasta')) + list(sequence_dir.glob('*.fa')))
+    
+    ids, sequences = [], []
+    for fasta_file in fasta_files:
+        try:
+            for seq_id, seq, _ in read_multiple_fasta(str(fasta_file)):
+                ids.append(seq_id)
+                sequences.append(seq)
+        except Exception as e:
+            print(f"{fasta_file.name} - ERROR: {e}")
+    
+    n = len(ids)
+    print(f"\n{n} sequence(s) from {len(fasta_files)} FASTA file(s): "
+          f"{n * (n - 1) // 2} pair(s) to align\n")
+    
+    cache = AlignmentCache(cache_dir) if cache_dir else None
+    aligner = NWAligner(match=match, mismatch=mismatch, gap=gap, cache=cache)
+    stats = all_vs_all(ids, sequences, str(output_dir), aligner=aligner,
+                       workers=workers, checkpoint_every=checkpoint_every,
+                       log=lambda message: print(f"  {message}"))
+    
+    for id1, id2, message in stats['errors']:
+        print(f"{id1} vs {id2} - ERROR: {message}")
+    if stats['failed']:
+        print(f"\n{stats['failed']} pair(s) failed; rerun to retry them")
+    
+    print(f"\n✓ All-vs-all complete. Matrices saved to: {output_dir}/")
+    return stats
+
+
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Batch alignment analysis')
-    parser.add_argument('-ref', '--reference', required=True, 
-                       help='Reference FASTA file')
+    parser.add_argument('-ref', '--reference', default=None,
+                       help='Reference FASTA file (required unless --all-vs-all '
+                            'or --references)')
     parser.add_argument('-dir', '--directory', required=True,
                        help='Directory with FASTA files')
     parser.add_argument('-o', '--output', default='batch_output/',
                        help='Output directory')
+    parser.add_argument('--min-identity', type=float, default=None,
+                       help='Skip sequences that cannot reach this identity (%%)')
+    parser.add_argument('-w', '--workers', type=int, default=1,
+                       help='Worker processes (0 = all CPUs, default: 1)')
+    parser.add_argument('--cache-dir', default=None,
+                       help='Directory for cached alignment results')
+    parser.add_argument('--summary', default=None,
+                       help='Single summary file (.parquet/.feather/.npz/.csv) '
+                            'instead of per-sequence JSON/TXT files')
+    parser.add_argument('--alignments', default=None,
+                       help='With --summary, store alignments in this .jsonl.gz file')
+    parser.add_argument('-v', '--visualize', action='store_true',
+                       help='Save plots for every alignment')
+    parser.add_argument('--draft', action='store_true',
+                       help='Save plots at --draft-dpi instead of 300 dpi')
+    parser.add_argument('--draft-dpi', type=int, default=DRAFT_DPI,
+                       help=f'Resolution used with --draft (default: {DRAFT_DPI})')
+    parser.add_argument('--all-vs-all', action='store_true',
+                       help='Align every pair of sequences and write identity/score '
+                            'matrices (.npy) instead of using a reference')
+    parser.add_argument('--references', default=None,
+                       help='Multi-FASTA of references: align each sequence against '
+                            'its most similar references only')
+    parser.add_argument('--top-k', type=int, default=1,
+                       help='With --references, candidate references aligned per '
+                            'sequence (default: 1)')
+    parser.add_argument('--sketch-index', default=None,
+                       help='With --references, sketch index file to reuse '
+                            '(default: <references>.sketch.npz)')
+    parser.add_argument('--checkpoint-every', type=int, default=1000,
+                       help='With --all-vs-all, pairs between checkpoints (default: 1000)')
     
     args = parser.parse_args()
     
-    batch_align(args.reference, args.directory, args.output)
+    if args.all_vs_all or args.references:
+        mode = '--all-vs-all' if args.all_vs_all else '--references'
+        unsupported = [('--summary', args.summary), ('--alignments', args.alignments),
+                       ('-v/--visualize', args.visualize)]
+        if args.all_vs_all:
+            unsupported.append(('--min-identity', args.min_identity is not None))
+        for option, given in unsupported:
+            if given:
+                parser.error(f'{option} cannot be used with {mode}')
+    
+    if args.all_vs_all:
+        all_vs_all_align(args.directory, args.output, workers=args.workers,
+                         cache_dir=args.cache_dir, checkpoint_every=args.checkpoint_every)
+        sys.exit(0)
+    if args.references:
+        nearest_reference_align(args.references, args.directory, args.output,
+                                top_k=args.top_k, min_identity=args.min_identity,
+                                index_file=args.sketch_index, workers=args.workers,
+                                cache_dir=args.cache_dir)
+        sys.exit(0)
+    if args.reference is None:
+        parser.error('-ref/--reference is required unless --all-vs-all '
+                     'or --references is given')
+    
+    batch_align(args.reference, args.directory, args.output,
+                min_identity=args.min_identity, workers=args.workers,
+                cache_dir=args.cache_dir, summary_file=args.summary,
+                alignments_file=args.alignments, visualize=args.visualize,
+                plot_dpi=args.draft_dpi if args.draft else PUBLICATION_DPI)
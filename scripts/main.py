@@ -28,12 +28,12 @@ import glob
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from nw_alignment import NWAligner
+from nw_alignment.cache import AlignmentCache
 from nw_alignment.parser import read_fasta
+from nw_alignment.profiling import Profiler
 from nw_alignment.utils import print_alignment_summary, export_results
 from nw_alignment.visualization import (
-    plot_alignment_statistics,
-    plot_percentage_distribution,
-    plot_gap_analysis
+    BatchPlotter, plot_identity_track, PUBLICATION_DPI, DRAFT_DPI
 )
 
 
@@ -75,6 +75,7 @@ Examples:
   python main.py -v                       (With visualizations)
   python main.py -m 3 -ms -2 -g -3 -v    (Custom scoring)
   python main.py -o my_results -v        (Custom output folder)
+  python main.py --profile               (Per-step timing table)
         """
     )
     
@@ -82,10 +83,36 @@ Examples:
     parser.add_argument('-m', '--match', type=int, default=2, help='Match score (default: 2)')
     parser.add_argument('-ms', '--mismatch', type=int, default=-1, help='Mismatch penalty (default: -1)')
     parser.add_argument('-g', '--gap', type=int, default=-2, help='Gap penalty (default: -2)')
+    parser.add_argument('-go', '--gap-open', type=int, default=None,
+                        help='Affine gap opening penalty (default: same as --gap)')
+    parser.add_argument('-ge', '--gap-extend', type=int, default=None,
+                        help='Affine gap extension penalty (default: same as --gap)')
+    parser.add_argument('-e', '--engine', default='numpy', choices=NWAligner.ENGINES,
+                        help="DP engine; 'hirschberg' aligns in linear memory (default: numpy)")
+    parser.add_argument('--cache-dir', default=None,
+                        help='Reuse alignment results stored in this directory (default: off)')
+    parser.add_argument('--anchored', action='store_true',
+                        help='Align long genomes through unique exact-match anchors, '
+                             'running NW only between them')
+    parser.add_argument('--anchor-k', type=int, default=21,
+                        help='Anchor seed length with --anchored (default: 21)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Processes aligning the segments with --anchored; 0 uses every CPU (default: 1)')
     parser.add_argument('-v', '--visualize', action='store_true', help='Create visualization charts')
     parser.add_argument('-d', '--data', default='data', help='Data folder (default: data)')
+    parser.add_argument('--draft', action='store_true',
+                        help='Save visualizations at --draft-dpi instead of 300 dpi')
+    parser.add_argument('--draft-dpi', type=int, default=DRAFT_DPI,
+                        help=f'Resolution used with --draft (default: {DRAFT_DPI})')
+    parser.add_argument('--window', type=int, default=100,
+                        help='Window (columns) of the identity/gap track plot (default: 100)')
+    parser.add_argument('--profile', action='store_true',
+                        help='Print time, CPU, peak memory and DP cells per step')
+    parser.add_argument('--profile-json', action='store_true',
+                        help='Also save the profile as alignment_profile.json in the output folder')
     
     args = parser.parse_args()
+    profiler = Profiler()
     
     print("\n" + "="*80)
     print("NEEDLEMAN-WUNSCH ALGORITHM - SEQUENCE ALIGNMENT")
@@ -96,8 +123,9 @@ Examples:
         print("\n[STEP 1] Auto-detecting FASTA files...")
         seq1_file, seq2_file = find_fasta_files(args.data)
         
-        seq1_id, seq1, _ = read_fasta(seq1_file)
-        seq2_id, seq2, _ = read_fasta(seq2_file)
+        with profiler.phase('parse'):
+            seq1_id, seq1, _ = read_fasta(seq1_file)
+            seq2_id, seq2, _ = read_fasta(seq2_file)
         
         print(f"  [+] File 1: {Path(seq1_file).name}")
         print(f"      ID: {seq1_id} | Length: {len(seq1)} bp")
@@ -111,10 +139,19 @@ Examples:
     # STEP 2: Run NW Algorithm
     try:
         print(f"\n[STEP 2] Performing Needleman-Wunsch alignment...")
-        print(f"  Parameters: match={args.match}, mismatch={args.mismatch}, gap={args.gap}")
+        print(f"  Parameters: match={args.match}, mismatch={args.mismatch}, gap={args.gap}, "
+              f"engine={args.engine}")
         
-        aligner = NWAligner(match=args.match, mismatch=args.mismatch, gap=args.gap)
-        result = aligner.align(seq1, seq2)
+        aligner = NWAligner(match=args.match, mismatch=args.mismatch, gap=args.gap,
+                            engine=args.engine, gap_open=args.gap_open,
+                            gap_extend=args.gap_extend,
+                            cache=AlignmentCache(args.cache_dir) if args.cache_dir else None)
+        with profiler, profiler.phase('align'):
+            if args.anchored:
+                result = aligner.align_anchored(seq1, seq2, k=args.anchor_k,
+                                                workers=args.workers)
+            else:
+                result = aligner.align(seq1, seq2)
         
         print(f"  [+] Alignment complete!")
         print(f"  [+] Alignment Score: {result['score']}")
@@ -135,7 +172,8 @@ Examples:
         output_dir.mkdir(exist_ok=True)
         
         print(f"\n[STEP 3] Exporting results...")
-        export_results(result, str(output_dir))
+        with profiler.phase('export'):
+            export_results(result, str(output_dir))
         print(f"  [+] Results exported to: {output_dir}/")
         print(f"      - nw_alignment_result.json")
         print(f"      - nw_alignment_result.txt")
@@ -149,14 +187,14 @@ Examples:
         try:
             print(f"\n[STEP 4] Creating visualizations...")
             
-            plot_alignment_statistics(result, str(output_dir / 'alignment_statistics.png'))
-            print(f"  [+] Created: alignment_statistics.png")
-            
-            plot_percentage_distribution(result, str(output_dir / 'alignment_percentage.png'))
-            print(f"  [+] Created: alignment_percentage.png")
-            
-            plot_gap_analysis(result, str(output_dir / 'alignment_gap_analysis.png'))
-            print(f"  [+] Created: alignment_gap_analysis.png")
+            with profiler.phase('plot'):
+                plotter = BatchPlotter(dpi=args.draft_dpi if args.draft else PUBLICATION_DPI)
+                for path in plotter.plot(result, str(output_dir)).values():
+                    print(f"  [+] Created: {Path(path).name}")
+                
+                plot_identity_track(result, str(output_dir / 'alignment_identity_track.png'),
+                                    window=args.window)
+                print(f"  [+] Created: alignment_identity_track.png")
             
         except Exception as e:
             print(f"[-] Warning: Visualization failed: {e}", file=sys.stderr)
@@ -167,6 +205,14 @@ Examples:
         print("-" * 80)
         print_alignment_summary(result)
         
+        if args.profile or args.profile_json:
+            print(f"\n[PROFILE] Time and memory per step")
+            print("-" * 80)
+            print(profiler.format_table())
+        if args.profile_json:
+            profiler.save(str(output_dir / 'alignment_profile.json'))
+            print(f"  [+] Profile saved to: {output_dir / 'alignment_profile.json'}")
+        
         print("\n" + "="*80)
         print("[+] ALIGNMENT COMPLETE - All files saved!")
         print("="*80 + "\n")
@@ -2,11 +2,11 @@
 """
 Needleman-Wunsch Algorithm - Main Script
 
-This is the RECOMMENDED approach for processing full FASTA files without 
-RAM limitations. Use this for production-grade sequence alignment analysis.
+This is the RECOMMENDED approach for processing full FASTA files.
+Use this for production-grade sequence alignment analysis.
 
 Features:
-  [+] Processes entire FASTA files (no memory constraints)
+  [+] Processes entire FASTA files (linear memory with --engine hirschberg)
   [+] Professional output formatting
   [+] Multiple export formats (JSON, TXT, PNG)
   [+] Detailed statistics and visualization
@@ -14,6 +14,9 @@ Features:
 
 Usage:
     python run_nw_algorithm.py -s1 sequence1.fasta -s2 sequence2.fasta
+    python run_nw_algorithm.py -s1 big1.fasta -s2 big2.fasta -e hirschberg
+    python run_nw_algorithm.py -s1 a.fasta -s2 b.fasta --profile
+    python run_nw_algorithm.py -s1 genome1.fasta -s2 genome2.fasta --anchored --workers 8
 
 For more information, see: docs/USAGE.md
 """
@@ -26,12 +29,12 @@ from datetime import datetime
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from nw_alignment import NWAligner
+from nw_alignment.cache import AlignmentCache
 from nw_alignment.parser import read_fasta
+from nw_alignment.profiling import Profiler
 from nw_alignment.utils import print_alignment_summary, export_results
 from nw_alignment.visualization import (
-    plot_alignment_statistics,
-    plot_percentage_distribution,
-    plot_gap_analysis
+    BatchPlotter, plot_identity_track, PUBLICATION_DPI, DRAFT_DPI
 )
 
 
@@ -46,9 +49,32 @@ def main():
     parser.add_argument('-m', '--match', type=int, default=2, help='Match score')
     parser.add_argument('-ms', '--mismatch', type=int, default=-1, help='Mismatch penalty')
     parser.add_argument('-g', '--gap', type=int, default=-2, help='Gap penalty')
+    parser.add_argument('-go', '--gap-open', type=int, default=None, help='Affine gap opening penalty')
+    parser.add_argument('-ge', '--gap-extend', type=int, default=None, help='Affine gap extension penalty')
+    parser.add_argument('-e', '--engine', default='numpy', choices=NWAligner.ENGINES,
+                        help="DP engine; 'hirschberg' aligns in linear memory (default: numpy)")
+    parser.add_argument('--cache-dir', default=None, help='Directory for cached alignment results')
+    parser.add_argument('--anchored', action='store_true',
+                        help='Align long genomes through unique exact-match anchors, '
+                             'running NW only between them')
+    parser.add_argument('--anchor-k', type=int, default=21,
+                        help='Anchor seed length with --anchored (default: 21)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Processes aligning the segments with --anchored; 0 uses every CPU (default: 1)')
     parser.add_argument('-v', '--visualize', action='store_true', help='Create visualizations')
+    parser.add_argument('--draft', action='store_true',
+                        help='Save visualizations at --draft-dpi instead of 300 dpi')
+    parser.add_argument('--draft-dpi', type=int, default=DRAFT_DPI,
+                        help=f'Resolution used with --draft (default: {DRAFT_DPI})')
+    parser.add_argument('--window', type=int, default=100,
+                        help='Window (columns) of the identity/gap track plot (default: 100)')
+    parser.add_argument('--profile', action='store_true',
+                        help='Print time, CPU, peak memory and DP cells per step')
+    parser.add_argument('--profile-json', action='store_true',
+                        help='Also save the profile as alignment_profile.json in the output directory')
     
     args = parser.parse_args()
+    profiler = Profiler()
     
     print("\n" + "="*80)
     print("NEEDLEMAN-WUNSCH ALGORITHM - SEQUENCE ALIGNMENT")
@@ -63,8 +89,9 @@ def main():
         if not seq1_file.exists() or not seq2_file.exists():
             raise FileNotFoundError("One or both files not found")
         
-        seq1_id, seq1, _ = read_fasta(str(seq1_file))
-        seq2_id, seq2, _ = read_fasta(str(seq2_file))
+        with profiler.phase('parse'):
+            seq1_id, seq1, _ = read_fasta(str(seq1_file))
+            seq2_id, seq2, _ = read_fasta(str(seq2_file))
         
         print(f"  [+] Seq1: {seq1_id} ({len(seq1)} bp)")
         print(f"  [+] Seq2: {seq2_id} ({len(seq2)} bp)")
@@ -75,8 +102,16 @@ def main():
     
     try:
         print(f"\n[STEP 2] Performing Needleman-Wunsch alignment...")
-        aligner = NWAligner(match=args.match, mismatch=args.mismatch, gap=args.gap)
-        result = aligner.align(seq1, seq2)
+        aligner = NWAligner(match=args.match, mismatch=args.mismatch, gap=args.gap,
+                            engine=args.engine, gap_open=args.gap_open,
+                            gap_extend=args.gap_extend,
+                            cache=AlignmentCache(args.cache_dir) if args.cache_dir else None)
+        with profiler, profiler.phase('align'):
+            if args.anchored:
+                result = aligner.align_anchored(seq1, seq2, k=args.anchor_k,
+                                                workers=args.workers)
+            else:
+                result = aligner.align(seq1, seq2)
         
         print(f"  [+] Alignment complete!")
         print(f"  [+] Score: {result['score']}")
@@ -91,7 +126,8 @@ def main():
         output_dir.mkdir(exist_ok=True)
         
         print(f"\n[STEP 3] Exporting results...")
-        export_results(result, str(output_dir))
+        with profiler.phase('export'):
+            export_results(result, str(output_dir))
         print(f"  [+] Results saved to: {output_dir}/")
         
     except Exception as e:
@@ -101,9 +137,11 @@ def main():
     if args.visualize:
         try:
             print(f"\n[STEP 4] Creating visualizations...")
-            plot_alignment_statistics(result, str(output_dir / 'alignment_statistics.png'))
-            plot_percentage_distribution(result, str(output_dir / 'alignment_percentage.png'))
-            plot_gap_analysis(result, str(output_dir / 'alignment_gap_analysis.png'))
+            with profiler.phase('plot'):
+                plotter = BatchPlotter(dpi=args.draft_dpi if args.draft else PUBLICATION_DPI)
+                plotter.plot(result, str(output_dir))
+                plot_identity_track(result, str(output_dir / 'alignment_identity_track.png'),
+                                    window=args.window)
             print(f"  [+] Visualizations created successfully")
         except Exception as e:
             print(f"[-] Error: {e}", file=sys.stderr)
@@ -111,6 +149,12 @@ def main():
     try:
         print(f"\n[STEP 5] Summary Statistics")
         print_alignment_summary(result)
+        if args.profile or args.profile_json:
+            print(f"\n[PROFILE] Time and memory per step")
+            print(profiler.format_table())
+        if args.profile_json:
+            profiler.save(str(output_dir / 'alignment_profile.json'))
+            print(f"  [+] Profile saved to: {output_dir / 'alignment_profile.json'}")
         print("\n" + "="*80)
         print("[+] ALIGNMENT COMPLETE")
         print("="*80)
@@ -20,7 +20,6 @@ setup(
         "numpy>=1.21.0",
         "pandas>=1.3.0",
         "matplotlib>=3.4.0",
-        "seaborn>=0.11.0",
     ],
     extras_require={
         'dev': [
@@ -30,6 +29,9 @@ setup(
         'docs': [
             'sphinx>=4.0',
         ],
+        'parquet': [
+            'pyarrow>=7.0',
+        ],
     },
     classifiers=[
         "Development Status :: 5 - Production/Stable",
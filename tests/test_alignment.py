@@ -6,9 +6,12 @@ Run tests with:
     pytest --cov=nw_alignment tests/
 """
 
+import json
 import pytest
 from pathlib import Path
-from nw_alignment import NWAligner
+from nw_alignment import AlignmentResult, NWAligner, utils
+from nw_alignment.engines import hirschberg_align, alignment_counts, match_line, window_track
+from nw_alignment.prefilter import BelowIdentityCutoff
 from nw_alignment.parser import read_fasta, validate_fasta
 
 
@@ -85,6 +88,46 @@ class TestNWAligner:
         assert "Seq2:" in formatted
         assert "|" in formatted  # Should contain match indicators
     
+    def test_write_alignment_streams_blocks(self, tmp_path):
+        """Test streamed output matches format_alignment across batches"""
+        aligner = NWAligner()
+        seq1 = "ATGCATGCAA" * 30
+        seq2 = "ATGATGCAAT" * 30
+        result = aligner.align(seq1, seq2)
+        
+        output_file = tmp_path / "alignment.txt"
+        with open(output_file, 'w') as f:
+            aligner.write_alignment(result, f, line_width=7)
+        
+        assert output_file.read_text() == aligner.format_alignment(result, 7)
+        assert aligner.format_alignment(dict(result), 7) == output_file.read_text()
+    
+    def test_alignment_blocks(self, monkeypatch):
+        """Test block layout, including blocks split across render batches"""
+        monkeypatch.setattr(utils, "RENDER_BATCH_BLOCKS", 1)
+        result = NWAligner().align("ATGCA", "ATCA")
+        
+        blocks = list(utils.iter_alignment_blocks(result, line_width=2))
+        
+        assert blocks == [
+            "Seq1: AT\n      ||\nSeq2: AT\n\n",
+            "Seq1: GC\n       |\nSeq2: -C\n\n",
+            "Seq1: A\n      |\nSeq2: A\n\n",
+        ]
+    
+    def test_export_compact_json(self, tmp_path):
+        """Test exported JSON holds the CIGAR and statistics, not gapped strings"""
+        result = NWAligner().align("ATGCA", "ATCA")
+        
+        files = utils.export_results(result, str(tmp_path))
+        record = json.loads(Path(files['json']).read_text())
+        expanded = utils.export_results(result, str(tmp_path / "full"), expanded=True)
+        
+        assert 'aligned_seq1' not in record
+        assert record['alignment_stats'] == result['alignment_stats']
+        assert AlignmentResult.from_record("ATGCA", "ATCA", record) == result
+        assert json.loads(Path(expanded['json']).read_text())['aligned_seq2'] == "AT-CA"
+    
     def test_empty_sequences(self):
         """Test handling of empty sequences"""
         aligner = NWAligner()
@@ -93,6 +136,260 @@ class TestNWAligner:
             aligner.align("", "ATGC")
 
 
+class TestEngines:
+    """Test cases for the selectable DP engines"""
+
+    PAIRS = [
+        ("GATTACA", "GCATGCU"),
+        ("ATGCATGC", "ATGC"),
+        ("AAAAAAAA", "AAATAAAA"),
+        ("ACGTTGCA", "TGCAACGT"),
+        ("A", "ACGTACGT"),
+    ]
+
+    def test_unknown_engine(self):
+        """Test that an unknown engine name is rejected"""
+        with pytest.raises(ValueError):
+            NWAligner(engine="fortran")
+
+    @pytest.mark.parametrize("seq1,seq2", PAIRS)
+    def test_numpy_matches_pairwise2_score(self, seq1, seq2):
+        """Test that the NumPy engine finds the pairwise2 optimum"""
+        numpy_result = NWAligner(engine="numpy").align(seq1, seq2)
+        biopython_result = NWAligner(engine="pairwise2").align(seq1, seq2)
+
+        assert numpy_result['score'] == biopython_result['score']
+
+    @pytest.mark.parametrize("engine", ["numpy", "hirschberg", "banded", "wfa"])
+    @pytest.mark.parametrize("seq1,seq2", PAIRS)
+    def test_alignment_is_consistent(self, engine, seq1, seq2):
+        """Test that the traced alignment spells both inputs and scores correctly"""
+        aligner = NWAligner(match=2, mismatch=-1, gap=-2, engine=engine)
+        result = aligner.align(seq1, seq2)
+
+        assert result['aligned_seq1'].replace('-', '') == seq1
+        assert result['aligned_seq2'].replace('-', '') == seq2
+
+        score = 0
+        for s1, s2 in zip(result['aligned_seq1'], result['aligned_seq2']):
+            if s1 == '-' or s2 == '-':
+                score += aligner.gap_penalty
+            elif s1 == s2:
+                score += aligner.match_score
+            else:
+                score += aligner.mismatch_score
+        assert score == result['score']
+
+    @pytest.mark.parametrize("seq1,seq2", PAIRS)
+    def test_hirschberg_recursion_is_optimal(self, seq1, seq2):
+        """Test that divide-and-conquer down to single cells keeps the optimum"""
+        expected = NWAligner().align(seq1, seq2)['score']
+
+        aligned1, aligned2, score, cells = hirschberg_align(seq1, seq2, 2, -1, -2,
+                                                            block_cells=1)
+
+        assert score == expected
+        assert cells >= len(seq1) * len(seq2)   # score rows are recomputed
+        assert aligned1.replace('-', '') == seq1
+        assert aligned2.replace('-', '') == seq2
+
+    def test_iter_optimal_alignments(self):
+        """Test lazy enumeration of co-optimal alignments"""
+        aligner = NWAligner()
+
+        results = list(aligner.iter_optimal_alignments("AAAA", "AA",
+                                                       max_alignments=None))
+        pairs = {(r['aligned_seq1'], r['aligned_seq2']) for r in results}
+
+        # Two gaps placed among four positions: C(4, 2) optimal alignments
+        assert len(results) == len(pairs) == 6
+        assert all(r['score'] == results[0]['score'] for r in results)
+        assert results[0]['aligned_seq2'] == aligner.align("AAAA", "AA")['aligned_seq2']
+
+    def test_iter_optimal_alignments_cap(self):
+        """Test that enumeration stops at max_alignments"""
+        aligner = NWAligner()
+
+        results = list(aligner.iter_optimal_alignments("A" * 200, "A" * 100,
+                                                       max_alignments=3))
+
+        assert len(results) == 3
+
+    @pytest.mark.parametrize("seq1,seq2", PAIRS)
+    def test_affine_matches_pairwise2_score(self, seq1, seq2):
+        """Test that the Gotoh engine finds the pairwise2 affine optimum"""
+        params = dict(match=2, mismatch=-1, gap_open=-5, gap_extend=-1)
+
+        numpy_result = NWAligner(**params).align(seq1, seq2)
+        biopython_result = NWAligner(engine="pairwise2", **params).align(seq1, seq2)
+
+        assert numpy_result['score'] == biopython_result['score']
+        assert NWAligner(**params).score(seq1, seq2) == biopython_result['score']
+
+    def test_affine_prefers_one_long_gap(self):
+        """Test that affine scoring merges gaps and reports gap openings"""
+        aligner = NWAligner(match=2, mismatch=-1, gap_open=-5, gap_extend=-1)
+
+        result = aligner.align("ACGTTTTACG", "ACGACG")
+
+        assert result['gaps_seq2'] == 4
+        assert result['gap_opens_seq2'] == 1
+        assert result['alignment_stats']['gap_opens'] == 1
+        assert result['score'] == 6 * 2 - 5 - 3
+
+    @pytest.mark.parametrize("seq1,seq2", PAIRS)
+    @pytest.mark.parametrize("params", [(2, -1, -2), (5, -1, -1), (1, -5, -5)])
+    def test_wfa_matches_numpy_score(self, seq1, seq2, params):
+        """Test that the wavefront engine is cost-equivalent to the DP"""
+        expected = NWAligner(*params).align(seq1, seq2)['score']
+
+        result = NWAligner(*params, engine="wfa").align(seq1, seq2)
+
+        assert result['score'] == expected
+        assert result['alignment_stats']['score'] == expected
+
+    def test_wfa_rejects_unconvertible_scoring(self):
+        """Test that WFA refuses schemes without a positive penalty form"""
+        with pytest.raises(ValueError):
+            NWAligner(match=1, mismatch=2, gap=-1, engine="wfa")
+
+    @pytest.mark.parametrize("engine", ["hirschberg", "banded", "wfa"])
+    def test_linear_engines_reject_affine(self, engine):
+        """Test that linear-gap-only engines refuse affine penalties"""
+        with pytest.raises(ValueError):
+            NWAligner(engine=engine, gap_open=-5, gap_extend=-1)
+
+    @pytest.mark.parametrize("engine", ["numpy", "pairwise2"])
+    def test_extend_below_open_rejected(self, engine):
+        """Test that extending a gap may not cost more than opening one"""
+        with pytest.raises(ValueError, match="gap_extend"):
+            NWAligner(engine=engine, gap_open=-1, gap_extend=-3)
+        with pytest.raises(ValueError):
+            NWAligner(engine=engine, gap=-2, gap_extend=-3)
+
+    @pytest.mark.parametrize("seq1,seq2", PAIRS)
+    def test_banded_widens_to_optimum(self, seq1, seq2):
+        """Test that a band that is too narrow widens until it is exact"""
+        expected = NWAligner().align(seq1, seq2)['score']
+
+        result = NWAligner(engine="banded", band_tolerance=1).align(seq1, seq2)
+
+        assert result['score'] == expected
+
+    @pytest.mark.parametrize("engine", ["numpy", "pairwise2"])
+    @pytest.mark.parametrize("seq1,seq2", PAIRS)
+    def test_score_only(self, engine, seq1, seq2):
+        """Test that score-only mode agrees with the full alignment"""
+        aligner = NWAligner(engine=engine)
+
+        expected = aligner.align(seq1, seq2)['score']
+
+        assert aligner.score(seq1, seq2) == expected
+        assert aligner.align(seq1, seq2, score_only=True) == {'score': expected}
+
+    def test_alignment_counts(self):
+        """Test vectorized column counts against a hand-checked alignment"""
+        counts = alignment_counts("AT--GCA-T", "ACGTGC-AT")
+
+        assert counts == {
+            'matches': 4,
+            'mismatches': 1,
+            'gaps_seq1': 3,
+            'gaps_seq2': 1,
+            'gap_opens_seq1': 2,
+            'gap_opens_seq2': 1,
+        }
+
+    def test_match_line(self):
+        """Test match, mismatch and gap symbols"""
+        assert match_line("AT--GCA-T", "ACGTGC-AT") == "|.  ||  |"
+        assert match_line("", "") == ""
+    
+    def test_window_track(self):
+        """Test sliding-window identity and gap density against direct counts"""
+        aligned1, aligned2 = "AT--GCA-TACG", "ACGTGC-ATACC"
+        columns = match_line(aligned1, aligned2)
+        
+        for window in (1, 3, 5, 12, 50):
+            track = window_track(aligned1, aligned2, window)
+            width = min(window, len(columns))
+            
+            assert len(track['position']) == len(columns) - width + 1
+            for i, position in enumerate(track['position']):
+                part = columns[i:i + width]
+                assert position == i + (width + 1) / 2
+                assert track['identity'][i] == pytest.approx(part.count('|') / width * 100)
+                assert track['gaps'][i] == pytest.approx(part.count(' ') / width * 100)
+        
+        assert window_track("", "", 10)['identity'].size == 0
+        with pytest.raises(ValueError):
+            window_track(aligned1, aligned2, 0)
+
+
+class TestAlignMany:
+    """Test cases for NWAligner.align_many"""
+
+    PAIRS = [("ATGC", "ATGC"), ("GATTACA", "GCATGCU"), ("", "ACGT"), ("AAAA", "AA")]
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_ordered_results_and_errors(self, workers):
+        """Test input order, per-item results and captured errors"""
+        aligner = NWAligner()
+
+        output = list(aligner.align_many(self.PAIRS, workers=workers))
+
+        assert [index for index, _, _ in output] == [0, 1, 2, 3]
+        for (seq1, seq2), (_, result, error) in zip(self.PAIRS, output):
+            if seq1 and seq2:
+                assert error is None
+                assert result['score'] == aligner.align(seq1, seq2)['score']
+            else:
+                assert result is None
+                assert isinstance(error, ValueError)
+
+    def test_unordered_with_reference(self):
+        """Test reference mode streaming results as they complete"""
+        aligner = NWAligner()
+        queries = ["ATGC", "ATGA", "TTGC"]
+
+        output = aligner.align_many(queries, workers=2, reference="ATGC",
+                                    ordered=False)
+
+        scores = {index: result['score'] for index, result, _ in output}
+        assert scores == {i: aligner.align("ATGC", q)['score']
+                          for i, q in enumerate(queries)}
+
+    @pytest.mark.parametrize("ordered", [True, False])
+    def test_streams_input(self, ordered):
+        """Test a generator input is read only a window ahead of the results"""
+        aligner = NWAligner()
+        consumed = []
+
+        def queries():
+            for i in range(50):
+                consumed.append(i)
+                yield "ATGCATGC"
+
+        output = aligner.align_many(queries(), workers=2, reference="ATGC",
+                                    ordered=ordered)
+        next(output)
+
+        assert len(consumed) <= 2 * 4 + 1
+        assert len(list(output)) == 49
+
+    def test_min_identity_prefilter(self):
+        """Test that hopeless pairs are skipped before alignment"""
+        aligner = NWAligner()
+
+        output = list(aligner.align_many(["ATGCATGC", "TTTTTTTTTTTT"],
+                                         reference="ATGCATGC",
+                                         min_identity=90))
+
+        assert output[0][2] is None
+        assert isinstance(output[1][2], BelowIdentityCutoff)
+        assert output[1][1] is None
+
+
 class TestFASTAParser:
     """Test cases for FASTA parser functions"""
     
@@ -0,0 +1,164 @@
+"""
+Tests for anchors module
+"""
+
+import numpy as np
+import pytest
+from nw_alignment import NWAligner, PackedSequence
+from nw_alignment.anchors import find_anchors, chain_anchors, anchor_chain, gap_segments
+
+
+def random_sequence(length, seed):
+    rng = np.random.default_rng(seed)
+    return ''.join(rng.choice(list("ACGT"), length))
+
+
+def mutate(seq, rate, seed):
+    """Apply substitutions, deletions and insertions at the given rate."""
+    rng = np.random.default_rng(seed)
+    out = []
+    for base, r in zip(seq, rng.random(len(seq))):
+        if r < rate / 3:
+            out.append({"A": "C", "C": "G", "G": "T", "T": "A"}[base])
+        elif r < 2 * rate / 3:
+            continue
+        elif r < rate:
+            out.append(base + "A")
+        else:
+            out.append(base)
+    return ''.join(out)
+
+
+@pytest.fixture(scope="module")
+def pair():
+    seq1 = random_sequence(3000, 1)
+    return seq1, mutate(seq1, 0.05, seed=2)
+
+
+class TestAnchors:
+    """Test anchor finding and chaining"""
+
+    def test_find_anchors_merges_seeds(self):
+        """Test overlapping seeds on one diagonal form one anchor"""
+        anchors = find_anchors("TTACGTACCA", "GACGTACG", k=4)
+
+        assert anchors.tolist() == [[1, 4, 4], [2, 1, 6]]
+
+    def test_repeated_kmers_are_skipped(self):
+        """Test k-mers occurring twice in a sequence are not anchors"""
+        assert find_anchors("ACGTACGT", "ACGTACGT", k=4).tolist() == [[1, 1, 6]]
+
+    def test_chain_is_collinear(self):
+        """Test crossing and overlapping anchors are left out"""
+        anchors = np.array([[0, 0, 10], [5, 50, 20], [12, 12, 8], [30, 25, 5]])
+
+        chain = chain_anchors(anchors)
+
+        assert chain.tolist() == [[0, 0, 10], [12, 12, 8], [30, 25, 5]]
+
+    def test_chain_matches_sequences(self, pair):
+        """Test every chained anchor is an exact, ordered match"""
+        seq1, seq2 = pair
+
+        chain = anchor_chain(seq1, seq2, k=15)
+
+        assert chain
+        end1 = end2 = 0
+        for i, j, length in chain:
+            assert i >= end1 and j >= end2
+            assert seq1[i:i + length] == seq2[j:j + length]
+            end1, end2 = i + length, j + length
+
+    def test_reanchoring(self, pair):
+        """Test large stretches are searched again with shorter seeds"""
+        seq1, seq2 = pair
+
+        coarse = anchor_chain(seq1, seq2, k=31, min_k=31)
+        fine = anchor_chain(seq1, seq2, k=31, min_k=11, max_cells=1000)
+
+        assert len(fine) > len(coarse)
+
+    def test_overlapping_anchor_recovered(self):
+        """Test an anchor overlapping a chained one is found again trimmed"""
+        seq1 = random_sequence(5000, 4)
+        # The duplicated two residues let the first anchor overlap the second
+        seq2 = seq1[:2000] + seq1[2000:2002] + seq1[2000:4000] + seq1[4100:]
+
+        segments = gap_segments(seq1, seq2, anchor_chain(seq1, seq2, k=15))
+
+        assert max(len(part1) * len(part2) for part1, part2 in segments) == 0
+
+    def test_gap_segments(self):
+        """Test segments cover everything outside the anchors"""
+        segments = gap_segments("AACCGGTT", "ACCGGTTT", [(1, 0, 5)])
+
+        assert segments == [("A", ""), ("TT", "TTT")]
+
+
+class TestAlignAnchored:
+    """Test anchored global alignment"""
+
+    @pytest.mark.parametrize("aligner", [
+        NWAligner(),
+        NWAligner(gap_open=-5, gap_extend=-1),
+    ])
+    def test_matches_full_alignment(self, pair, aligner):
+        """Test similar sequences get the full NW score and statistics"""
+        seq1, seq2 = pair
+
+        full = aligner.align(seq1, seq2)
+        anchored = aligner.align_anchored(seq1, seq2, k=15)
+
+        assert anchored['score'] == full['score']
+        assert anchored['aligned_seq1'].replace('-', '') == seq1
+        assert anchored['aligned_seq2'].replace('-', '') == seq2
+        assert anchored['identity'] == pytest.approx(full['identity'], abs=0.5)
+        assert anchored.elapsed is not None
+
+    def test_statistics_consistent(self, pair):
+        """Test the stitched statistics agree with the gapped strings"""
+        seq1, seq2 = pair
+
+        result = NWAligner().align_anchored(seq1, seq2, k=15)
+
+        columns = list(zip(result['aligned_seq1'], result['aligned_seq2']))
+        assert result['matches'] == sum(a == b for a, b in columns)
+        assert result['gaps'] == sum('-' in column for column in columns)
+        assert result['length'] == len(columns)
+
+    def test_end_gaps(self):
+        """Test segments with one empty side become a single gap"""
+        core = random_sequence(200, 3)
+        aligner = NWAligner(gap_open=-5, gap_extend=-1)
+
+        result = aligner.align_anchored("GGGG" + core, core + "TTT", k=11)
+
+        assert result.cigar == "4D200=3I"
+        assert result['score'] == 200 * 2 + (-5 - 3) + (-5 - 2)
+
+    def test_no_anchors(self):
+        """Test unrelated sequences fall back to one full alignment"""
+        aligner = NWAligner()
+
+        result = aligner.align_anchored("GATTACA", "GCATGCU", k=11)
+
+        assert result['score'] == aligner.align("GATTACA", "GCATGCU")['score']
+
+    def test_workers_and_packed(self, pair):
+        """Test a process pool and packed input give the same result"""
+        seq1, seq2 = pair
+        aligner = NWAligner()
+
+        serial = aligner.align_anchored(seq1, seq2, k=15)
+        pool = aligner.align_anchored(PackedSequence(seq1), seq2, k=15, workers=2)
+
+        assert pool.cigar == serial.cigar and pool['score'] == serial['score']
+
+    def test_empty_sequence(self):
+        """Test empty input is rejected like align()"""
+        with pytest.raises(ValueError):
+            NWAligner().align_anchored("", "ACGT")
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,147 @@
+"""
+Tests for alignment result cache module
+"""
+
+import pickle
+import pytest
+from nw_alignment import NWAligner
+from nw_alignment.cache import AlignmentCache, cache_key
+
+
+class TestCacheKey:
+    """Test cache_key function"""
+    
+    def test_depends_on_all_inputs(self):
+        """Test that sequences, kind and parameters all change the key"""
+        base = cache_key('align', "ACGT", "ACGA", ('numpy', 2, -1, -2, -2))
+        
+        assert base == cache_key('align', "ACGT", "ACGA", ('numpy', 2, -1, -2, -2))
+        assert base != cache_key('score', "ACGT", "ACGA", ('numpy', 2, -1, -2, -2))
+        assert base != cache_key('align', "ACGA", "ACGT", ('numpy', 2, -1, -2, -2))
+        assert base != cache_key('align', "ACGT", "ACGA", ('numpy', 2, -1, -3, -3))
+        assert base != cache_key('align', "ACGT", "ACGA", ('wfa', 2, -1, -2, -2))
+    
+    def test_no_boundary_ambiguity(self):
+        """Test that moving residues between the sequences changes the key"""
+        params = ('numpy', 2, -1, -2, -2)
+        
+        assert cache_key('align', "AC", "GT", params) != cache_key('align', "ACG", "T", params)
+
+
+class TestAlignmentCache:
+    """Test AlignmentCache tiers"""
+    
+    def test_memory_lru(self):
+        """Test that the least recently used entry is dropped first"""
+        cache = AlignmentCache(max_memory_entries=2)
+        cache.put('a', {'score': 1})
+        cache.put('b', {'score': 2})
+        cache.get('a')
+        cache.put('c', {'score': 3})
+        
+        assert cache.get('b') is None
+        assert cache.get('a') == {'score': 1}
+        assert cache.get('c') == {'score': 3}
+    
+    def test_hits_are_copies(self):
+        """Test that modifying a returned result does not alter the cache"""
+        cache = AlignmentCache()
+        cache.put('a', {'stats': {'gaps': 1}})
+        
+        cache.get('a')['stats']['gaps'] = 99
+        
+        assert cache.get('a') == {'stats': {'gaps': 1}}
+    
+    def test_disk_tier_persists(self, tmp_path):
+        """Test that a new cache on the same directory sees old entries"""
+        AlignmentCache(str(tmp_path)).put('ab12', {'score': 5.0})
+        
+        cache = AlignmentCache(str(tmp_path))
+        
+        assert cache.get('ab12') == {'score': 5.0}
+        assert cache.hits == 1
+    
+    def test_disk_eviction(self, tmp_path):
+        """Test that the disk tier stays within its byte budget"""
+        cache = AlignmentCache(str(tmp_path), max_disk_bytes=2000)
+        for i in range(50):
+            cache.put(f"{i:040x}", {'aligned_seq1': "A" * 100})
+        
+        total = sum(path.stat().st_size for path in tmp_path.glob('*/*.json'))
+        
+        assert total <= 2000
+        assert cache.get(f"{49:040x}") is not None
+
+    def test_overwrite_counts_once(self, tmp_path):
+        """Test that rewriting a key does not inflate the tracked disk size"""
+        cache = AlignmentCache(str(tmp_path))
+        for _ in range(5):
+            cache.put('ab12', {'score': 5.0})
+        
+        on_disk = sum(path.stat().st_size for path in tmp_path.glob('*/*.json'))
+        
+        assert cache._disk_bytes == on_disk
+
+
+class TestAlignerCache:
+    """Test NWAligner with a cache attached"""
+    
+    @pytest.mark.parametrize("engine", NWAligner.ENGINES)
+    def test_cached_result_identical(self, engine, tmp_path):
+        """Test that a cache hit returns the computed result"""
+        aligner = NWAligner(engine=engine, cache=AlignmentCache(str(tmp_path)))
+        
+        first = aligner.align("ATGCATGC", "ATGATGC")
+        second = aligner.align("atgcatgc", "ATGATGC")
+        
+        assert second == first
+        assert aligner.cache.hits == 1
+    
+    def test_parameters_not_shared(self, tmp_path):
+        """Test that different scoring parameters do not share entries"""
+        cache = AlignmentCache(str(tmp_path))
+        
+        score1 = NWAligner(gap=-2, cache=cache).score("ATGC", "ATC")
+        score2 = NWAligner(gap=-5, cache=cache).score("ATGC", "ATC")
+        
+        assert score1 != score2
+        assert cache.hits == 0
+    
+    def test_engine_version_in_key(self, tmp_path, monkeypatch):
+        """Test that a new engine output version invalidates old entries"""
+        from nw_alignment import engines
+        cache = AlignmentCache(str(tmp_path))
+        aligner = NWAligner(cache=cache)
+        aligner.align("ATGC", "ATC")
+        
+        monkeypatch.setitem(engines.ENGINE_VERSIONS, 'numpy',
+                            engines.ENGINE_VERSIONS['numpy'] + 1)
+        aligner.align("ATGC", "ATC")
+        
+        assert cache.hits == 0
+
+    
+    def test_band_tolerance_in_key(self, tmp_path):
+        """Test that banded results are not shared across band tolerances"""
+        cache = AlignmentCache(str(tmp_path))
+        NWAligner(engine="banded", band_tolerance=1, cache=cache).align("ATGC", "ATC")
+        NWAligner(engine="banded", band_tolerance=64, cache=cache).align("ATGC", "ATC")
+        
+        assert cache.hits == 0
+    
+    def test_pickle_drops_memory_tier(self, tmp_path):
+        """Test a pickled aligner carries the cache directory, not its entries"""
+        aligner = NWAligner(cache=AlignmentCache(str(tmp_path), max_memory_entries=8))
+        aligner.align("ATGC", "ATC")
+        
+        copy = pickle.loads(pickle.dumps(aligner))
+        
+        assert not copy.cache._memory
+        assert copy.cache.cache_dir == tmp_path
+        assert copy.cache.max_memory_entries == 8
+        assert copy.align("ATGC", "ATC") == aligner.align("ATGC", "ATC")
+        assert copy.cache.hits == 1
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,112 @@
+"""
+Tests for distance module
+"""
+
+import numpy as np
+import pytest
+from nw_alignment import NWAligner
+from nw_alignment.distance import all_vs_all, load_matrices
+
+
+IDS = ["s1", "s2", "s3", "s4"]
+SEQUENCES = ["GATTACA", "GCATGCU", "GATTTACA", "ACGTACGT"]
+
+
+class TestAllVsAll:
+    """Test all-vs-all matrices"""
+
+    def test_matrices(self, tmp_path):
+        """Test every pair matches a direct alignment"""
+        aligner = NWAligner()
+
+        stats = all_vs_all(IDS, SEQUENCES, str(tmp_path), aligner=aligner)
+        matrices = load_matrices(str(tmp_path))
+
+        assert stats['aligned'] == 10 and stats['failed'] == 0
+        assert matrices['ids'] == IDS
+        for i in range(4):
+            for j in range(4):
+                expected = aligner.align(SEQUENCES[i], SEQUENCES[j])
+                assert matrices['score'][i, j] == expected['score']
+                assert matrices['identity'][i, j] == pytest.approx(expected['identity'], abs=1e-4)
+
+    def test_workers_match_serial(self, tmp_path):
+        """Test the process pool gives the same matrices"""
+        all_vs_all(IDS, SEQUENCES, str(tmp_path / "serial"))
+        all_vs_all(IDS, SEQUENCES, str(tmp_path / "pool"), workers=2, checkpoint_every=3)
+
+        serial = load_matrices(str(tmp_path / "serial"), mmap=False)
+        pool = load_matrices(str(tmp_path / "pool"), mmap=False)
+        assert np.array_equal(serial['score'], pool['score'])
+        assert np.array_equal(serial['identity'], pool['identity'])
+
+    def test_checkpoint_by_count(self, tmp_path):
+        """Test checkpoints every checkpoint_every pairs with a pool"""
+        messages = []
+        all_vs_all(IDS, SEQUENCES, str(tmp_path), workers=2, checkpoint_every=3,
+                   log=messages.append)
+
+        assert [message.split()[0] for message in messages] == \
+            ["3/10", "6/10", "9/10", "10/10"]
+
+    @pytest.mark.parametrize("aligner", [
+        NWAligner(gap_open=-5, gap_extend=-1),
+        NWAligner(match=-1, mismatch=-3, gap=-1),
+    ])
+    def test_self_score(self, tmp_path, aligner):
+        """Test the diagonal equals a full self-alignment"""
+        all_vs_all(IDS, SEQUENCES, str(tmp_path), aligner=aligner)
+
+        score = load_matrices(str(tmp_path))['score']
+        for i, seq in enumerate(SEQUENCES):
+            assert score[i, i] == aligner.score(seq, seq)
+
+    def test_resume(self, tmp_path):
+        """Test a rerun only aligns the missing pairs"""
+        all_vs_all(IDS, SEQUENCES, str(tmp_path))
+        score = np.load(tmp_path / "score.npy", mmap_mode='r+')
+        score[0, 2] = score[2, 0] = np.nan
+        score.flush()
+        del score
+
+        messages = []
+        stats = all_vs_all(IDS, SEQUENCES, str(tmp_path), log=messages.append)
+
+        assert stats['aligned'] == 1
+        assert messages == ["1/1 pairs (100.0%)"]
+        assert not np.isnan(load_matrices(str(tmp_path))['score']).any()
+
+    def test_new_ids_start_over(self, tmp_path):
+        """Test matrices of another sequence set are not reused"""
+        all_vs_all(IDS, SEQUENCES, str(tmp_path))
+
+        stats = all_vs_all(IDS[:3], SEQUENCES[:3], str(tmp_path))
+
+        assert stats['aligned'] == 6
+        assert load_matrices(str(tmp_path))['score'].shape == (3, 3)
+
+    def test_resume_rejects_mismatched_matrix(self, tmp_path):
+        """Test a matrix of the wrong dtype or shape is not reopened"""
+        all_vs_all(IDS, SEQUENCES, str(tmp_path))
+        np.save(tmp_path / "score.npy", np.zeros((4, 4), dtype=np.float32))
+
+        with pytest.raises(ValueError, match="score.npy"):
+            all_vs_all(IDS, SEQUENCES, str(tmp_path))
+
+        np.save(tmp_path / "score.npy", np.zeros((4, 3)))
+        with pytest.raises(ValueError):
+            all_vs_all(IDS, SEQUENCES, str(tmp_path))
+
+        stats = all_vs_all(IDS, SEQUENCES, str(tmp_path), resume=False)
+        assert stats['aligned'] == 10
+
+    def test_invalid_input(self, tmp_path):
+        """Test mismatched or repeated ids are rejected"""
+        with pytest.raises(ValueError):
+            all_vs_all(IDS, SEQUENCES[:3], str(tmp_path))
+        with pytest.raises(ValueError):
+            all_vs_all(["a", "a"], SEQUENCES[:2], str(tmp_path))
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,74 @@
+"""
+Tests for package import cost
+"""
+
+import subprocess
+import sys
+import pytest
+
+
+# Modules only needed for plotting or the 'pairwise2' engine
+HEAVY_MODULES = ('matplotlib', 'seaborn', 'Bio', 'pandas')
+
+# Import budget for the package itself, excluding NumPy (microseconds)
+IMPORT_BUDGET_US = 250000
+
+
+def import_times(statement):
+    """
+    Run statement in a fresh interpreter under -X importtime.
+
+    Returns:
+        dict: Top-level package name -> cumulative import time (us)
+    """
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        capture_output=True, text=True, check=True
+    )
+    times = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line.split('|')
+        if not cumulative.strip().isdigit():
+            continue
+        name = name.strip()
+        if name.split('.')[0] == name:
+            times[name] = times.get(name, 0) + int(cumulative)
+    return times
+
+
+class TestImportCost:
+    """Test importing the core package stays cheap"""
+
+    def test_core_import_skips_heavy_modules(self):
+        """Test plotting and BioPython are not loaded by the core import"""
+        times = import_times("from nw_alignment import NWAligner")
+
+        assert 'nw_alignment' in times
+        assert not [name for name in HEAVY_MODULES if name in times]
+
+    def test_core_import_budget(self):
+        """Test the core import stays under the fixed budget"""
+        times = import_times("import nw_alignment")
+
+        own = times['nw_alignment'] - times.get('numpy', 0)
+        assert own < IMPORT_BUDGET_US, f"nw_alignment import took {own / 1000:.0f} ms"
+
+    def test_lazy_plotting_export(self):
+        """Test the plotting export resolves without loading matplotlib"""
+        times = import_times("from nw_alignment import plot_alignment_statistics")
+
+        assert 'matplotlib' not in times
+
+    def test_plotting_loads_matplotlib(self):
+        """Test matplotlib is loaded once a plot is made"""
+        times = import_times(
+            "from nw_alignment.visualization import _pyplot; _pyplot()"
+        )
+
+        assert 'matplotlib' in times
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
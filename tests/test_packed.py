@@ -0,0 +1,96 @@
+"""
+Tests for packed sequence module
+"""
+
+import pickle
+import pytest
+import numpy as np
+from nw_alignment import NWAligner, PackedSequence
+from nw_alignment.engines import encode_sequence
+from nw_alignment.parser import read_fasta, read_multiple_fasta
+
+
+SEQUENCES = [
+    "",
+    "A",
+    "acgtACGT",
+    "ACGTNNNNNNACGTRYKM",
+    "NNNN",
+    "GATTACA-GATTACA",
+]
+
+
+class TestPackedSequence:
+    """Test PackedSequence round trips"""
+
+    @pytest.mark.parametrize("seq", SEQUENCES)
+    def test_round_trip(self, seq):
+        """Test unpacking restores the uppercased sequence"""
+        packed = PackedSequence(seq)
+
+        assert len(packed) == len(seq)
+        assert str(packed) == seq.upper()
+        assert np.array_equal(packed.codes(), encode_sequence(seq.upper()))
+
+    def test_slicing(self):
+        """Test subranges crossing byte and exception-run boundaries"""
+        seq = "ACGTTNNNGCAYRACG"
+        packed = PackedSequence(seq)
+
+        for start in range(len(seq)):
+            for end in range(start, len(seq) + 1):
+                assert packed[start:end] == seq[start:end]
+        assert packed[5] == "N"
+        assert packed[-1] == "G"
+
+    def test_exception_runs(self):
+        """Test non-ACGT characters are stored as runs"""
+        packed = PackedSequence("ACNNNNGTRR")
+
+        assert packed.exception_runs == ((2, 6, "N"), (8, 10, "R"))
+
+    def test_compact(self):
+        """Test storage is about a quarter of the string size"""
+        packed = PackedSequence("ACGT" * 1000)
+
+        assert packed.nbytes == 1000
+
+    def test_pickle(self):
+        """Test packed sequences survive pickling for worker processes"""
+        packed = PackedSequence("ACGTNNACGT")
+
+        assert pickle.loads(pickle.dumps(packed)) == packed
+
+
+class TestPackedAlignment:
+    """Test engines and parser accept PackedSequence"""
+
+    @pytest.mark.parametrize("engine", NWAligner.ENGINES)
+    def test_align_matches_str(self, engine):
+        """Test packed input gives the same alignment as str input"""
+        aligner = NWAligner(engine=engine)
+        seq1, seq2 = "ATGCNNATGCAT", "atgcatgcgat"
+
+        expected = aligner.align(seq1, seq2)
+        result = aligner.align(PackedSequence(seq1), PackedSequence(seq2))
+
+        assert result['aligned_seq1'] == expected['aligned_seq1']
+        assert result['aligned_seq2'] == expected['aligned_seq2']
+        assert result['score'] == expected['score']
+        assert aligner.score(PackedSequence(seq1), seq2) == expected['score']
+
+    def test_read_packed(self, tmp_path):
+        """Test the parser can produce packed sequences"""
+        fasta_file = tmp_path / "test.fasta"
+        fasta_file.write_text(">a\nacgtn\n>b\nGG\n")
+
+        seq_id, seq, _ = read_fasta(str(fasta_file), packed=True)
+        records = read_multiple_fasta(str(fasta_file), packed=True)
+
+        assert isinstance(seq, PackedSequence)
+        assert str(seq) == "ACGTN"
+        assert [str(record[1]) for record in records] == ["ACGTN", "GG"]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -5,7 +5,8 @@ Tests for FASTA parser module
 import pytest
 from pathlib import Path
 from nw_alignment.parser import (
-    read_fasta, read_multiple_fasta, write_fasta, validate_fasta
+    read_fasta, read_multiple_fasta, write_fasta, validate_fasta, iter_fasta,
+    FastaIndex
 )
 
 
@@ -46,6 +47,51 @@ class TestReadFASTA:
             read_fasta(str(fasta_file))
 
 
+class TestIterFASTA:
+    """Test iter_fasta streaming reader"""
+    
+    def test_yields_lazily(self, tmp_path):
+        """Test that records are produced one at a time"""
+        fasta_file = tmp_path / "multi.fasta"
+        fasta_file.write_text(">a\nAC\n>b\nGT\n")
+        
+        records = iter_fasta(str(fasta_file))
+        
+        assert next(records) == ("a", "AC", "a")
+        assert next(records) == ("b", "GT", "b")
+        with pytest.raises(StopIteration):
+            next(records)
+    
+    def test_matches_biopython(self, tmp_path):
+        """Test ids, descriptions and sequences match SeqIO parsing"""
+        fasta_file = tmp_path / "multi.fasta"
+        fasta_file.write_text(">a desc here\nAC GT\nac\n\n>b\n>c x\nTT\n")
+        
+        records = list(iter_fasta(str(fasta_file)))
+        
+        assert records == [
+            ("a", "ACGTAC", "a desc here"),
+            ("b", "", "b"),
+            ("c", "TT", "c x"),
+        ]
+    
+    def test_text_before_header(self, tmp_path):
+        """Test that stray text before the first header is rejected"""
+        fasta_file = tmp_path / "bad.fasta"
+        fasta_file.write_text("ATGC\n>a\nAT\n")
+        
+        with pytest.raises(ValueError):
+            list(iter_fasta(str(fasta_file)))
+    
+    def test_read_fasta_stops_at_first_record(self, tmp_path):
+        """Test read_fasta returns only the first record"""
+        fasta_file = tmp_path / "multi.fasta"
+        fasta_file.write_text(">a\nAC\n>b\nGT\n")
+        
+        assert read_fasta(str(fasta_file)) == ("a", "AC", "a")
+        assert read_multiple_fasta(str(fasta_file))[1] == ("b", "GT", "b")
+
+
 class TestWriteFASTA:
     """Test write_fasta function"""
     
@@ -102,5 +148,58 @@ class TestValidateFASTA:
         assert stats['average_length'] == 6
 
 
+class TestFastaIndex:
+    """Test FastaIndex random access"""
+    
+    def test_get_record_and_range(self, tmp_path):
+        """Test whole-record and subrange fetches across line breaks"""
+        fasta_file = tmp_path / "panel.fasta"
+        seq = "ACGTTGCAAGGCTTAACG" * 5
+        write_fasta(str(fasta_file), "ref", "GGGG")
+        with open(fasta_file, 'a') as f:
+            f.write(">query sample\n")
+            for i in range(0, len(seq), 7):
+                f.write(seq[i:i+7].lower() + "\n")
+        
+        with FastaIndex(str(fasta_file)) as index:
+            assert index.keys() == ["ref", "query"]
+            assert index.length("query") == len(seq)
+            assert index.get("ref") == "GGGG"
+            assert index.get("query") == seq
+            assert index.get("query", 5, 40) == seq[5:40]
+            assert index.get("query", 10, 10) == ""
+    
+    def test_index_persisted(self, tmp_path):
+        """Test the .fai file is written in samtools layout and reused"""
+        fasta_file = tmp_path / "panel.fasta"
+        fasta_file.write_text(">a\nACGT\nAC\n>b x\nTT\n")
+        
+        FastaIndex(str(fasta_file))
+        fai = tmp_path / "panel.fasta.fai"
+        
+        assert fai.read_text() == "a\t6\t3\t4\t5\nb\t2\t16\t2\t3\n"
+        assert FastaIndex(str(fasta_file)).get("b") == "TT"
+    
+    def test_uneven_lines_rejected(self, tmp_path):
+        """Test that records with ragged line lengths cannot be indexed"""
+        fasta_file = tmp_path / "ragged.fasta"
+        fasta_file.write_text(">a\nAC\nACGT\n")
+        
+        with pytest.raises(ValueError):
+            FastaIndex(str(fasta_file))
+    
+    def test_invalid_lookup(self, tmp_path):
+        """Test unknown IDs and out-of-range requests"""
+        fasta_file = tmp_path / "panel.fasta"
+        fasta_file.write_text(">a\nACGT\n")
+        
+        index = FastaIndex(str(fasta_file))
+        
+        with pytest.raises(KeyError):
+            index.get("missing")
+        with pytest.raises(ValueError):
+            index.get("a", 2, 10)
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
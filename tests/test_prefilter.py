@@ -0,0 +1,59 @@
+"""
+Tests for alignment prefilter module
+"""
+
+import pytest
+from nw_alignment import NWAligner
+from nw_alignment.prefilter import edit_distance, identity_bounds
+
+
+def naive_edit_distance(seq1, seq2):
+    """Reference O(m*n) Levenshtein distance"""
+    previous = list(range(len(seq2) + 1))
+    for i in range(1, len(seq1) + 1):
+        current = [i] + [0] * len(seq2)
+        for j in range(1, len(seq2) + 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1,
+                             previous[j - 1] + (seq1[i - 1] != seq2[j - 1]))
+        previous = current
+    return previous[-1]
+
+
+PAIRS = [
+    ("GATTACA", "GCATGCU"),
+    ("ATGC", "ATGC"),
+    ("", "ACGT"),
+    ("ACGT" * 20, "ACGA" * 20),
+    ("A" * 70, "T" * 65),
+]
+
+
+class TestEditDistance:
+    """Test edit_distance function"""
+    
+    @pytest.mark.parametrize("seq1,seq2", PAIRS)
+    def test_matches_naive_dp(self, seq1, seq2):
+        """Test bit-parallel result against the textbook recurrence"""
+        assert edit_distance(seq1, seq2) == naive_edit_distance(seq1, seq2)
+        assert edit_distance(seq2, seq1) == naive_edit_distance(seq1, seq2)
+
+
+class TestIdentityBounds:
+    """Test identity_bounds function"""
+    
+    @pytest.mark.parametrize("seq1,seq2", [p for p in PAIRS if p[0] and p[1]])
+    def test_bounds_contain_alignment_identity(self, seq1, seq2):
+        """Test that the NW identity never exceeds the upper bound"""
+        lower, upper = identity_bounds(seq1, seq2)
+        result = NWAligner().align(seq1, seq2)
+        
+        assert 0 <= lower <= upper <= 100
+        assert result['identity'] <= upper + 1e-9
+    
+    def test_identical_sequences(self):
+        """Test that identical sequences are bounded at 100%"""
+        assert identity_bounds("ATGCATGC", "atgcatgc") == (100.0, 100.0)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
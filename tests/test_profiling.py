@@ -0,0 +1,114 @@
+"""
+Tests for profiling module
+"""
+
+import json
+import pytest
+from nw_alignment import NWAligner
+from nw_alignment import profiling
+from nw_alignment.profiling import Profiler
+
+
+class TestProfiler:
+    """Test phase records and reports"""
+
+    def test_phase_record(self):
+        """Test a phase records times, memory and cells"""
+        profiler = Profiler()
+
+        with profiler.phase('work', cells=12) as record:
+            sum(range(1000))
+
+        assert profiler.records == [record]
+        assert record['phase'] == 'work'
+        assert record['cells'] == 12
+        assert record['wall_s'] >= 0
+        assert record['cpu_s'] >= 0
+        assert record['depth'] == 0
+
+    def test_nested_order(self):
+        """Test nested phases are reported after their parent"""
+        profiler = Profiler()
+
+        with profiler.phase('outer'):
+            with profiler.phase('inner'):
+                pass
+        with profiler.phase('next'):
+            pass
+
+        names = [(r['phase'], r['depth']) for r in profiler.ordered_records()]
+        assert names == [('outer', 0), ('inner', 1), ('next', 0)]
+        totals = profiler.totals()
+        assert totals['wall_s'] == pytest.approx(
+            profiler.records[1]['wall_s'] + profiler.records[2]['wall_s'])
+
+    def test_callback(self):
+        """Test finished records are passed to the callback"""
+        seen = []
+        profiler = Profiler(callback=seen.append)
+
+        with profiler.phase('a'):
+            pass
+
+        assert [r['phase'] for r in seen] == ['a']
+
+    def test_library_phase_inactive(self):
+        """Test library phases are no-ops without an active profiler"""
+        with profiling.phase('dp', cells=4) as record:
+            pass
+
+        assert record is None
+
+    def test_align_records_dp(self):
+        """Test align() reports its DP phase to the active profiler"""
+        profiler = Profiler()
+
+        with profiler, profiler.phase('align'):
+            NWAligner().align("GATTACA", "GCATGCU")
+            NWAligner().score("ACGT", "ACG")
+
+        dp = [r for r in profiler.records if r['phase'] == 'dp']
+        assert [r['cells'] for r in dp] == [49, 12]
+        assert all(r['depth'] == 1 for r in dp)
+
+        NWAligner().align("ACGT", "ACGT")
+        assert len(profiler.records) == 3
+
+    def test_cells_are_work_done(self):
+        """Test engines report the cells they compute, not m * n"""
+        seq1 = "ACGTTGCAAC" * 40
+        seq2 = seq1[:200] + "T" + seq1[200:]
+        profiler = Profiler()
+
+        with profiler:
+            for engine in ('numpy', 'hirschberg', 'banded', 'wfa'):
+                NWAligner(engine=engine, band_tolerance=8).align(seq1, seq2)
+
+        cells = dict(zip(('numpy', 'hirschberg', 'banded', 'wfa'),
+                         (r['cells'] for r in profiler.records)))
+        full = len(seq1) * len(seq2)
+        assert cells['numpy'] == full
+        assert cells['hirschberg'] >= full   # one block: no recomputation
+        assert cells['banded'] < full / 10
+        assert cells['wfa'] < full / 100
+
+    def test_table_and_json(self, tmp_path):
+        """Test the breakdown table and JSON report"""
+        profiler = Profiler()
+        with profiler.phase('parse'):
+            pass
+        with profiler, profiler.phase('align'):
+            NWAligner().align("ACGT", "AGT")
+
+        table = profiler.format_table()
+        assert "parse" in table and "  dp" in table and "Total" in table
+
+        output = tmp_path / "profile.json"
+        profiler.save(str(output))
+        report = json.loads(output.read_text())
+        assert [p['phase'] for p in report['phases']] == ['parse', 'align', 'dp']
+        assert report['total']['cells'] == 12
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
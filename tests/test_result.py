@@ -0,0 +1,95 @@
+"""
+Tests for alignment result module
+"""
+
+import json
+import pickle
+import pytest
+from nw_alignment import NWAligner, AlignmentResult
+from nw_alignment.result import cigar_runs
+
+
+class TestCigarRuns:
+    """Test cigar_runs function"""
+    
+    def test_operations(self):
+        """Test match, mismatch, insertion and deletion runs"""
+        runs = cigar_runs("ACG--TAAC", "ACCGGT-AC")
+        
+        assert runs == [(2, '='), (1, 'X'), (2, 'I'), (1, '='), (1, 'D'), (2, '=')]
+    
+    def test_empty(self):
+        """Test an empty alignment"""
+        assert cigar_runs("", "") == []
+
+
+class TestAlignmentResult:
+    """Test AlignmentResult behaviour"""
+    
+    def test_rebuilds_gapped_strings(self):
+        """Test gapped strings are reproduced from the CIGAR"""
+        result = AlignmentResult.from_aligned("ACGTAAC", "ACCGGTAC",
+                                              "ACG--TAAC", "ACCGGT-AC", 5.0)
+        
+        assert result.cigar == "2=1X2I1=1D2="
+        assert result['aligned_seq1'] == "ACG--TAAC"
+        assert result['aligned_seq2'] == "ACCGGT-AC"
+        assert result.gaps_seq1 == 2
+        assert result.gaps_seq2 == 1
+        assert result.gap_opens_seq1 == 1
+        assert result.length == 9
+    
+    def test_dict_compatibility(self):
+        """Test dictionary-style access and conversion"""
+        result = NWAligner().align("ATGCATGC", "ATGATGC")
+        
+        as_dict = dict(result)
+        
+        assert set(as_dict) == set(AlignmentResult.KEYS)
+        assert as_dict['alignment_stats'] == result['alignment_stats']
+        assert result.get('missing') is None
+        assert result == as_dict
+        json.dumps(as_dict)
+        with pytest.raises(KeyError):
+            result['missing']
+    
+    def test_matches_statistics(self):
+        """Test counts agree with recomputing from the gapped strings"""
+        aligner = NWAligner()
+        result = aligner.align("ATGCATGCAAT", "ATGATTGCAGT")
+        
+        expected = aligner._calculate_statistics(result['aligned_seq1'],
+                                                 result['aligned_seq2'],
+                                                 result['score'])
+        
+        assert result['alignment_stats'] == expected
+    
+    def test_shares_input_sequences(self):
+        """Test an uppercase reference is referenced, not copied"""
+        reference = "ACGTACGTAC" * 10
+        
+        result = NWAligner().align(reference, "ACGTACGAC")
+        
+        assert result._seq1 is reference
+    
+    def test_gap_in_input_kept_verbatim(self):
+        """Test sequences containing '-' fall back to stored strings"""
+        result = NWAligner().align("AC-GT", "ACGT")
+        
+        assert result['aligned_seq1'].replace('-', '') == "ACGT"
+        assert 'aligned_seq1' in result.to_record()
+    
+    def test_record_round_trip(self):
+        """Test to_record()/from_record() and pickling"""
+        seq1, seq2 = "ATGCATGC", "ATGATGC"
+        result = NWAligner().align(seq1, seq2)
+        
+        restored = AlignmentResult.from_record(seq1, seq2, result.to_record())
+        
+        assert set(result.to_record()) == {'score', 'cigar'}
+        assert restored == result
+        assert pickle.loads(pickle.dumps(result)) == result
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,138 @@
+"""
+Tests for sketch module
+"""
+
+import numpy as np
+import pytest
+from nw_alignment import PackedSequence
+from nw_alignment.sketch import SketchIndex, kmer_hashes, sketch, jaccard_to_identity
+
+
+def random_sequence(length, seed):
+    rng = np.random.default_rng(seed)
+    return ''.join(rng.choice(list("ACGT"), length))
+
+
+def mutate(seq, rate, seed):
+    rng = np.random.default_rng(seed)
+    bases = np.array(list(seq))
+    sites = np.flatnonzero(rng.random(len(seq)) < rate)
+    bases[sites] = [{"A": "C", "C": "G", "G": "T", "T": "A"}[b] for b in bases[sites]]
+    return ''.join(bases)
+
+
+def reverse_complement(seq):
+    return seq.translate(str.maketrans("ACGT", "TGCA"))[::-1]
+
+
+@pytest.fixture(scope="module")
+def references():
+    return {f"ref{i}": random_sequence(3000, 10 + i) for i in range(10)}
+
+
+class TestKmerHashes:
+    """Test k-mer hashing"""
+
+    def test_count_and_breaks(self):
+        """Test one hash per k-mer, skipping k-mers with N"""
+        assert kmer_hashes("ACGTACGT", k=4).size == 5
+        assert kmer_hashes("ACGTNACGT", k=4).size == 2
+        assert kmer_hashes("ACG", k=4).size == 0
+
+    def test_canonical(self):
+        """Test both strands give the same hashes"""
+        seq = random_sequence(200, 1)
+
+        forward = np.sort(kmer_hashes(seq, k=11))
+        reverse = np.sort(kmer_hashes(reverse_complement(seq), k=11))
+
+        assert np.array_equal(forward, reverse)
+        assert not np.array_equal(np.sort(kmer_hashes(seq, k=11, canonical=False)),
+                                  np.sort(kmer_hashes(reverse_complement(seq), k=11,
+                                                      canonical=False)))
+
+    def test_case_and_packed(self):
+        """Test lowercase and packed input hash like uppercase text"""
+        seq = random_sequence(100, 2)
+
+        assert np.array_equal(kmer_hashes(seq.lower()), kmer_hashes(seq))
+        assert np.array_equal(kmer_hashes(PackedSequence(seq)), kmer_hashes(seq))
+
+    def test_invalid_k(self):
+        """Test k must fit in 64 bits"""
+        with pytest.raises(ValueError):
+            kmer_hashes("ACGT", k=32)
+
+    def test_sketch_is_bottom_s(self):
+        """Test the sketch keeps the smallest distinct hashes"""
+        seq = random_sequence(500, 3)
+
+        bottom = sketch(seq, k=15, sketch_size=50)
+
+        assert bottom.size == 50
+        assert np.array_equal(bottom, np.unique(kmer_hashes(seq, k=15))[:50])
+
+
+class TestSketchIndex:
+    """Test similarity search"""
+
+    def test_search_ranks_closest(self, references):
+        """Test the mutated reference is found first with a sensible estimate"""
+        index = SketchIndex()
+        index.add_many(references.items())
+        query = mutate(references["ref4"], 0.02, seed=5)
+
+        hits = index.search(query, top_k=3)
+
+        assert hits[0][0] == "ref4"
+        assert 95 < hits[0][2] < 100
+        assert len(hits) == 1  # unrelated references share no hash
+
+    def test_identical_and_min_identity(self, references):
+        """Test identical sequences score 1 and the identity cutoff"""
+        index = SketchIndex()
+        index.add_many(references.items())
+
+        assert index.search(references["ref1"], top_k=1) == [("ref1", 1.0, 100.0)]
+        query = mutate(references["ref2"], 0.10, seed=6)
+        assert index.search(query, min_identity=99) == []
+
+    def test_save_load(self, references, tmp_path):
+        """Test a saved index gives the same results"""
+        index = SketchIndex(k=17, sketch_size=200)
+        index.add_many(references.items())
+        index.add("empty", "")
+        index.save(str(tmp_path / "refs.npz"))
+
+        loaded = SketchIndex.load(str(tmp_path / "refs.npz"))
+
+        assert loaded.ids == index.ids and loaded.k == 17
+        query = mutate(references["ref7"], 0.03, seed=7)
+        assert np.array_equal(loaded.similarity(query), index.similarity(query))
+
+    def test_from_fasta_reuses_index(self, references, tmp_path):
+        """Test a fresh index file is loaded instead of rebuilt"""
+        fasta_file = tmp_path / "refs.fasta"
+        fasta_file.write_text("".join(f">{k}\n{v}\n" for k, v in references.items()))
+        index_file = tmp_path / "refs.sketch.npz"
+
+        built = SketchIndex.from_fasta(str(fasta_file), index_file=str(index_file))
+        stamp = index_file.stat().st_mtime_ns
+        loaded = SketchIndex.from_fasta(str(fasta_file), index_file=str(index_file))
+
+        assert loaded.ids == built.ids == list(references)
+        assert index_file.stat().st_mtime_ns == stamp
+
+        # Other parameters force a rebuild
+        rebuilt = SketchIndex.from_fasta(str(fasta_file), k=15, index_file=str(index_file))
+        assert rebuilt.k == 15 and SketchIndex.load(str(index_file)).k == 15
+
+    def test_jaccard_to_identity(self):
+        """Test the Mash conversion at its end points"""
+        identity = jaccard_to_identity(np.array([0.0, 1.0]), k=21)
+
+        assert identity.tolist() == [0.0, 100.0]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,74 @@
+"""
+Tests for columnar batch output module
+"""
+
+import pytest
+from nw_alignment import NWAligner, AlignmentResult
+from nw_alignment.summary import (
+    SummaryWriter, read_summary, iter_alignment_records, SUMMARY_COLUMNS
+)
+
+
+REFERENCE = "ATGCATGCATGCAAGT"
+QUERIES = [("q1", "ATGCATGCATGCAAGT"), ("q2", "ATGCTGCATGAAGT"), ("q3", "TTGCATGCAAGC")]
+
+
+def write_batch(summary_file, alignments_file=None):
+    """Align every query against the reference into a SummaryWriter"""
+    aligner = NWAligner()
+    results = {}
+    with SummaryWriter(str(summary_file), alignments_file) as writer:
+        for seq_id, seq in QUERIES:
+            results[seq_id] = aligner.align(REFERENCE, seq)
+            writer.add("ref", seq_id, results[seq_id])
+    return results
+
+
+class TestSummaryWriter:
+    """Test SummaryWriter and read_summary"""
+    
+    @pytest.mark.parametrize("suffix", [".npz", ".csv"])
+    def test_round_trip(self, tmp_path, suffix):
+        """Test one row per pair with the result statistics"""
+        results = write_batch(tmp_path / f"batch{suffix}")
+        
+        table = read_summary(str(tmp_path / f"batch{suffix}"))
+        
+        assert list(table.columns) == list(SUMMARY_COLUMNS)
+        assert list(table['seq2_id']) == ["q1", "q2", "q3"]
+        for _, row in table.iterrows():
+            result = results[row['seq2_id']]
+            assert row['score'] == result['score']
+            assert row['matches'] == result['matches']
+            assert row['length'] == result['length']
+            assert row['elapsed'] >= 0
+    
+    def test_parquet(self, tmp_path):
+        """Test Parquet output when pyarrow is installed"""
+        pytest.importorskip("pyarrow")
+        write_batch(tmp_path / "batch.parquet")
+        
+        assert len(read_summary(str(tmp_path / "batch.parquet"))) == len(QUERIES)
+    
+    def test_unsupported_suffix(self, tmp_path):
+        """Test that unknown formats are rejected up front"""
+        with pytest.raises(ValueError):
+            SummaryWriter(str(tmp_path / "batch.xlsx"))
+    
+    def test_alignment_store(self, tmp_path):
+        """Test alignments can be rebuilt from the compressed store"""
+        store = tmp_path / "alignments.jsonl.gz"
+        results = write_batch(tmp_path / "batch.npz", str(store))
+        sequences = dict(QUERIES)
+        
+        records = list(iter_alignment_records(str(store)))
+        
+        assert [r['seq2_id'] for r in records] == ["q1", "q2", "q3"]
+        for record in records:
+            restored = AlignmentResult.from_record(REFERENCE, sequences[record['seq2_id']],
+                                                   record)
+            assert restored == results[record['seq2_id']]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,131 @@
+"""
+Tests for visualization module
+"""
+
+import pytest
+import numpy as np
+from nw_alignment import NWAligner
+from nw_alignment.visualization import (
+    BatchPlotter, plot_batch, _set_pie, PLOT_FILES, DRAFT_DPI,
+    decimate_track, plot_identity_track
+)
+
+
+@pytest.fixture(scope="module")
+def results():
+    aligner = NWAligner()
+    return [aligner.align("GATTACA", "GCATGCU"),
+            aligner.align("ACGTACGT", "ACGTACGT"),
+            aligner.align("ACGTTTACGT", "ACGACGT")]
+
+
+class TestBatchPlotter:
+    """Test figure reuse and batch rendering"""
+
+    def test_plot_files(self, results, tmp_path):
+        """Test every plot kind is saved with its standard name"""
+        plotter = BatchPlotter(dpi=DRAFT_DPI)
+
+        files = plotter.plot(results[0], str(tmp_path), prefix="q1_")
+
+        assert set(files) == set(PLOT_FILES)
+        for kind, path in files.items():
+            assert path.endswith(f"q1_{PLOT_FILES[kind]}")
+            assert (tmp_path / f"q1_{PLOT_FILES[kind]}").stat().st_size > 0
+
+    def test_figures_reused(self, results, tmp_path):
+        """Test figures are built once and updated per result"""
+        plotter = BatchPlotter(dpi=DRAFT_DPI, kinds=('statistics',))
+        fig, _ = plotter._figures['statistics']
+
+        for i, result in enumerate(results):
+            plotter.plot(result, str(tmp_path), prefix=f"{i}_")
+
+        assert plotter._figures['statistics'][0] is fig
+        summary = fig.axes[3].texts[0].get_text()
+        assert f"Length:           {results[-1]['length']} bp" in summary
+
+    def test_draft_dpi(self, results, tmp_path):
+        """Test a lower dpi gives a smaller image"""
+        BatchPlotter(dpi=DRAFT_DPI, kinds=('percentage',)).plot(
+            results[0], str(tmp_path / "draft"))
+        BatchPlotter(dpi=2 * DRAFT_DPI, kinds=('percentage',)).plot(
+            results[0], str(tmp_path / "full"))
+
+        draft = (tmp_path / "draft" / PLOT_FILES['percentage']).stat().st_size
+        full = (tmp_path / "full" / PLOT_FILES['percentage']).stat().st_size
+        assert draft < full
+
+    def test_pie_matches_matplotlib(self):
+        """Test updated wedges match a freshly drawn pie"""
+        from matplotlib.figure import Figure
+
+        ax = Figure().subplots()
+        reused = ax.pie([1, 1], labels=['a', 'b'], autopct='%1.1f%%', startangle=90)
+        _set_pie(*reused, [3, 1])
+        fresh = ax.pie([3, 1], labels=['a', 'b'], autopct='%1.1f%%', startangle=90)
+
+        for old, new in zip(reused[0], fresh[0]):
+            assert old.theta1 == pytest.approx(new.theta1)
+            assert old.theta2 == pytest.approx(new.theta2)
+        for old, new in zip(reused[2], fresh[2]):
+            assert old.get_text() == new.get_text()
+            assert old.get_position() == pytest.approx(new.get_position())
+
+    def test_unknown_kind(self):
+        """Test unknown plot kinds are rejected"""
+        with pytest.raises(ValueError):
+            BatchPlotter(kinds=('heatmap',))
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_plot_batch(self, results, tmp_path, workers):
+        """Test batch plotting in-process and across a pool"""
+        files = plot_batch(results, str(tmp_path), prefixes=["a_", "b_", "c_"],
+                           dpi=DRAFT_DPI, kinds=('gaps',), workers=workers)
+
+        assert [list(f) for f in files] == [['gaps']] * 3
+        assert (tmp_path / f"b_{PLOT_FILES['gaps']}").exists()
+
+    def test_plot_batch_prefixes(self, results, tmp_path):
+        """Test prefixes must match the results"""
+        with pytest.raises(ValueError):
+            plot_batch(results, str(tmp_path), prefixes=["a_"])
+
+
+class TestIdentityTrack:
+    """Test the positional identity/gap track plot"""
+
+    def test_decimate_keeps_extremes(self):
+        """Test downsampling keeps a one-point dip"""
+        position = np.arange(10000, dtype=float)
+        values = np.full(10000, 95.0)
+        values[4321] = 10.0
+
+        x, low, high = decimate_track(position, values, 100)
+
+        assert x.size == low.size == high.size == 100
+        assert low.min() == 10.0
+        assert high.max() == 95.0
+        assert x[0] >= 0 and x[-1] <= 9999
+
+    def test_decimate_short_track(self):
+        """Test tracks narrower than the plot are returned as they are"""
+        position = np.arange(5, dtype=float)
+        values = np.linspace(0, 100, 5)
+
+        x, low, high = decimate_track(position, values, 100)
+
+        assert np.array_equal(x, position)
+        assert np.array_equal(low, values) and np.array_equal(high, values)
+
+    def test_plot_identity_track(self, results, tmp_path):
+        """Test the track plot is saved"""
+        output = tmp_path / "track.png"
+
+        plot_identity_track(results[2], str(output), window=3, dpi=DRAFT_DPI)
+
+        assert output.stat().st_size > 0
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])